@@ -0,0 +1,80 @@
+# --- Micro-benchmark de l'extraction du texte des emails (fetcher.mime_extractor) ---
+# Compare email.message_from_bytes + parcours des parties à MimeExtractor.extract
+# sur des emails contenant des pièces jointes PDF : temps et pic de mémoire.
+#
+# Utilisation (depuis la racine du projet) :
+#   python benchmarks/bench_mime.py
+#   python benchmarks/bench_mime.py --attachment-kb 2048 --emails 20
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from email import message_from_bytes
+from email.message import EmailMessage
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from core.utils import TextUtils              # noqa: E402
+from fetcher.mime_extractor import MimeExtractor  # noqa: E402
+
+
+def make_email(index: int, attachment_kb: int, attachments: int) -> bytes:
+    """Email multipart : texte, version HTML et pièces jointes PDF de attachment_kb Ko."""
+    msg = EmailMessage()
+    msg['Subject'] = f"Mission Python {index}"
+    msg['From'] = "recruteur@agence.fr"
+    msg.set_content(f"Bonjour, nous cherchons un développeur Python pour une mission de 6 mois. Réf {index}")
+    msg.add_alternative(f"<p>Bonjour, mission Python. Réf {index}</p>", subtype="html")
+    for n in range(attachments):
+        msg.add_attachment(os.urandom(attachment_kb * 1024), maintype="application", subtype="pdf",
+                           filename=f"cv_{n}.pdf")
+    return msg.as_bytes()
+
+
+def stdlib_extract(raw: bytes) -> str:
+    """Référence : arbre MIME complet puis parties text/plain."""
+    msg = message_from_bytes(raw)
+    return "\n".join(TextUtils.decode_bytes(part.get_payload(decode=True), part.get_content_charset())
+                     for part in msg.walk()
+                     if part.get_content_type() == "text/plain" and part.get_content_disposition() != "attachment")
+
+
+def measure(func, emails) -> tuple:
+    """Temps total (secondes) et pic de mémoire allouée (octets) pour traiter tous les emails."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    for raw in emails:
+        func(raw)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de l'extraction MIME")
+    parser.add_argument("--emails", type=int, default=20, help="Nombre d'emails")
+    parser.add_argument("--attachment-kb", type=int, default=1024, help="Taille de chaque pièce jointe (Ko)")
+    parser.add_argument("--attachments", type=int, default=2, help="Pièces jointes par email")
+    args = parser.parse_args()
+
+    emails = [make_email(i, args.attachment_kb, args.attachments) for i in range(args.emails)]
+    for raw in emails[:3]:
+        if MimeExtractor.extract(raw)[1] != stdlib_extract(raw):
+            print("Résultat différent de la référence")
+            return 2
+
+    results = {
+        "message_from_bytes": measure(stdlib_extract, emails),
+        "MimeExtractor": measure(lambda raw: MimeExtractor.extract(raw), emails),
+    }
+    size = sum(len(raw) for raw in emails) / 1024 / 1024
+    print(f"{args.emails} emails, {size:.1f} Mo au total")
+    print(f"{'méthode':<20}{'temps (ms)':>12}{'pic mémoire (Ko)':>18}")
+    for name, (elapsed, peak) in results.items():
+        print(f"{name:<20}{elapsed * 1000:>12.1f}{peak / 1024:>18.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+# --- Benchmark de bout en bout du pipeline (commande run de src/main.py) ---
+# Génère une boîte mail synthétique (fakes.mailbox_generator), la sert avec le serveur IMAP local
+# (fakes.fake_imap) et répond aux analyses avec le faux modèle (fakes.fake_openai, latence réglable).
+# Chaque passage lance `main.py run` dans un interpréteur neuf et un dossier vide, puis relève :
+#   - le débit (emails/s) et la durée totale ;
+#   - le pic de mémoire (RSS) du processus ;
+#   - p50/p99 des étapes de EmailFetcher, EmailAnalyzer, ProjectDatabase et ReportGenerator
+#     (histogrammes du registre de métriques, logs/metrics.json du passage).
+# Le résultat est écrit en JSON (paramètres, commit, passages) pour comparer deux commits.
+#
+# Utilisation (depuis la racine du projet) :
+#   python benchmarks/bench_pipeline.py
+#   python benchmarks/bench_pipeline.py --emails 2000 --attachments pdf=0.3,docx=0.1 --thread-depth 4
+#   python benchmarks/bench_pipeline.py --compare benchmarks/results/pipeline-<commit>.json --check
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MAIN = os.path.join(ROOT, 'src', 'main.py')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from fakes.fake_imap import FakeImapServer, FakeMailbox      # noqa: E402
+from fakes.fake_openai import FakeOpenAIServer               # noqa: E402
+from fakes.mailbox_generator import MailboxGenerator         # noqa: E402
+
+# Histogrammes relevés pour chaque composant (nom exact, ou nom suivi d'étiquettes)
+COMPONENTS = {
+    "EmailFetcher": ["imap_connect_seconds", "imap_fetch_seconds"],
+    "EmailAnalyzer": ['pipeline_stage_seconds{stage="parse"}', 'pipeline_stage_seconds{stage="filter"}',
+                      'pipeline_stage_seconds{stage="analyze"}', "llm_request_seconds"],
+    "ProjectDatabase": ['pipeline_stage_seconds{stage="persist"}', "db_write_seconds"],
+    "ReportGenerator": ['pipeline_stage_seconds{stage="report"}', "report_write_seconds"],
+}
+# Compteurs conservés dans le résultat de chaque passage
+COUNTERS = ["emails_fetched_total", "projects_saved_total", "projects_linked_total", "llm_requests_total",
+            "near_duplicates_total", "emails_skipped_total", "emails_failed_total",
+            "projects_extracted_total", "reports_written_total"]
+
+
+def parse_mix(value: str) -> dict:
+    """Lit un mélange de pièces jointes "pdf=0.2,png=0.1" en {sorte: probabilité}."""
+    mix = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        kind, _, probability = item.partition("=")
+        mix[kind.strip()] = float(probability or 1)
+    return mix
+
+
+def git_commit() -> dict:
+    """Commit courant et présence de modifications non commitées (None hors d'un dépôt git)."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def run_child(cwd: str, timeout: float) -> tuple:
+    """
+    Lance `main.py run` ; renvoie (durée en secondes, pic de RSS en Mo ou None, code de sortie).
+    Le pic de mémoire est lu avec os.wait4 (Unix), sans échantillonnage.
+    """
+    with open(os.path.join(cwd, "output.log"), 'wb') as output:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, MAIN, "run"], cwd=cwd, stdout=output, stderr=subprocess.STDOUT)
+        if not hasattr(os, "wait4"):
+            code = process.wait(timeout)
+            return time.perf_counter() - start, None, code
+        deadline = time.monotonic() + timeout
+        while True:
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.monotonic() > deadline:
+                process.kill()
+                pid, status, usage = os.wait4(process.pid, 0)
+                break
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        process.returncode = code = os.waitstatus_to_exitcode(status)
+    # ru_maxrss : Ko sous Linux, octets sous macOS
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return elapsed, round(rss_mb, 1), code
+
+
+def component_latencies(histograms: dict) -> dict:
+    """p50/p99/moyenne (ms) et nombre d'observations des histogrammes de chaque composant."""
+    result = {}
+    for component, names in COMPONENTS.items():
+        entries = {}
+        for key, summary in histograms.items():
+            if any(key == name or (key.startswith(name + "{") and "{" not in name) for name in names):
+                entries[key] = {"count": summary["count"],
+                                **{field: round(summary[source] * 1000, 3) if summary[source] is not None else None
+                                   for field, source in (("p50_ms", "p50"), ("p99_ms", "p99"), ("mean_ms", "mean"))}}
+        result[component] = entries
+    return result
+
+
+def run_once(args, imap, llm, index: int) -> dict:
+    """Un passage complet dans un dossier neuf (base, stockage, rapports et logs vides)."""
+    sandbox = tempfile.mkdtemp(prefix=f"bench_pipeline_{index}_")
+    os.makedirs(os.path.join(sandbox, "src", "config"))
+    config = {
+        "imap_server": "127.0.0.1", "imap_port": imap.port, "use_ssl": False,
+        "email_user": "bench", "email_pass": "bench", "folders": args.folder_names, "fetch_limit": 0,
+        "openai_api_key": "bench", "openai_api_base": llm.api_base, "retry_base_delay": 0.01,
+        "requests_per_minute": 0, "tokens_per_minute": 0,  # Le faux modèle n'impose pas de quota
+        "analysis_concurrency": args.concurrency, "report_format": args.report_format,
+        "metrics_enabled": True, "metrics_format": "json", "metrics_path": os.path.join(sandbox, "metrics.json"),
+    }
+    config.update(json.loads(args.config or "{}"))
+    with open(os.path.join(sandbox, "src", "config", "config.json"), 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+    def failure(reason):
+        with open(os.path.join(sandbox, "output.log"), encoding='utf-8', errors='replace') as f:
+            tail = f.read()[-2000:]
+        return RuntimeError(f"Passage {index} en échec ({reason}), sortie dans {sandbox} :\n{tail}")
+
+    requests_before = llm.requests
+    elapsed, rss_mb, code = run_child(sandbox, args.timeout)
+    if code != 0 or not os.path.exists(config["metrics_path"]):
+        raise failure(f"code {code}")
+    with open(config["metrics_path"], encoding='utf-8') as f:
+        summary = json.load(f)
+
+    counters = {key: value for key, value in summary["counters"].items()
+                if key.split("{")[0] in COUNTERS}
+    # Un passage qui n'a rien enregistré, ou avec des emails en échec sans erreur simulée, ne mesure
+    # pas le pipeline (configuration invalide, régression fonctionnelle...) : il n'est pas comptabilisé
+    failed = sum(value for key, value in counters.items() if key.split("{")[0] == "emails_failed_total")
+    if failed and not args.llm_error_rate:
+        raise failure(f"{failed} emails en échec sans erreur simulée du modèle")
+    if not sum(value for key, value in counters.items() if key.split("{")[0] == "projects_saved_total"):
+        raise failure("aucun projet enregistré")
+    emails = summary["counters"].get("emails_fetched_total", 0)
+    return {
+        "wall_seconds": round(elapsed, 3),
+        "emails": emails,
+        "emails_per_second": round(emails / elapsed, 2) if elapsed else None,
+        "peak_rss_mb": rss_mb,
+        "llm_http_requests": llm.requests - requests_before,
+        "counters": counters,
+        "components": component_latencies(summary["histograms"]),
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> int:
+    """Affiche l'écart avec un résultat précédent ; renvoie le nombre de régressions au-delà de la tolérance."""
+    if baseline.get("params") != result["params"]:
+        print("Attention : paramètres différents de ceux du résultat de référence.")
+    current, previous = result["summary"], baseline["summary"]
+    rows = [("emails/s", previous["emails_per_second"], current["emails_per_second"], True),
+            ("pic RSS (Mo)", previous["peak_rss_mb"], current["peak_rss_mb"], False)]
+    for component, entries in current["components"].items():
+        for key, values in entries.items():
+            old = previous["components"].get(component, {}).get(key, {})
+            rows.append((f"{key} p99 (ms)", old.get("p99_ms"), values["p99_ms"], False))
+
+    print(f"\nComparaison avec {baseline.get('commit') or '?'} ({baseline.get('created_at', '?')})")
+    print(f"{'mesure':<48} {'référence':>10} {'actuel':>10} {'écart':>8}")
+    regressions = 0
+    for name, old, new, higher_is_better in rows:
+        if not old or new is None:
+            print(f"{name:<48} {old if old is not None else '-':>10} {new if new is not None else '-':>10}")
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        # Seuls le débit et la mémoire font échouer --check : les quantiles estimés sont plus bruités
+        flagged = worse > tolerance and name in ("emails/s", "pic RSS (Mo)")
+        regressions += flagged
+        print(f"{name:<48} {old:>10} {new:>10} {change:>+7.0%}{'  <- régression' if flagged else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit, latences et mémoire du pipeline sur une boîte synthétique")
+    parser.add_argument("--emails", type=int, default=300, help="Nombre d'emails de la boîte synthétique")
+    parser.add_argument("--folders", type=int, default=2, help="Nombre de dossiers IMAP")
+    parser.add_argument("--attachments", default="pdf=0.2,docx=0.1,png=0.1",
+                        help="Probabilité de chaque sorte de pièce jointe (pdf, docx, png, ics)")
+    parser.add_argument("--attachment-kb", type=int, default=200, help="Taille moyenne d'une pièce jointe (Ko)")
+    parser.add_argument("--charsets", default="utf-8,iso-8859-1,windows-1252", help="Jeux de caractères des emails")
+    parser.add_argument("--thread-depth", type=int, default=3, help="Emails maximum par conversation")
+    parser.add_argument("--noise-ratio", type=float, default=0.1, help="Part des emails sans projet")
+    parser.add_argument("--long-ratio", type=float, default=0.02, help="Part des emails longs (plusieurs morceaux)")
+    parser.add_argument("--seed", type=int, default=1, help="Graine de la boîte synthétique")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="Latence du faux modèle (secondes)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Part des appels au modèle en erreur")
+    parser.add_argument("--concurrency", type=int, default=8, help="Appels simultanés au modèle (analysis_concurrency)")
+    parser.add_argument("--report-format", default="text,jsonl", help="Formats de rapport (report_format)")
+    parser.add_argument("--config", help="Paramètres supplémentaires de config.json (objet JSON)")
+    parser.add_argument("--repeat", type=int, default=3, help="Passages (le résumé retient le passage de débit médian)")
+    parser.add_argument("--timeout", type=float, default=1800, help="Durée maximale d'un passage (secondes)")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results"),
+                        help="Dossier des résultats JSON, ou chemin du fichier")
+    parser.add_argument("--compare", help="Résultat JSON de référence (autre commit)")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Dégradation tolérée par --check (0.10 = 10 %%)")
+    parser.add_argument("--check", action="store_true",
+                        help="Code de sortie 1 si le débit ou la mémoire se dégradent au-delà de --tolerance")
+    args = parser.parse_args()
+    args.folder_names = ["INBOX"] + [f"Missions{n}" for n in range(1, args.folders)]
+    args.report_format = [name.strip() for name in args.report_format.split(",") if name.strip()]
+
+    generator = MailboxGenerator(emails=args.emails, attachments=parse_mix(args.attachments),
+                                 attachment_kb=args.attachment_kb, charsets=args.charsets.split(","),
+                                 thread_depth=args.thread_depth, noise_ratio=args.noise_ratio,
+                                 long_ratio=args.long_ratio, seed=args.seed)
+    mailbox = FakeMailbox()
+    start = time.perf_counter()
+    mailbox_stats = generator.fill(mailbox, args.folder_names)
+    print(f"Boîte synthétique : {mailbox_stats['emails']} emails, {mailbox_stats['threads']} conversations, "
+          f"{mailbox_stats['bytes'] / 1e6:.1f} Mo ({time.perf_counter() - start:.1f}s)")
+
+    imap = FakeImapServer(mailbox).start()
+    llm = FakeOpenAIServer(latency=args.llm_latency, error_rate=args.llm_error_rate).start()
+    runs = []
+    try:
+        print(f"\n{'passage':<8} {'durée':>8} {'emails/s':>9} {'pic RSS':>9} {'appels IA':>10}")
+        for index in range(1, args.repeat + 1):
+            run = run_once(args, imap, llm, index)
+            runs.append(run)
+            print(f"{index:<8} {run['wall_seconds']:>7.2f}s {run['emails_per_second']:>9.1f} "
+                  f"{run['peak_rss_mb'] if run['peak_rss_mb'] is not None else '-':>6} Mo {run['llm_http_requests']:>10}")
+    finally:
+        imap.stop()
+        llm.stop()
+
+    median = statistics.median_low(run["emails_per_second"] for run in runs)
+    summary = next(run for run in runs if run["emails_per_second"] == median)
+    print(f"\n{'composant':<16} {'histogramme':<40} {'n':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for component, entries in summary["components"].items():
+        for key, values in entries.items():
+            print(f"{component:<16} {key:<40} {values['count']:>6} {values['p50_ms'] or 0:>9.1f} {values['p99_ms'] or 0:>9.1f}")
+
+    params = {key: value for key, value in vars(args).items()
+              if key not in ("output", "compare", "tolerance", "check", "timeout", "repeat", "folder_names")}
+    result = {
+        "benchmark": "pipeline",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        **git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "mailbox": mailbox_stats,
+        "summary": summary,
+        "runs": runs,
+    }
+    path = args.output
+    if not path.endswith(".json"):
+        os.makedirs(path, exist_ok=True)
+        path = os.path.join(path, f"pipeline-{result['commit'] or 'nocommit'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nRésultat écrit : {path}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if args.check and regressions:
+            print(f"\n{regressions} régression(s) au-delà de {args.tolerance:.0%}.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
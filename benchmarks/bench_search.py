@@ -0,0 +1,93 @@
+# --- Benchmark de la recherche plein texte (ProjectDatabase.search_projects) ---
+# Remplit une base temporaire de projets synthétiques (technologies, clients, villes, expéditeurs
+# et dates variés), puis mesure la durée médiane de recherches typiques : un mot, plusieurs mots,
+# préfixe, OR, filtres par expéditeur / date et pagination.
+#
+# Utilisation (depuis la racine du projet) :
+#   python benchmarks/bench_search.py
+#   python benchmarks/bench_search.py --projects 300000 --check   # échoue au-delà de --budget-ms
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from database.project_database import ProjectDatabase  # noqa: E402
+
+TECHNOLOGIES = ["Python", "Java", "React", "Angular", "Kubernetes", "Terraform", "SAP", "Salesforce",
+                "PHP", "Symfony", "Go", "Rust", "Spark", "Snowflake", "Azure", "AWS", "GCP", "Flutter", "Node.js"]
+CLIENTS = ["une banque", "un assureur", "un e-commerçant", "un industriel", "une startup", "un opérateur télécom",
+           "une mutuelle", "un éditeur de logiciels", "une collectivité", "un groupe de médias"]
+CITIES = ["Paris", "Lyon", "Nantes", "Lille", "Bordeaux", "Toulouse", "Marseille", "Rennes", "Grenoble", "Télétravail"]
+DOMAINS = [f"agence{i}.fr" for i in range(200)]
+
+QUERIES = {
+    "un mot": dict(query="kubernetes"),
+    "trois mots": dict(query="python banque lyon"),
+    "préfixe": dict(query="terra*"),
+    "OR": dict(query="react OR angular"),
+    "expéditeur": dict(query="java", sender="@agence7.fr"),
+    "dates": dict(query="sap", since="2024-03-01", until="2024-03-31"),
+    "page 50": dict(query="python", offset=49 * 20),
+    "sans mot": dict(query="", sender="@agence42.fr"),
+}
+
+
+def fill(database: ProjectDatabase, count: int, seed: int = 1):
+    """Ajoute `count` projets synthétiques par lots de 5 000."""
+    rng = random.Random(seed)
+    for start in range(0, count, 5000):
+        projects = []
+        for i in range(start, min(count, start + 5000)):
+            techs = rng.sample(TECHNOLOGIES, 3)
+            content = (f"Projet {i} : mission {techs[0]} / {techs[1]} pour {rng.choice(CLIENTS)} à "
+                       f"{rng.choice(CITIES)}, démarrage sous {rng.randint(1, 8)} semaines, "
+                       f"TJM {rng.randint(400, 900)} €, environnement {techs[2]}, durée {rng.randint(3, 24)} mois.")
+            day = rng.randint(0, 364)
+            projects.append({"content": content, "message_id": f"<p{i}@bench>",
+                             "sender": f"recruteur{rng.randint(1, 20)}@{rng.choice(DOMAINS)}",
+                             "received_at": f"2024-{day // 31 + 1:02d}-{day % 28 + 1:02d}T10:00:00+01:00"})
+        database.save_projects_many(projects)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Durée des recherches plein texte")
+    parser.add_argument("--projects", type=int, default=200000, help="Nombre de projets dans la base")
+    parser.add_argument("--repeat", type=int, default=20, help="Exécutions par recherche (médiane)")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Durée maximale d'une recherche (ms)")
+    parser.add_argument("--check", action="store_true", help="Code de sortie 1 si une recherche dépasse le budget")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_search_")
+    config = SimpleNamespace(database_path=os.path.join(workdir, "projects.db"), logs_dir=os.path.join(workdir, "logs"))
+    database = ProjectDatabase(config)
+    start = time.perf_counter()
+    fill(database, args.projects)
+    print(f"{args.projects} projets indexés en {time.perf_counter() - start:.1f}s "
+          f"(FTS5 : {'oui' if database.search_enabled else 'non'})\n")
+    print(f"{'recherche':<12} {'médiane':>9} {'résultats':>10}")
+
+    failures = 0
+    for name, params in QUERIES.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            found = database.search_projects(**params)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings) * 1000
+        over = median > args.budget_ms
+        failures += over
+        print(f"{name:<12} {median:>7.1f}ms {found['total']:>10}{'  <- budget dépassé' if over else ''}")
+    database.close()
+
+    if args.check and failures:
+        print(f"\n{failures} recherche(s) hors budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# --- Benchmark du temps de démarrage des commandes de src/main.py ---
+# Lance chaque commande dans un interpréteur neuf, dans un dossier temporaire (configuration
+# minimale, serveur IMAP injoignable, base vide), et mesure :
+#   - la durée totale, comparée à celle d'un interpréteur vide ("python -c pass") ;
+#   - les modules importés (python -X importtime), pour vérifier qu'aucune dépendance
+#     lourde (openai, pandas...) n'est chargée par une commande qui ne l'utilise pas.
+#
+# Utilisation (depuis la racine du projet) :
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --repeat 10 --budget-ms 300 --check
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main.py')
+
+# Commandes mesurées et modules qu'elles ne doivent pas importer (aucun email à analyser ici)
+COMMANDS = {
+    "--help": ["openai", "pandas", "sqlite3", "imaplib"],
+    "stats": ["openai", "pandas", "imaplib"],
+    "search": ["openai", "pandas", "imaplib"],
+    "report": ["openai", "pandas", "imaplib"],
+    "fetch": ["openai", "pandas"],
+    "analyze": ["openai", "pandas", "imaplib"],
+    "run": ["openai", "pandas"],
+}
+
+
+def closed_port() -> int:
+    """Port local sur lequel rien n'écoute (connexion IMAP refusée immédiatement)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_sandbox() -> str:
+    """Dossier de travail avec une configuration minimale (sans commentaires, lisible par json.load)."""
+    sandbox = tempfile.mkdtemp(prefix="bench_startup_")
+    os.makedirs(os.path.join(sandbox, "src", "config"))
+    config = {
+        "imap_server": "127.0.0.1", "imap_port": closed_port(), "use_ssl": False,
+        "email_user": "bench", "email_pass": "bench", "openai_api_key": "bench",
+        "openai_api_base": "http://127.0.0.1:9/v1", "report_format": ["text"],
+    }
+    with open(os.path.join(sandbox, "src", "config", "config.json"), 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    return sandbox
+
+
+def run(args: list, cwd: str) -> tuple:
+    """
+    Lance une commande ; renvoie (durée en secondes, modules importés).
+    Une commande en échec (code de sortie, « Erreur fatale » dans logs/app.log) n'est pas mesurée :
+    une erreur au démarrage la rendrait artificiellement rapide.
+    """
+    log_path = os.path.join(cwd, "logs", "app.log")
+    log_start = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors='replace')
+    elapsed = time.perf_counter() - start
+    log = ""
+    if os.path.exists(log_path):
+        with open(log_path, encoding='utf-8', errors='replace') as f:
+            f.seek(log_start)
+            log = f.read()
+    if result.returncode != 0 or "Erreur fatale" in log:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"{' '.join(args)} en échec (code {result.returncode}) dans {cwd} :\n"
+                           + "\n".join((log.splitlines() + errors)[-20:]))
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            modules.add(name.split(".")[0])
+    return elapsed, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de démarrage des commandes de main.py")
+    parser.add_argument("--repeat", type=int, default=5, help="Lancements par commande (médiane)")
+    parser.add_argument("--budget-ms", type=float, default=300.0,
+                        help="Surcoût maximal d'une commande par rapport à un interpréteur vide (ms)")
+    parser.add_argument("--check", action="store_true",
+                        help="Code de sortie 1 si une commande dépasse le budget ou importe un module interdit")
+    args = parser.parse_args()
+
+    sandbox = make_sandbox()
+    baseline = statistics.median(run(["-c", "pass"], sandbox)[0] for _ in range(args.repeat))
+    print(f"Interpréteur vide : {baseline * 1000:.0f} ms  (budget : +{args.budget_ms:.0f} ms)\n")
+    print(f"{'commande':<10} {'médiane':>9} {'surcoût':>9}  modules interdits")
+
+    failures = 0
+    for command, forbidden in COMMANDS.items():
+        timings, loaded = [], set()
+        for _ in range(args.repeat):
+            elapsed, modules = run([MAIN, command], sandbox)
+            timings.append(elapsed)
+            loaded |= modules
+        median = statistics.median(timings)
+        overhead = (median - baseline) * 1000
+        bad = sorted(loaded & set(forbidden))
+        over = overhead > args.budget_ms
+        failures += over or bool(bad)
+        print(f"{command:<10} {median * 1000:>7.0f}ms {overhead:>7.0f}ms  {', '.join(bad) or '-'}"
+              f"{'  <- budget dépassé' if over else ''}")
+
+    if args.check and failures:
+        print(f"\n{failures} commande(s) hors budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
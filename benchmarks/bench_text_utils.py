@@ -0,0 +1,124 @@
+# --- Micro-benchmark des outils de texte (core.utils.TextUtils) ---
+# Compare les versions actuelles de chunk_text / normalize_text / extract_emails
+# aux anciennes implémentations, sur des corps d'email de 1 Ko à 5 Mo.
+#
+# Utilisation (depuis la racine du projet) :
+#   python benchmarks/bench_text_utils.py
+#   python benchmarks/bench_text_utils.py --check   # échoue si une version actuelle est plus lente
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from core.utils import TextUtils  # noqa: E402
+
+SIZES = {"1KB": 1_000, "10KB": 10_000, "100KB": 100_000, "1MB": 1_000_000, "5MB": 5_000_000}
+WORDS = ["Bonjour", "mission", "Python", "développeur", "freelance", "à", "pourvoir", "rapidement,",
+         "contactez", "jean.dupont@exemple.fr", "TJM", "élevé", "Île-de-France", "déploiement", "Kubernetes",
+         "réunion", "demain", "—", "cordialement.", "\n>", "Le", "projet", "démarre", "en", "janvier."]
+
+
+# --- Anciennes implémentations (référence) ---
+def legacy_normalize_text(text):
+    if not text:
+        return ""
+    text = text.lower()
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def legacy_extract_emails(text):
+    if not text:
+        return []
+    return re.findall(r'[\w\.-]+@[\w\.-]+\.\w+', text)
+
+
+def legacy_chunk_text(text, chunk_size=2000):
+    if not text:
+        return []
+    words = text.split()
+    chunks = []
+    current_chunk = []
+    for word in words:
+        current_length = sum(len(w) + 1 for w in current_chunk)
+        if current_length + len(word) + 1 > chunk_size:
+            chunks.append(' '.join(current_chunk))
+            current_chunk = [word]
+        else:
+            current_chunk.append(word)
+    if current_chunk:
+        chunks.append(' '.join(current_chunk))
+    return chunks
+
+
+CASES = [
+    ("chunk_text", legacy_chunk_text, TextUtils.chunk_text),
+    ("normalize_text", legacy_normalize_text, TextUtils.normalize_text),
+    ("extract_emails", legacy_extract_emails, TextUtils.extract_emails),
+]
+
+
+def make_body(size: int, seed: int = 42) -> str:
+    """Génère un corps d'email synthétique (français accentué) d'environ `size` caractères."""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        parts.append(word)
+        length += len(word) + 1
+    return ' '.join(parts)[:size]
+
+
+def best_time(func, text, repeat: int) -> float:
+    """Meilleur temps (secondes) sur `repeat` exécutions."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de core.utils.TextUtils")
+    parser.add_argument("--sizes", default=",".join(SIZES), help="Tailles à mesurer (ex : 1KB,1MB)")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre d'exécutions par mesure")
+    parser.add_argument("--check", action="store_true", help="Code de sortie 1 si une version actuelle est plus lente")
+    args = parser.parse_args()
+
+    slower = []
+    print(f"{'fonction':<16}{'taille':>8}{'ancienne (ms)':>16}{'actuelle (ms)':>16}{'gain':>8}")
+    for label in args.sizes.split(","):
+        text = make_body(SIZES[label])
+        # Le découpage historique est quadratique : une seule mesure au-delà de 100 Ko
+        repeat = args.repeat if SIZES[label] <= 100_000 else 1
+        for name, legacy, current in CASES:
+            result = current(text)
+            expected = legacy(text)
+            if name == "chunk_text":
+                expected = [chunk for chunk in expected if chunk]  # L'ancienne version produisait des morceaux vides
+            if result != expected:
+                print(f"Résultat différent pour {name} ({label})")
+                return 2
+            legacy_time = best_time(legacy, text, repeat)
+            current_time = best_time(current, text, repeat)
+            ratio = legacy_time / current_time if current_time else float('inf')
+            print(f"{name:<16}{label:>8}{legacy_time * 1000:>16.2f}{current_time * 1000:>16.2f}{ratio:>7.1f}x")
+            if current_time > legacy_time * 1.25:  # Marge pour le bruit de mesure
+                slower.append(f"{name} ({label})")
+
+    if slower:
+        print("Plus lent que l'ancienne version : " + ", ".join(slower))
+        return 1 if args.check else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+# --- Importation des modules nécessaires ---
+import json                    # Lignes du fichier JSONL soumis à l'API Batch
+import os                      # Pour la gestion des chemins de fichiers
+import time                    # Attente entre deux consultations de l'état des lots
+from itertools import groupby  # Regroupement des parties d'un même email
+from core.logger import setup_logger   # Pour configurer un système de journaux (logs)
+from core.utils import FileUtils, TextUtils  # Empreinte et nettoyage du texte des emails
+from analyzer.batch_client import OpenAIBatchClient  # Appels aux points d'accès /files et /batches
+from analyzer.project_schema import ProjectParser    # Lecture et fusion des projets renvoyés par le modèle
+
+# --- Statuts définitifs d'un lot côté API ---
+FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+# Lots interrompus : les requêtes sans résultat sont soumises à nouveau au prochain passage
+RETRY_STATUSES = {"expired", "cancelled"}
+
+
+# --- Définition de la classe pour analyser les emails via l'API Batch ---
+class BatchAnalyzer:
+    def __init__(self, config, analyzer, database, reporter=None, client=None, dedup=None):
+        """
+        Initialise le mode batch : les requêtes sont enregistrées en base, soumises par lots
+        à l'API Batch (moins chère, résultats sous 24 h), puis les résultats sont intégrés.
+
+        Tout l'état (requêtes, lots, résultats) est en base : un passage interrompu reprend
+        là où il s'était arrêté.
+
+        Args:
+            config: Objet contenant la configuration générale du projet.
+            analyzer: EmailAnalyzer (prompts, paramètres du modèle, cache des réponses).
+            database: ProjectDatabase (requêtes, lots et projets).
+            reporter: ReportGenerator pour les projets enregistrés, ou None.
+            client: Client de l'API Batch (par défaut OpenAIBatchClient).
+            dedup: NearDuplicateIndex des emails analysés, ou None ; l'entrée de chaque email
+                   est rattachée à son projet quand les résultats sont enregistrés.
+        """
+        self.analyzer = analyzer
+        self.database = database
+        self.reporter = reporter
+        self.dedup = dedup
+        self.client = client or OpenAIBatchClient(config.openai_api_key, config.openai_api_base, config.request_timeout)
+        self.batch_dir = config.batch_dir                        # Dossier des fichiers JSONL soumis
+        self.max_requests = config.batch_max_requests            # Requêtes maximum par lot
+        self.poll_interval = config.batch_poll_interval          # Pause entre deux consultations (secondes)
+        self.completion_window = config.batch_completion_window  # Délai de traitement demandé à l'API
+        self.max_attempts = max(1, config.batch_max_attempts)   # Soumissions maximales d'une requête en échec
+        self.max_errors = max(1, config.max_retries)             # Erreurs consécutives tolérées pendant l'attente
+        self.logger = setup_logger("BatchAnalyzer", os.path.join(config.logs_dir, 'batch_analyzer.log'))
+        os.makedirs(self.batch_dir, exist_ok=True)
+
+    def enqueue(self, entries):
+        """
+        Enregistre les requêtes d'analyse d'un groupe d'emails.
+
+        Args:
+            entries: Liste de tuples (texte de l'email, métadonnées {"message_id", "sender", "received_at"},
+                     et "dedup_entry" si l'email est dans l'index des quasi-doublons).
+
+        Returns:
+            list: Pour chaque email, les projets en cache si le contenu a déjà été analysé, sinon None.
+        """
+        cache = self.analyzer.cache
+        results, requests = [], []
+        for content, metadata in entries:
+            content = TextUtils.strip_quoted_replies(content)
+            cache_key = cache.make_key(content) if cache else None
+            cached = self.analyzer.cached_projects(cache_key)
+            results.append(cached)
+            if cached is not None:
+                continue  # Contenu déjà analysé : pas de requête
+
+            # Même contenu = même clé : un email déjà soumis n'est pas soumis une seconde fois
+            email_key = FileUtils.calculate_hash(f"{self.analyzer.model}\n{content}")[:32]
+            prompts = self.analyzer.build_prompts(content)
+            for index, prompt in enumerate(prompts, start=1):
+                custom_id = f"{email_key}-{index}"
+                line = {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions",
+                        "body": self.analyzer.build_request_body(prompt)}
+                requests.append(dict(metadata, custom_id=custom_id, email_key=email_key, part_index=index,
+                                     part_count=len(prompts), body=json.dumps(line, ensure_ascii=False),
+                                     cache_key=cache_key))
+
+        if requests:
+            added = self.database.add_batch_requests(requests)
+            self.logger.info(f"{added} requêtes ajoutées au mode batch.")
+        return results
+
+    def run(self):
+        """
+        Soumet les requêtes en attente, puis attend la fin de tous les lots ouverts
+        (y compris ceux des passages précédents) et intègre leurs résultats.
+        """
+        self.save_completed()  # Résultats déjà reçus mais pas encore enregistrés (passage interrompu)
+        self.submit_pending()
+        self.wait()
+
+    def submit_pending(self):
+        """
+        Répartit les requêtes en attente en lots d'au plus batch_max_requests et les soumet.
+
+        Returns:
+            List[int]: Identifiants locaux des lots créés.
+        """
+        jobs = []
+        while True:
+            custom_ids = self.database.get_pending_batch_requests(self.max_requests)
+            if not custom_ids:
+                return jobs
+            job_id = self.database.create_batch_job(custom_ids)
+            jobs.append(job_id)
+            try:
+                self._submit(job_id)
+            except Exception as e:
+                # Le lot reste en base sans identifiant distant : il sera soumis à nouveau par wait()
+                self.logger.error(f"Erreur de soumission du lot {job_id} : {e}")
+
+    def wait(self):
+        """
+        Consulte l'état des lots ouverts jusqu'à ce qu'ils soient tous terminés et intégrés ;
+        les requêtes remises en attente par l'intégration (lot expiré, sortie structurée refusée...)
+        sont soumises dans un nouveau lot.
+
+        En cas d'erreurs répétées (API injoignable...), l'attente s'arrête : les lots
+        restent en base et seront repris au prochain passage.
+        """
+        errors = 0
+        while True:
+            jobs = self.database.get_open_batch_jobs()
+            if not jobs and not self.submit_pending():
+                return
+            jobs = jobs or self.database.get_open_batch_jobs()
+            for job in jobs:
+                try:
+                    self._check(job)
+                    errors = 0
+                except Exception as e:
+                    errors += 1
+                    self.logger.warning(f"Erreur sur le lot {job['id']} ({errors}/{self.max_errors}) : {e}")
+                    if errors >= self.max_errors:
+                        self.logger.error(f"Abandon de l'attente : {len(jobs)} lots seront repris au prochain passage.")
+                        return
+            if self.database.get_open_batch_jobs():
+                time.sleep(self.poll_interval)
+
+    def _submit(self, job_id):
+        """Écrit le fichier JSONL d'un lot, l'envoie et crée le lot côté API."""
+        requests = self.database.get_batch_requests(job_id)
+        data = "".join(self._request_line(request["body"]) + "\n" for request in requests).encode('utf-8')
+        filename = f"batch_{job_id}.jsonl"
+        with open(os.path.join(self.batch_dir, filename), 'wb') as f:
+            f.write(data)  # Copie locale du lot soumis
+
+        input_file_id = self.client.upload_file(filename, data)
+        self.database.update_batch_job(job_id, {"input_file_id": input_file_id})
+        batch = self.client.create_batch(input_file_id, completion_window=self.completion_window)
+        self.database.update_batch_job(job_id, {"batch_id": batch["id"], "status": batch["status"]})
+        self.logger.info(f"Lot {job_id} soumis : {batch['id']} ({len(requests)} requêtes).")
+
+    def _request_line(self, body: str) -> str:
+        """
+        Ligne JSONL d'une requête ; response_format est retiré si le modèle l'a refusé
+        (les requêtes enregistrées avant le refus le contiennent encore).
+        """
+        if self.analyzer.response_format is not None or '"response_format"' not in body:
+            return body
+        line = json.loads(body)
+        line["body"].pop("response_format", None)
+        return json.dumps(line, ensure_ascii=False)
+
+    def _check(self, job):
+        """Consulte l'état d'un lot et intègre ses résultats s'il est terminé."""
+        if not job["batch_id"]:
+            self._submit(job["id"])  # Soumission interrompue lors d'un passage précédent
+            return
+        batch = self.client.get_batch(job["batch_id"])
+        if batch["status"] != job["status"]:
+            self.database.update_batch_job(job["id"], {"status": batch["status"]})
+            self.logger.info(f"Lot {job['id']} ({job['batch_id']}) : {batch['status']}.")
+        if batch["status"] in FINAL_STATUSES:
+            self._ingest(job, batch)
+
+    def _ingest(self, job, batch):
+        """Récupère les résultats d'un lot terminé et enregistre les projets des emails complets."""
+        outcomes = {}
+        for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+            if file_id:
+                outcomes.update(self._read_results(self.client.download_file(file_id)))
+
+        results = []
+        for request in self.database.get_batch_requests(job["id"]):
+            if request["custom_id"] in outcomes:
+                ok, value, status_code = outcomes[request["custom_id"]]
+                if not ok and status_code == 400 and "response_format" in value:
+                    # Sortie structurée refusée par le modèle : nouvelle soumission avec la consigne du prompt seule
+                    if self.analyzer.response_format is not None:
+                        self.logger.warning(f"Sortie structurée refusée par le modèle {self.analyzer.model}, "
+                                            f"JSON demandé par le prompt seul : {value}")
+                        self.analyzer.response_format = None
+                    results.append({"custom_id": request["custom_id"], "status": "pending", "result": None})
+                    continue
+                results.append({"custom_id": request["custom_id"], "status": "done", "result": value} if ok
+                               else self._failure(request, value))
+            elif batch["status"] in RETRY_STATUSES:
+                results.append({"custom_id": request["custom_id"], "status": "pending", "result": None})
+            else:
+                results.append(self._failure(request, "Absent des résultats"))
+        self.database.set_batch_request_results(results)
+
+        failed = sum(1 for result in results if result["status"] == "failed")
+        retried = sum(1 for result in results if result["status"] == "pending")
+        self.logger.info(f"Lot {job['id']} intégré : {len(results) - failed - retried} réussites, "
+                         f"{failed} échecs, {retried} requêtes à soumettre à nouveau.")
+        self.save_completed()
+        self.database.update_batch_job(job["id"], {"status": "ingested", "output_file_id": batch.get("output_file_id"),
+                                                   "error_file_id": batch.get("error_file_id")})
+
+    def _failure(self, request, message) -> dict:
+        """
+        Résultat d'une requête en échec : remise en attente (nouvelle soumission) tant qu'il reste
+        des tentatives, échec définitif ensuite.
+        """
+        if request["attempts"] < self.max_attempts:
+            return {"custom_id": request["custom_id"], "status": "pending", "result": None}
+        return {"custom_id": request["custom_id"], "status": "failed", "result": message}
+
+    @staticmethod
+    def _read_results(data: bytes) -> dict:
+        """
+        Lit un fichier de résultats (ou d'erreurs) de l'API Batch.
+
+        Returns:
+            dict: {custom_id: (True, réponse du modèle, 200) ou (False, message d'erreur, code HTTP)}.
+        """
+        outcomes = {}
+        for line in data.decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            body = response.get("body") or {}
+            if response.get("status_code") == 200 and body.get("choices"):
+                outcomes[entry["custom_id"]] = (True, body["choices"][0]["message"]["content"], 200)
+            else:
+                error = entry.get("error") or body.get("error") or {}
+                outcomes[entry["custom_id"]] = (False, error.get("message") or f"HTTP {response.get('status_code')}",
+                                                response.get("status_code"))
+        return outcomes
+
+    def save_completed(self):
+        """
+        Enregistre les projets des emails dont toutes les parties ont une réponse.
+        Les projets des parties d'un long email sont fusionnés localement (une ligne par projet).
+
+        Une réponse illisible est soumise à nouveau (l'email attend alors le nouveau lot) tant qu'il
+        reste des tentatives ; un email sans aucune partie exploitable après toutes les tentatives
+        est abandonné (statut 'abandoned').
+        """
+        requests = self.database.get_completed_batch_requests()
+        if not requests:
+            return
+
+        email_keys, abandoned, retries, owners, projects, entries = [], [], [], [], [], []
+        for email_key, parts in groupby(requests, key=lambda request: request["email_key"]):
+            parts = list(parts)
+            partials, failures = [], []
+            for part in parts:
+                if part["status"] != "done":
+                    continue
+                prompt = json.loads(part["body"])["body"]["messages"][-1]["content"]
+                try:
+                    partials.append(ProjectParser.parse(part["result"], prompt))
+                except ValueError as e:
+                    self.logger.warning(f"Réponse illisible pour {part['custom_id']} : {e}")
+                    failures.append(self._failure(part, str(e)))
+            if any(failure["status"] == "pending" for failure in failures):
+                retries.extend(failures)
+                continue  # Nouvelle soumission des parties illisibles : l'email sera enregistré ensuite
+            if not partials:
+                # Aucune partie exploitable après toutes les tentatives
+                self.logger.warning(f"Email {parts[0]['message_id'] or email_key} abandonné : "
+                                    f"aucune réponse exploitable après {self.max_attempts} tentatives.")
+                abandoned.append(email_key)
+                entries.append((email_key, parts[0]["dedup_entry"]))
+                continue
+            email_keys.append(email_key)
+            extracted = ProjectParser.merge(partials)
+            self.analyzer.cache_projects(parts[0]["cache_key"], extracted)
+            metadata = {"message_id": parts[0]["message_id"], "sender": parts[0]["sender"],
+                        "received_at": parts[0]["received_at"], "email_hash": email_key}
+            projects.extend(dict(metadata, **project) for project in extracted)
+            owners.extend([email_key] * len(extracted))
+            entries.append((email_key, parts[0]["dedup_entry"]))
+
+        if retries:
+            self.database.set_batch_request_results(retries)
+        records = self.database.save_projects_many(projects) if projects else []
+        self.database.mark_batch_requests(email_keys)
+        self.database.mark_batch_requests(abandoned, "abandoned")
+
+        # Index des quasi-doublons : l'email est rattaché à son premier projet enregistré,
+        # ou retiré s'il n'en a aucun (les emails semblables seront analysés normalement)
+        first_record = {}
+        for email_key, record in zip(owners, records):
+            if record and email_key not in first_record:
+                first_record[email_key] = record["id"]
+        if self.dedup:
+            for email_key, entry_id in entries:
+                if entry_id is None:
+                    continue
+                if email_key in first_record:
+                    self.dedup.set_project(entry_id, first_record[email_key])
+                else:
+                    self.dedup.remove(entry_id)
+
+        if self.reporter:
+            for record in records:
+                if record:
+                    self.reporter.generate_report(record)
@@ -0,0 +1,99 @@
+# --- Importation des modules nécessaires ---
+import json                    # Corps des requêtes et réponses de l'API
+import urllib.error            # Erreurs HTTP renvoyées par l'API
+import urllib.request          # Appels HTTP (la version du client openai utilisée n'expose pas l'API Batch)
+import uuid                    # Séparateur des envois multipart
+
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+
+
+# --- Erreur de l'API Batch ---
+class BatchApiError(Exception):
+    """Erreur renvoyée par l'API (code HTTP et message)."""
+
+    def __init__(self, message: str, http_status: int = None):
+        super().__init__(message)
+        self.http_status = http_status
+
+
+# --- Définition du client de l'API Batch d'OpenAI ---
+class OpenAIBatchClient:
+    def __init__(self, api_key: str, api_base: str = None, timeout: float = 60):
+        """
+        Initialise un client minimal pour les points d'accès /files et /batches.
+
+        Args:
+            api_key (str): Clé API OpenAI.
+            api_base (str): Point d'accès de l'API (None = OpenAI).
+            timeout (float): Délai maximal d'un appel (secondes).
+        """
+        self.api_key = api_key
+        self.api_base = (api_base or DEFAULT_API_BASE).rstrip('/')
+        self.timeout = timeout
+
+    def upload_file(self, filename: str, data: bytes) -> str:
+        """
+        Envoie un fichier JSONL de requêtes (purpose = batch).
+
+        Args:
+            filename (str): Nom du fichier transmis à l'API.
+            data (bytes): Contenu du fichier.
+
+        Returns:
+            str: Identifiant du fichier créé.
+        """
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="purpose"\r\n\r\nbatch\r\n'
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: application/jsonl\r\n\r\n'
+        ).encode('utf-8') + data + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        response = self._request("POST", "/files", body, f"multipart/form-data; boundary={boundary}")
+        return response["id"]
+
+    def create_batch(self, input_file_id: str, endpoint: str = "/v1/chat/completions",
+                     completion_window: str = "24h") -> dict:
+        """
+        Crée un lot de requêtes à partir d'un fichier envoyé.
+
+        Returns:
+            dict: Objet batch (id, status...).
+        """
+        payload = {"input_file_id": input_file_id, "endpoint": endpoint, "completion_window": completion_window}
+        return self._request("POST", "/batches", json.dumps(payload).encode('utf-8'), "application/json")
+
+    def get_batch(self, batch_id: str) -> dict:
+        """
+        Récupère l'état d'un lot.
+
+        Returns:
+            dict: Objet batch (status, output_file_id, error_file_id, request_counts...).
+        """
+        return self._request("GET", f"/batches/{batch_id}")
+
+    def download_file(self, file_id: str) -> bytes:
+        """
+        Télécharge le contenu d'un fichier (résultats ou erreurs d'un lot).
+
+        Returns:
+            bytes: Contenu JSONL du fichier.
+        """
+        return self._request("GET", f"/files/{file_id}/content", raw=True)
+
+    def _request(self, method: str, path: str, body: bytes = None, content_type: str = None, raw: bool = False):
+        """Envoie une requête HTTP à l'API et décode la réponse."""
+        request = urllib.request.Request(self.api_base + path, data=body, method=method)
+        request.add_header("Authorization", f"Bearer {self.api_key}")
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = response.read()
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode('utf-8', errors='replace')
+            try:
+                detail = json.loads(detail)["error"]["message"]
+            except (ValueError, KeyError, TypeError):
+                pass
+            raise BatchApiError(f"{method} {path} : HTTP {e.code} {detail}", e.code) from e
+        return data if raw else json.loads(data)
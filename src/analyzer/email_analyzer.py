@@ -1,7 +1,37 @@
 # --- Importation des modules nécessaires ---
-import openai                    # Utilisé pour interagir avec l'API OpenAI
 from core.logger import setup_logger   # Pour configurer un système de journaux (logs)
+from analyzer.rate_limiter import RateLimiter  # Pour respecter les quotas de l'API (requêtes/tokens par minute)
+from analyzer.response_cache import ResponseCache  # Cache persistant des réponses déjà obtenues
+from analyzer.relevance_filter import RelevanceFilter  # Pré-filtre local des emails sans projet
+from analyzer.project_schema import PROJECT_SCHEMA, ProjectParser  # Sortie structurée : schéma, validation, fusion
+from core.utils import FileUtils, TextUtils  # Empreinte du prompt, découpage et nettoyage du texte
+from core.metrics import metrics  # Durée des appels, tokens et issue des analyses
+from concurrent.futures import ThreadPoolExecutor  # Pour analyser plusieurs emails en parallèle
+import json                      # Projets mis en cache (liste JSON)
 import os                        # Pour la gestion des chemins de fichiers
+import random                    # Pour étaler les nouvelles tentatives (jitter)
+import threading                 # Pour protéger les compteurs partagés entre threads
+import time                      # Pour les pauses entre deux tentatives
+
+# --- Prompt envoyé au modèle ---
+SYSTEM_PROMPT = ("Tu es un assistant pour détecter les projets IT dans un email. "
+                 "Réponds uniquement avec un objet JSON {\"projects\": [...]}, un élément par projet, avec les champs "
+                 "title, client, technologies (liste), budget_min, budget_max, budget_currency (code ISO), "
+                 "budget_period (day, month, year ou total), start_date (AAAA-MM-JJ), duration_months, location "
+                 "et contact (adresse email) ; null si l'information est absente. "
+                 "Liste vide si l'email ne contient aucun projet.")
+USER_PROMPT = "Voici l'email:\n{content}\nExtrais les projets."
+CHUNK_PROMPT = "Voici la partie {index}/{total} d'un long email:\n{content}\nExtrais les projets de cette partie."
+MAX_TOKENS = 1000  # Limite du nombre de tokens générés (un email peut contenir plusieurs projets)
+CHARS_PER_TOKEN = 4  # Estimation grossière de la taille d'un token
+# Toute modification des prompts ou du schéma change cette empreinte et invalide le cache des réponses
+PROMPT_VERSION = FileUtils.calculate_hash(
+    f"{SYSTEM_PROMPT}\n{USER_PROMPT}\n{CHUNK_PROMPT}\n{MAX_TOKENS}\n{json.dumps(PROJECT_SCHEMA, sort_keys=True)}")[:16]
+# Paramètre response_format de l'API selon la clé "structured_output" ("none" : consigne du prompt seule)
+RESPONSE_FORMATS = {
+    "json_schema": {"type": "json_schema", "json_schema": {"name": "projects", "strict": True, "schema": PROJECT_SCHEMA}},
+    "json_object": {"type": "json_object"},
+}
 
 # --- Définition de la classe pour analyser les emails avec l'IA ---
 class EmailAnalyzer:
@@ -12,54 +42,385 @@ class EmailAnalyzer:
         Args:
             config: Objet contenant la configuration générale du projet.
         """
-        openai.api_key = config.openai_api_key          # Configure la clé API OpenAI
+        self.api_key = config.openai_api_key            # Clé API OpenAI
+        self.api_base = config.openai_api_base          # Point d'accès alternatif (ex : serveur local de test)
+        self._openai = None                             # Module openai, importé au premier appel (voir _client)
         self.model = config.gpt_model                   # Modèle IA à utiliser (ex: GPT-4)
-        self.confidence_threshold = config.confidence_threshold  # Seuil minimal de confiance pour les réponses (non utilisé ici mais disponible)
+        self.response_format = RESPONSE_FORMATS.get(config.structured_output)  # Sortie JSON imposée par l'API
+        self.confidence_threshold = config.confidence_threshold  # Score minimal du pré-filtre pour envoyer un email à l'IA
         self.logger = setup_logger("EmailAnalyzer", os.path.join(config.logs_dir, 'email_analyzer.log'))  # Mise en place du logger spécifique
 
+        # --- Paramètres du moteur d'analyse concurrent ---
+        self.concurrency = max(1, config.analysis_concurrency)   # Nombre d'appels simultanés à l'API
+        self.request_timeout = config.request_timeout            # Délai maximal d'un appel (secondes)
+        self.max_retries = config.max_retries                    # Nouvelles tentatives sur 429/5xx/timeout
+        self.retry_base_delay = config.retry_base_delay          # Délai initial du backoff exponentiel (secondes)
+        self.rate_limiter = RateLimiter(config.requests_per_minute, config.tokens_per_minute)
+
+        # --- Découpage des emails longs (analyse par morceaux puis fusion) ---
+        self.chunk_chars = max(1, config.max_chunk_tokens) * CHARS_PER_TOKEN  # Taille maximale d'un morceau
+        self._chunk_executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="chunk")
+
+        # --- Compteurs (partagés entre threads) ---
+        self._lock = threading.Lock()
+        self.tokens_used = 0    # Tokens réellement facturés (d'après la réponse de l'API)
+        self.failures = 0       # Emails dont l'analyse a échoué
+
+        # --- Pré-filtre de pertinence (mots-clés + entêtes), avant tout appel à l'API ---
+        self.relevance_filter = None
+        if config.relevance_filter_enabled:
+            self.relevance_filter = RelevanceFilter(self.confidence_threshold, config.relevance_keywords)
+
+        # --- Cache des réponses (clé : corps normalisé + modèle + version du prompt) ---
+        self.cache = None
+        if config.cache_enabled:
+            # La taille des morceaux change les réponses : elle fait partie de la version
+            self.cache = ResponseCache(config.cache_path or config.database_path, self.model,
+                                       f"{PROMPT_VERSION}-{config.max_chunk_tokens}",
+                                       config.cache_ttl_seconds, config.cache_max_entries, self.logger)
+
     def analyze_emails(self, emails):
         """
         Analyse une liste d'emails pour détecter et extraire des projets IT.
 
+        Les appels à l'API sont faits en parallèle (analysis_concurrency threads),
+        dans la limite des quotas requests_per_minute / tokens_per_minute.
+
         Args:
             emails: Liste d'objets email récupérés.
 
         Returns:
-            List[str]: Liste des projets extraits sous forme de texte.
-        """
-        analyzed_projects = []  # Liste pour stocker les projets extraits
-
-        for msg in emails:
-            # --- Récupération du contenu texte brut de l'email ---
-            if msg.is_multipart():
-                # Si l'email contient plusieurs parties (ex: texte et pièce jointe)
-                content = ""
-                for part in msg.walk():
-                    content_type = part.get_content_type()
-                    if content_type == "text/plain":  # On prend uniquement la partie texte
-                        content += part.get_payload(decode=True).decode()
+            List[dict]: Projets extraits (champs de PROJECT_FIELDS), dans l'ordre des emails.
+        """
+        if not emails:
+            return []
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="analyze") as executor:
+            results = list(executor.map(self.analyze_email, emails))
+
+        self.log_filter_stats()
+        if self.cache:
+            stats = self.cache.stats()
+            self.logger.info(f"Cache des réponses : {stats['hits']} succès, {stats['misses']} absences, {stats['entries']} entrées.")
+        return [project for result in results if result for project in result]  # Retourne la liste des projets extraits
+
+    def analyze_email(self, msg):
+        """
+        Analyse un seul email.
+
+        Args:
+            msg: Objet email récupéré.
+
+        Returns:
+            List[dict]: Projets extraits (vide si l'email n'en contient pas), ou None en cas d'erreur.
+        """
+        try:
+            content = self.extract_content(msg)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            self.logger.error(f"Erreur de lecture de l'email : {e}")
+            return None
+        if not self.is_relevant(msg, content):
+            return []  # Aucun projet probable : pas d'appel à l'API
+        return self.analyze_content(content)
+
+    def is_relevant(self, msg, content):
+        """
+        Indique si un email mérite une analyse IA (toujours vrai si le pré-filtre est désactivé).
+        Les emails écartés sont comptés dans la métrique emails_skipped_total.
+
+        Args:
+            msg: Objet email récupéré.
+            content (str): Texte de l'email.
+
+        Returns:
+            bool: True si l'email doit être analysé.
+        """
+        if self.relevance_filter is None or self.relevance_filter.is_relevant(msg, content):
+            return True
+        metrics.inc("emails_skipped_total")
+        return False
+
+    def close(self):
+        """
+        Arrête les threads d'analyse des morceaux d'emails longs et ferme le cache des réponses.
+        """
+        self._chunk_executor.shutdown(wait=True)
+        if self.cache:
+            self.cache.close()
+
+    def log_filter_stats(self):
+        """
+        Trace le nombre d'emails écartés par le pré-filtre de pertinence.
+        """
+        if self.relevance_filter:
+            self.logger.info(f"Pré-filtre de pertinence : {self.relevance_filter.skipped} emails écartés, "
+                             f"{self.relevance_filter.accepted} envoyés à l'analyse.")
+
+    def analyze_content(self, content):
+        """
+        Analyse le texte d'un email (réponse en cache si le même contenu a déjà été analysé).
+
+        L'historique cité des réponses est retiré ; un texte plus long que max_chunk_tokens
+        est découpé, les morceaux sont analysés en parallèle puis leurs projets fusionnés localement.
+        La réponse JSON du modèle est validée (ProjectParser) : champs typés, contact présent dans le texte.
+
+        Args:
+            content (str): Texte de l'email.
+
+        Returns:
+            List[dict]: Projets extraits (vide si l'email n'en contient pas), ou None en cas d'erreur.
+        """
+        try:
+            content = TextUtils.strip_quoted_replies(content)
+            cache_key = self.cache.make_key(content) if self.cache else None
+            projects = self.cached_projects(cache_key)
+            if projects is not None:
+                metrics.inc("emails_cached_total")
+                return projects  # Contenu déjà analysé : pas d'appel à l'API
+
+            prompts = self.build_prompts(content)
+            if len(prompts) == 1:
+                projects = ProjectParser.parse(self._call_model(prompts[0]), content)
             else:
-                # Si l'email est simple (non multipart)
-                content = msg.get_payload(decode=True).decode()
+                projects = self._analyze_chunks(prompts, content)
+            self.cache_projects(cache_key, projects)
+            metrics.inc("projects_extracted_total", len(projects))
+            self.logger.debug("Projets analysés : %s", projects)  # Détail volumineux : niveau DEBUG, échantillonnable
+            return projects
+        except Exception as e:
+            # --- Gestion des erreurs ---
+            with self._lock:
+                self.failures += 1
+            metrics.inc("emails_failed_total")
+            self.logger.error(f"Erreur d'analyse : {e}")
+            return None
+
+    def cached_projects(self, cache_key):
+        """
+        Cherche les projets déjà extraits d'un contenu.
+
+        Args:
+            cache_key (str): Clé calculée par ResponseCache.make_key (None si le cache est désactivé).
+
+        Returns:
+            List[dict]: Projets mémorisés, ou None si le contenu n'a pas encore été analysé.
+        """
+        if not self.cache or cache_key is None:
+            return None
+        cached = self.cache.get(cache_key)
+        return json.loads(cached) if cached is not None else None
+
+    def cache_projects(self, cache_key, projects):
+        """
+        Mémorise les projets extraits d'un contenu (sans effet si le cache est désactivé).
+        """
+        if self.cache and cache_key is not None:
+            self.cache.put(cache_key, json.dumps(projects, ensure_ascii=False))
+
+    def build_prompts(self, content):
+        """
+        Prépare le ou les messages utilisateur à envoyer pour un texte d'email.
+
+        Args:
+            content (str): Texte de l'email (historique cité déjà retiré).
+
+        Returns:
+            List[str]: Un seul prompt, ou un prompt par morceau si le texte dépasse chunk_chars.
+        """
+        if len(content) <= self.chunk_chars:
+            return [USER_PROMPT.format(content=content)]
+        chunks = TextUtils.chunk_text(content, self.chunk_chars)
+        return [CHUNK_PROMPT.format(index=index, total=len(chunks), content=chunk)
+                for index, chunk in enumerate(chunks, start=1)]
 
+    def build_request_body(self, prompt):
+        """
+        Construit les paramètres d'un appel chat completion (partagés avec le mode batch).
+
+        Args:
+            prompt (str): Message utilisateur.
+
+        Returns:
+            dict: {"model", "messages", "temperature", "max_tokens"} et "response_format" (sortie JSON).
+        """
+        body = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.2,  # Faible température = réponses précises et contrôlées
+            "max_tokens": MAX_TOKENS,
+        }
+        if self.response_format:
+            body["response_format"] = self.response_format
+        return body
+
+    def _analyze_chunks(self, prompts, content):
+        """
+        Analyse un long texte en plusieurs morceaux, puis fusionne localement leurs projets.
+
+        Args:
+            prompts (List[str]): Prompts des morceaux, produits par build_prompts.
+            content (str): Texte complet de l'email (vérification des adresses de contact).
+
+        Returns:
+            List[dict]: Projets extraits de l'ensemble des morceaux.
+
+        Raises:
+            RuntimeError: Si l'analyse de tous les morceaux a échoué.
+        """
+        total = len(prompts)
+        futures = [self._chunk_executor.submit(self._call_model, prompt) for prompt in prompts]
+
+        partials = []
+        for index, future in enumerate(futures, start=1):
             try:
-                # --- Analyse du contenu de l'email par OpenAI ---
-                response = openai.ChatCompletion.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "Tu es un assistant pour détecter les projets IT dans un email."},
-                        {"role": "user", "content": f"Voici l'email:\n{content}\nExtrais les projets."}
-                    ],
-                    temperature=0.2,  # Faible température = réponses précises et contrôlées
-                    max_tokens=500    # Limite du nombre de mots générés
-                )
-                # --- Récupération et stockage du résultat ---
-                result = response['choices'][0]['message']['content']
-                self.logger.info(f"Projet analysé : {result}")
-                analyzed_projects.append(result)
+                partials.append(ProjectParser.parse(future.result(), content))
+            except Exception as e:
+                self.logger.warning(f"Échec de l'analyse de la partie {index}/{total} : {e}")
+        if not partials:
+            raise RuntimeError(f"Échec de l'analyse des {total} parties de l'email.")
+        return ProjectParser.merge(partials)
+
+    def extract_content(self, msg):
+        """
+        Récupère le contenu texte brut d'un email.
+
+        Chaque partie est décodée avec son charset déclaré (repli sur UTF-8, Windows-1252 puis Latin-1).
+
+        Args:
+            msg: Objet email récupéré.
+
+        Returns:
+            str: Texte de l'email.
+        """
+        if msg.is_multipart():
+            # Si l'email contient plusieurs parties (ex: texte et pièce jointe) : uniquement le texte, hors pièces jointes
+            parts = [
+                TextUtils.decode_bytes(part.get_payload(decode=True), part.get_content_charset())
+                for part in msg.walk()
+                if part.get_content_type() == "text/plain" and part.get_content_disposition() != "attachment"
+            ]
+            return "\n".join(parts)
+        # Si l'email est simple (non multipart)
+        return TextUtils.decode_bytes(msg.get_payload(decode=True), msg.get_content_charset())
+
+    def _call_model(self, prompt):
+        """
+        Envoie un prompt au modèle, avec limitation de débit et backoff exponentiel.
+
+        Args:
+            prompt (str): Message utilisateur (prompt déjà rempli avec le texte de l'email).
+
+        Returns:
+            str: Réponse du modèle.
 
+        Raises:
+            Exception: La dernière erreur de l'API si elle n'est pas temporaire ou si les tentatives sont épuisées.
+        """
+        body = self.build_request_body(prompt)
+        # Estimation grossière : ~4 caractères par token, plus la réponse maximale
+        estimated_tokens = sum(len(m["content"]) for m in body["messages"]) // CHARS_PER_TOKEN + MAX_TOKENS
+
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(estimated_tokens)
+            start = time.perf_counter()
+            try:
+                # --- Analyse du contenu de l'email par OpenAI ---
+                response = self._client().ChatCompletion.create(request_timeout=self.request_timeout, **body)
+                metrics.observe("llm_request_seconds", time.perf_counter() - start)
+                metrics.inc("llm_requests_total", labels={"outcome": "ok"})
+                break
             except Exception as e:
-                # --- Gestion des erreurs ---
-                self.logger.error(f"Erreur d'analyse : {e}")
+                metrics.observe("llm_request_seconds", time.perf_counter() - start)
+                metrics.inc("llm_requests_total", labels={"outcome": "error"})
+                if "response_format" in body and self._is_format_unsupported(e):
+                    # Modèle sans sortie structurée : la consigne du prompt suffit, la réponse reste validée
+                    self.logger.warning(f"Sortie structurée refusée par le modèle {self.model}, "
+                                        f"JSON demandé par le prompt seul : {e}")
+                    self.response_format = None
+                    body.pop("response_format")
+                    continue
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                metrics.inc("llm_retries_total")
+                delay = self._retry_delay(e, attempt)
+                self.logger.warning(f"Erreur temporaire de l'API ({e}), nouvelle tentative dans {delay:.1f}s.")
+                time.sleep(delay)
+                attempt += 1
+
+        usage = response.get('usage') or {}
+        with self._lock:
+            self.tokens_used += usage.get('total_tokens', 0)
+        metrics.inc("llm_tokens_total", usage.get('prompt_tokens', 0), {"kind": "prompt"})
+        metrics.inc("llm_tokens_total", usage.get('completion_tokens', 0), {"kind": "completion"})
+        # --- Récupération du résultat ---
+        choice = response['choices'][0]
+        if choice.get('finish_reason') == 'length':
+            self.logger.warning(f"Réponse tronquée par la limite de {MAX_TOKENS} tokens.")
+        return choice['message']['content']
+
+    def _client(self):
+        """
+        Importe et configure le module openai au premier appel à l'API.
+
+        L'import coûte plusieurs centaines de millisecondes : un passage sans nouvel email
+        à analyser (ou le mode batch, qui n'utilise pas ce client) n'en paie pas le prix.
+        """
+        if self._openai is None:
+            import openai  # Import différé
+            openai.api_key = self.api_key
+            if self.api_base:
+                openai.api_base = self.api_base
+            self._openai = openai
+        return self._openai
+
+    @staticmethod
+    def _is_format_unsupported(error) -> bool:
+        """
+        Indique si l'API a refusé le paramètre response_format (modèle sans sortie structurée).
+        """
+        status = getattr(error, 'http_status', None) or getattr(error, 'status_code', None)
+        return status == 400 and "response_format" in str(error)
+
+    @staticmethod
+    def _is_retryable(error) -> bool:
+        """
+        Indique si une erreur de l'API est temporaire (429, 5xx, timeout, coupure réseau).
+
+        Args:
+            error: Exception levée par le client OpenAI.
+
+        Returns:
+            bool: True si une nouvelle tentative a un sens.
+        """
+        status = getattr(error, 'http_status', None) or getattr(error, 'status_code', None)
+        if status:
+            return status == 429 or status >= 500
+        return type(error).__name__ in ("Timeout", "APITimeoutError", "APIConnectionError",
+                                        "ServiceUnavailableError", "TryAgain")
+
+    def _retry_delay(self, error, attempt: int) -> float:
+        """
+        Calcule la pause avant la prochaine tentative : en-tête Retry-After si présent,
+        sinon backoff exponentiel avec jitter.
 
-        return analyzed_projects  # Retourne la liste des projets extraits
+        Args:
+            error: Exception levée par le client OpenAI.
+            attempt (int): Numéro de la tentative qui vient d'échouer (0 pour la première).
+
+        Returns:
+            float: Pause en secondes.
+        """
+        headers = getattr(error, 'headers', None) or {}
+        try:
+            retry_after = float(headers.get('Retry-After') or headers.get('retry-after'))
+            return max(retry_after, 0.0)
+        except (TypeError, ValueError, AttributeError):
+            pass
+        delay = self.retry_base_delay * (2 ** attempt)
+        return delay + random.uniform(0, delay / 2)
@@ -0,0 +1,214 @@
+# --- Importation des modules nécessaires ---
+import hashlib                  # Clé d'un groupe de valeurs (bande LSH)
+import random                   # Coefficients des fonctions de hachage (graine fixe)
+import sqlite3                  # Index persistant, dans le même fichier que la base des projets
+import threading                # L'index est partagé par les étapes du pipeline
+import zlib                     # Empreinte rapide (CRC32) de chaque shingle
+from array import array         # Signature compacte (entiers 32 bits), stockée telle quelle en base
+from typing import Optional
+from core.utils import TextUtils  # Normalisation du texte (minuscules, sans accents ni ponctuation)
+
+_PRIME = 4294967291             # Plus grand nombre premier < 2^32 : fonctions (a * x + b) mod p, valeurs sur 32 bits
+_SEED = 20240601                # Graine fixe : les signatures restent comparables d'un passage à l'autre
+
+
+# --- Définition de l'index des quasi-doublons (MinHash + LSH) ---
+class NearDuplicateIndex:
+    def __init__(self, db_path: str, threshold: float = 0.8, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 3, logger=None):
+        """
+        Initialise un index MinHash/LSH des emails déjà analysés, pour repérer les quasi-doublons
+        (même demande envoyée par plusieurs recruteurs, annonce republiée avec quelques modifications).
+
+        Le texte normalisé est découpé en shingles (suites de shingle_size mots) ; la signature MinHash
+        (num_perm valeurs) estime la similarité de Jaccard entre deux emails. La signature est découpée
+        en `bands` bandes : deux emails qui partagent une bande sont candidats, et seuls les candidats
+        sont comparés. Une recherche ne lit donc que quelques lignes, quelle que soit la taille de l'index.
+
+        Un changement de num_perm, bands ou shingle_size vide l'index (signatures incompatibles).
+
+        Args:
+            db_path (str): Chemin du fichier SQLite (celui de la base des projets).
+            threshold (float): Similarité estimée minimale (entre 0 et 1) pour un quasi-doublon.
+            num_perm (int): Nombre de valeurs de la signature (précision de l'estimation).
+            bands (int): Nombre de bandes LSH (diviseur de num_perm) ; plus de bandes = plus de candidats.
+            shingle_size (int): Nombre de mots par shingle.
+            logger: Logger où tracer les opérations de maintenance.
+        """
+        if num_perm % bands:
+            raise ValueError(f"dedup_num_perm ({num_perm}) doit être un multiple de dedup_bands ({bands}).")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands   # Valeurs par bande
+        self.shingle_size = max(1, shingle_size)
+        self.params = f"{num_perm}-{bands}-{self.shingle_size}-{_SEED}"
+        self.logger = logger
+
+        rng = random.Random(_SEED)
+        self._coefficients = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._create_tables()
+        self._invalidate_other_params()
+
+    def _create_tables(self):
+        """
+        Crée les tables 'minhash_entries' (une signature par email, et le projet qui en est issu)
+        et 'minhash_buckets' (clé de chaque bande -> emails), ainsi que 'minhash_meta' (paramètres).
+        """
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS minhash_entries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project_id INTEGER,
+                    signature BLOB NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS minhash_buckets (
+                    bucket INTEGER NOT NULL,
+                    entry_id INTEGER NOT NULL,
+                    PRIMARY KEY (bucket, entry_id)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_minhash_buckets_entry ON minhash_buckets (entry_id)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS minhash_meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.commit()
+
+    def _invalidate_other_params(self):
+        """
+        Vide l'index s'il a été construit avec d'autres paramètres.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM minhash_meta WHERE key='params'").fetchone()
+            cleared = 0
+            if row and row[0] != self.params:
+                cleared = self._conn.execute("DELETE FROM minhash_entries").rowcount
+                self._conn.execute("DELETE FROM minhash_buckets")
+            self._conn.execute("INSERT OR REPLACE INTO minhash_meta (key, value) VALUES ('params', ?)", (self.params,))
+            self._conn.commit()
+        if cleared and self.logger:
+            self.logger.info(f"Index des quasi-doublons : {cleared} signatures supprimées (paramètres modifiés).")
+
+    def signature(self, text: str) -> Optional[array]:
+        """
+        Calcule la signature MinHash d'un texte.
+
+        Args:
+            text (str): Texte brut de l'email (normalisé ici).
+
+        Returns:
+            array: num_perm entiers 32 bits, ou None si le texte est vide.
+        """
+        words = TextUtils.normalize_text(text).split()
+        if not words:
+            return None
+        size = min(self.shingle_size, len(words))
+        hashes = list({zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+                       for i in range(len(words) - size + 1)})
+        return array('I', [min([(a * h + b) % _PRIME for h in hashes]) for a, b in self._coefficients])
+
+    def _buckets(self, signature: array) -> list:
+        """Clé (entier 64 bits signé) de chaque bande de la signature ; le numéro de bande fait partie de la clé."""
+        keys = []
+        for band in range(self.bands):
+            data = band.to_bytes(2, 'big') + signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            keys.append(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big', signed=True))
+        return keys
+
+    def find(self, signature: Optional[array]) -> Optional[dict]:
+        """
+        Cherche l'email indexé le plus proche d'une signature.
+
+        Args:
+            signature: Signature calculée par signature() (None = texte vide, jamais un doublon).
+
+        Returns:
+            dict: {"entry_id", "project_id", "similarity"} du meilleur candidat au-dessus du seuil,
+            ou None. project_id est None tant que le projet de cet email n'est pas enregistré.
+        """
+        if signature is None:
+            return None
+        buckets = self._buckets(signature)
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT id, project_id, signature FROM minhash_entries WHERE id IN (
+                    SELECT entry_id FROM minhash_buckets WHERE bucket IN ({','.join('?' * len(buckets))})
+                )
+            """, buckets).fetchall()
+
+        best = None
+        for entry_id, project_id, data in rows:
+            other = array('I')
+            other.frombytes(data)
+            similarity = sum(x == y for x, y in zip(signature, other)) / self.num_perm
+            if similarity >= self.threshold and (best is None or similarity > best["similarity"]):
+                best = {"entry_id": entry_id, "project_id": project_id, "similarity": similarity}
+        return best
+
+    def add(self, signature: Optional[array], project_id: int = None) -> Optional[int]:
+        """
+        Ajoute une signature à l'index.
+
+        Args:
+            signature: Signature calculée par signature().
+            project_id (int): Projet issu de cet email, s'il est déjà connu (voir set_project).
+
+        Returns:
+            int: Identifiant de l'entrée, ou None si la signature est vide.
+        """
+        if signature is None:
+            return None
+        buckets = self._buckets(signature)
+        with self._lock:
+            cursor = self._conn.execute("INSERT INTO minhash_entries (project_id, signature) VALUES (?, ?)",
+                                        (project_id, signature.tobytes()))
+            entry_id = cursor.lastrowid
+            self._conn.executemany("INSERT OR IGNORE INTO minhash_buckets (bucket, entry_id) VALUES (?, ?)",
+                                   [(bucket, entry_id) for bucket in buckets])
+            self._conn.commit()
+        return entry_id
+
+    def set_project(self, entry_id: int, project_id: int):
+        """
+        Rattache une entrée au projet enregistré pour cet email.
+        """
+        with self._lock:
+            self._conn.execute("UPDATE minhash_entries SET project_id=? WHERE id=?", (project_id, entry_id))
+            self._conn.commit()
+
+    def get_project(self, entry_id: int) -> Optional[int]:
+        """
+        Returns:
+            int: Projet rattaché à une entrée, ou None (projet pas encore enregistré, ou entrée supprimée).
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT project_id FROM minhash_entries WHERE id=?", (entry_id,)).fetchone()
+        return row[0] if row else None
+
+    def remove(self, entry_id: int):
+        """
+        Retire une entrée (email dont l'analyse n'a produit aucun projet) : les emails semblables
+        qui arriveront ensuite seront analysés normalement.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM minhash_buckets WHERE entry_id=?", (entry_id,))
+            self._conn.execute("DELETE FROM minhash_entries WHERE id=?", (entry_id,))
+            self._conn.commit()
+
+    def count(self) -> int:
+        """
+        Returns:
+            int: Nombre d'emails indexés.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM minhash_entries").fetchone()[0]
+
+    def close(self):
+        """
+        Ferme la connexion à la base de l'index.
+        """
+        with self._lock:
+            self._conn.close()
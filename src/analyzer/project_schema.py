@@ -0,0 +1,247 @@
+# --- Importation des modules nécessaires ---
+import json                     # Réponse du modèle (JSON) et schéma envoyé à l'API
+import re                       # Lecture des dates, montants et blocs de code
+from typing import List, Optional
+from core.utils import TextUtils  # Adresses emails du texte, normalisation des titres
+
+# --- Champs d'un projet extrait et type de la colonne correspondante en base ---
+PROJECT_FIELDS = {
+    "title": "TEXT",            # Intitulé de la mission
+    "client": "TEXT",           # Client final (ou secteur) s'il est indiqué
+    "technologies": "TEXT",     # Liste JSON des technologies demandées
+    "budget_min": "REAL",       # Budget ou TJM minimal
+    "budget_max": "REAL",       # Budget ou TJM maximal (égal au minimum pour un montant unique)
+    "budget_currency": "TEXT",  # Devise (code ISO : EUR, USD...)
+    "budget_period": "TEXT",    # "day", "month", "year" ou "total"
+    "start_date": "TEXT",       # Date de démarrage (AAAA-MM-JJ ou AAAA-MM)
+    "duration_months": "REAL",  # Durée de la mission en mois
+    "location": "TEXT",         # Lieu (ville, télétravail...)
+    "contact": "TEXT",          # Adresse email de contact (présente dans l'email)
+}
+
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_NULLABLE_NUMBER = {"type": ["number", "null"]}
+
+# --- Schéma JSON de la réponse attendue (sortie structurée de l'API) ---
+PROJECT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "projects": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "client": _NULLABLE_STRING,
+                    "technologies": {"type": "array", "items": {"type": "string"}},
+                    "budget_min": _NULLABLE_NUMBER,
+                    "budget_max": _NULLABLE_NUMBER,
+                    "budget_currency": _NULLABLE_STRING,
+                    "budget_period": {"type": ["string", "null"], "enum": ["day", "month", "year", "total", None]},
+                    "start_date": _NULLABLE_STRING,
+                    "duration_months": _NULLABLE_NUMBER,
+                    "location": _NULLABLE_STRING,
+                    "contact": _NULLABLE_STRING,
+                },
+                "required": list(PROJECT_FIELDS),
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["projects"],
+    "additionalProperties": False,
+}
+
+_PERIODS = {"day": "day", "jour": "day", "daily": "day", "month": "month", "mois": "month", "monthly": "month",
+            "year": "year", "an": "year", "annee": "year", "yearly": "year", "annual": "year", "total": "total"}
+_CURRENCIES = {"€": "EUR", "euro": "EUR", "euros": "EUR", "$": "USD", "£": "GBP", "chf": "CHF"}
+_DATE_RE = re.compile(r'^\d{4}-(0[1-9]|1[0-2])(-(0[1-9]|[12]\d|3[01]))?$')
+_FENCE_RE = re.compile(r'^```[a-z]*\s*|\s*```$', re.IGNORECASE)
+_MAX_TEXT = 300          # Longueur maximale d'un champ texte
+_MAX_TECHNOLOGIES = 30   # Technologies conservées au maximum par projet
+
+# Libellés du texte lisible d'un projet (colonne content : rapports texte, recherche plein texte)
+_LABELS = [("title", "Projet"), ("client", "Client"), ("technologies", "Technologies"), ("budget", "Budget"),
+           ("start_date", "Démarrage"), ("duration_months", "Durée"), ("location", "Lieu"), ("contact", "Contact")]
+_PERIOD_LABELS = {"day": " / jour", "month": " / mois", "year": " / an", "total": ""}
+
+
+# --- Lecture, validation et fusion des projets renvoyés par le modèle ---
+class ProjectParser:
+    """Transforme la réponse JSON du modèle en projets validés (un dictionnaire par projet, champs de PROJECT_FIELDS)."""
+
+    @staticmethod
+    def parse(response: str, content: str = "") -> List[dict]:
+        """
+        Lit et valide la réponse du modèle.
+
+        Les projets sans titre sont écartés ; les autres champs invalides sont remplacés par None.
+
+        Args:
+            response (str): Réponse du modèle ({"projects": [...]}, éventuellement dans un bloc de code).
+            content (str): Texte analysé, pour vérifier l'adresse de contact.
+
+        Returns:
+            List[dict]: Projets validés (liste vide si l'email n'en contient aucun).
+
+        Raises:
+            ValueError: Si la réponse n'est pas un JSON de la forme attendue.
+        """
+        text = _FENCE_RE.sub('', (response or '').strip())
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            # Texte autour du JSON (modèle sans sortie structurée) : on garde l'objet le plus large
+            start, end = text.find('{'), text.rfind('}')
+            if start < 0 or end < start:
+                raise ValueError(f"Réponse du modèle sans JSON : {text[:100]!r}")
+            try:
+                data = json.loads(text[start:end + 1])
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON invalide dans la réponse du modèle : {e}")
+
+        projects = data.get("projects") if isinstance(data, dict) else data
+        if not isinstance(projects, list):
+            raise ValueError("Réponse du modèle sans liste \"projects\".")
+        emails = [address.lower() for address in TextUtils.extract_emails(content)]
+        validated = (ProjectParser.validate(project, set(emails), emails[0] if emails else None) for project in projects)
+        return [project for project in validated if project]
+
+    @staticmethod
+    def validate(raw, emails: set = frozenset(), default_contact: Optional[str] = None) -> Optional[dict]:
+        """
+        Valide un projet et convertit chaque champ dans son type.
+
+        Args:
+            raw: Projet tel que renvoyé par le modèle.
+            emails (set): Adresses présentes dans l'email (en minuscules) ; un contact absent du texte est ignoré.
+            default_contact (str): Contact utilisé si le modèle n'en donne pas de valide.
+
+        Returns:
+            dict: Projet validé (toutes les clés de PROJECT_FIELDS), ou None sans titre.
+        """
+        if not isinstance(raw, dict):
+            return None
+        title = _text(raw.get("title"))
+        if not title:
+            return None
+
+        budget_min, budget_max = _number(raw.get("budget_min")), _number(raw.get("budget_max"))
+        if budget_min is None or budget_max is None:
+            budget_min = budget_max = budget_min if budget_max is None else budget_max
+        elif budget_min > budget_max:
+            budget_min, budget_max = budget_max, budget_min
+
+        contact = (_text(raw.get("contact")) or "").lower()
+        if contact not in emails:
+            contact = default_contact  # Adresse inventée ou absente : celle trouvée dans le texte
+
+        return {
+            "title": title,
+            "client": _text(raw.get("client")),
+            "technologies": _technologies(raw.get("technologies")),
+            "budget_min": budget_min,
+            "budget_max": budget_max,
+            "budget_currency": _currency(raw.get("budget_currency")),
+            "budget_period": _PERIODS.get(TextUtils.normalize_text(str(raw.get("budget_period") or ""))),
+            "start_date": _text(raw.get("start_date")) if _DATE_RE.match(str(raw.get("start_date") or "")) else None,
+            "duration_months": _number(raw.get("duration_months")),
+            "location": _text(raw.get("location")),
+            "contact": contact or None,
+        }
+
+    @staticmethod
+    def merge(project_lists: List[List[dict]]) -> List[dict]:
+        """
+        Fusionne localement les projets extraits des morceaux d'un long email (sans appel au modèle).
+
+        Les projets de même titre (normalisé) sont regroupés : les champs vides sont complétés
+        par les morceaux suivants et les technologies sont réunies.
+
+        Args:
+            project_lists: Projets validés de chaque morceau, dans l'ordre du texte.
+
+        Returns:
+            List[dict]: Projets fusionnés, dans l'ordre de première apparition.
+        """
+        merged = {}
+        for projects in project_lists:
+            for project in projects:
+                key = TextUtils.normalize_text(project["title"])
+                if key not in merged:
+                    merged[key] = dict(project, technologies=list(project["technologies"]))
+                    continue
+                current = merged[key]
+                for field, value in project.items():
+                    if field == "technologies":
+                        current[field] = _technologies(current[field] + value)
+                    elif current.get(field) is None:
+                        current[field] = value
+        return list(merged.values())
+
+    @staticmethod
+    def render(project: dict) -> str:
+        """
+        Texte lisible d'un projet (rapports texte et recherche plein texte).
+
+        Args:
+            project (dict): Projet validé.
+
+        Returns:
+            str: Une ligne « Libellé : valeur » par champ renseigné.
+        """
+        values = dict(project)
+        values["technologies"] = ", ".join(project.get("technologies") or []) or None
+        if project.get("budget_min") is not None:
+            amount = f"{project['budget_min']:g}"
+            if project.get("budget_max") not in (None, project["budget_min"]):
+                amount += f" - {project['budget_max']:g}"
+            values["budget"] = (f"{amount} {project.get('budget_currency') or ''}".rstrip()
+                                + _PERIOD_LABELS.get(project.get("budget_period"), ""))
+        if project.get("duration_months") is not None:
+            values["duration_months"] = f"{project['duration_months']:g} mois"
+        return "\n".join(f"{label} : {values[field]}" for field, label in _LABELS if values.get(field) is not None)
+
+
+# --- Conversions de champs ---
+def _text(value) -> Optional[str]:
+    """Chaîne nettoyée (espaces réduits, longueur bornée), ou None si vide."""
+    if value is None or isinstance(value, (dict, list, bool)):
+        return None
+    text = " ".join(str(value).split())[:_MAX_TEXT]
+    return text or None
+
+
+def _number(value) -> Optional[float]:
+    """Nombre positif ("1 200,5" accepté), ou None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.replace(" ", "").replace(" ", "").replace(",", ".")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 0 and number == number else None  # number == number écarte NaN
+
+
+def _currency(value) -> Optional[str]:
+    """Code ISO de la devise (€ -> EUR), ou None."""
+    text = (_text(value) or "").strip()
+    code = _CURRENCIES.get(text.lower(), text.upper())
+    return code if re.fullmatch(r'[A-Z]{3}', code) else None
+
+
+def _technologies(value) -> List[str]:
+    """Liste de technologies sans doublons (majuscules ignorées), dans l'ordre d'apparition."""
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return []
+    seen, technologies = set(), []
+    for item in value:
+        name = _text(item)
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            technologies.append(name)
+    return technologies[:_MAX_TECHNOLOGIES]
@@ -0,0 +1,67 @@
+# --- Importation des modules nécessaires ---
+import threading          # Verrou partagé entre les threads d'analyse
+import time               # Horloge monotone pour le remplissage des quotas
+
+
+# --- Définition du limiteur de débit (requêtes et tokens par minute) ---
+class RateLimiter:
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        """
+        Initialise un limiteur à double seau à jetons (requêtes/minute et tokens/minute).
+
+        Args:
+            requests_per_minute (int): Nombre maximal de requêtes par minute (0 = illimité).
+            tokens_per_minute (int): Nombre maximal de tokens par minute (0 = illimité).
+        """
+        self.requests_per_minute = requests_per_minute or 0
+        self.tokens_per_minute = tokens_per_minute or 0
+        self._requests = float(self.requests_per_minute)  # Seaux pleins au démarrage
+        self._tokens = float(self.tokens_per_minute)
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Bloque jusqu'à ce qu'une requête de `tokens` tokens puisse partir sans dépasser les quotas.
+
+        Args:
+            tokens (int): Estimation du nombre de tokens consommés par la requête.
+
+        Returns:
+            float: Temps d'attente en secondes.
+        """
+        # Une requête plus grosse que le quota entier ne doit pas bloquer indéfiniment
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+
+        waited = 0.0
+        with self._condition:
+            while True:
+                self._refill()
+                delay = max(self._missing(self._requests, 1, self.requests_per_minute),
+                            self._missing(self._tokens, tokens, self.tokens_per_minute))
+                if delay <= 0:
+                    if self.requests_per_minute:
+                        self._requests -= 1
+                    if self.tokens_per_minute:
+                        self._tokens -= tokens
+                    return waited
+                self._condition.wait(delay)
+                waited += delay
+
+    def _refill(self):
+        """Remplit les seaux proportionnellement au temps écoulé."""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60.0)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60.0)
+
+    @staticmethod
+    def _missing(available: float, needed: float, per_minute: int) -> float:
+        """Temps (en secondes) avant que `needed` unités soient disponibles dans le seau."""
+        if not per_minute or available >= needed:
+            return 0.0
+        return (needed - available) * 60.0 / per_minute
@@ -0,0 +1,100 @@
+# --- Importation des modules nécessaires ---
+import math                     # Pour convertir la somme des poids en score entre 0 et 1
+import re                       # Module pour gérer les expressions régulières
+import threading                # Compteurs partagés entre les threads du pipeline
+from core.utils import TextUtils  # Normalisation du texte (minuscules, sans accents ni ponctuation)
+
+# --- Mots-clés par défaut (texte normalisé) et leur poids ---
+DEFAULT_KEYWORDS = {
+    # Vocabulaire d'une demande de projet / mission
+    "mission": 1.0, "projet": 1.0, "project": 1.0, "freelance": 1.0, "prestation": 1.0,
+    "developpeur": 1.0, "developer": 1.0, "consultant": 1.0, "tjm": 1.0, "cahier des charges": 1.0,
+    "appel d offres": 1.0, "recrutement": 0.8, "poste": 0.6, "besoin": 0.6, "cdi": 0.6, "demarrage": 0.6,
+    # Technologies
+    "python": 0.5, "java": 0.5, "javascript": 0.5, "typescript": 0.5, "react": 0.5, "angular": 0.5,
+    "php": 0.5, "net": 0.3, "sql": 0.5, "devops": 0.5, "cloud": 0.5, "aws": 0.5, "azure": 0.5,
+    "kubernetes": 0.5, "docker": 0.5, "data": 0.4, "api": 0.4, "sap": 0.5, "mobile": 0.4,
+}
+
+# --- Pénalités appliquées selon les entêtes (emails automatiques ou de masse) ---
+BULK_PRECEDENCE = {"bulk", "list", "junk"}
+AUTO_REPLY_SUBJECT_RE = re.compile(r'^\s*(?:r[ée]ponse automatique|automatic reply|auto[- ]?reply|out of office|absen(?:ce|t))',
+                                   re.IGNORECASE)
+
+
+# --- Définition du filtre de pertinence avant analyse IA ---
+class RelevanceFilter:
+    def __init__(self, threshold: float = 0.75, keywords: dict = None):
+        """
+        Initialise un pré-classifieur local, rapide, qui écarte les emails sans projet IT
+        avant l'appel (payant) au modèle.
+
+        Args:
+            threshold (float): Score minimal (entre 0 et 1) pour envoyer l'email à l'analyse.
+            keywords (dict): Mots-clés {terme: poids} remplaçant DEFAULT_KEYWORDS.
+        """
+        self.threshold = threshold
+        self.keywords = {TextUtils.normalize_text(k): w for k, w in (keywords or DEFAULT_KEYWORDS).items()}
+        # Une seule expression régulière précompilée pour tous les mots-clés
+        terms = sorted(self.keywords, key=len, reverse=True)
+        self._pattern = re.compile(r'\b(?:' + '|'.join(re.escape(t) for t in terms) + r')\b')
+        self._lock = threading.Lock()
+        self.accepted = 0   # Emails envoyés à l'analyse
+        self.skipped = 0    # Emails écartés
+
+    def score(self, msg, content: str) -> float:
+        """
+        Calcule le score de pertinence d'un email.
+
+        Args:
+            msg: Objet Message (pour les entêtes), ou None.
+            content (str): Texte de l'email.
+
+        Returns:
+            float: Score entre 0 (aucun projet) et 1 (projet très probable).
+        """
+        subject = (msg.get('Subject') or '') if msg is not None else ''
+        text = TextUtils.normalize_text(f"{subject} {content or ''}")
+
+        # Chaque mot-clé distinct compte une fois
+        weight = sum(self.keywords[term] for term in set(self._pattern.findall(text)))
+        score = 1.0 - math.exp(-weight)
+
+        if msg is not None:
+            score -= self._header_penalty(msg, subject)
+        return max(0.0, min(1.0, score))
+
+    def is_relevant(self, msg, content: str) -> bool:
+        """
+        Indique si un email doit être envoyé à l'analyse IA, et met à jour les compteurs.
+
+        Args:
+            msg: Objet Message (pour les entêtes), ou None.
+            content (str): Texte de l'email.
+
+        Returns:
+            bool: True si le score atteint le seuil.
+        """
+        relevant = self.score(msg, content) >= self.threshold
+        with self._lock:
+            if relevant:
+                self.accepted += 1
+            else:
+                self.skipped += 1
+        return relevant
+
+    @staticmethod
+    def _header_penalty(msg, subject: str) -> float:
+        """
+        Pénalité liée aux entêtes : réponses automatiques, listes de diffusion, envois en masse.
+        """
+        penalty = 0.0
+        auto_submitted = (msg.get('Auto-Submitted') or '').strip().lower()
+        if (auto_submitted and auto_submitted != 'no') or msg.get('X-Autoreply') or msg.get('X-Autorespond') \
+                or AUTO_REPLY_SUBJECT_RE.match(subject):
+            penalty += 0.6
+        if (msg.get('Precedence') or '').strip().lower() in BULK_PRECEDENCE:
+            penalty += 0.3
+        if msg.get('List-Unsubscribe') or msg.get('List-Id'):
+            penalty += 0.3
+        return penalty
@@ -0,0 +1,156 @@
+# --- Importation des modules nécessaires ---
+import sqlite3                  # Stockage persistant du cache
+import threading                # Le cache est partagé par les threads d'analyse
+import time                     # Horodatage des entrées (TTL / LRU)
+from core.utils import FileUtils, TextUtils  # Hash SHA256 et normalisation du texte
+
+
+# --- Définition du cache des réponses du modèle ---
+class ResponseCache:
+    def __init__(self, db_path: str, model: str, prompt_version: str,
+                 ttl_seconds: int = 0, max_entries: int = 0, logger=None):
+        """
+        Initialise un cache SQLite des réponses du modèle, indexé par empreinte du contenu.
+
+        Les entrées produites avec un autre modèle ou une autre version du prompt
+        sont supprimées dès l'ouverture du cache.
+
+        Args:
+            db_path (str): Chemin du fichier SQLite.
+            model (str): Modèle IA utilisé (fait partie de la clé).
+            prompt_version (str): Empreinte du prompt (fait partie de la clé).
+            ttl_seconds (int): Durée de vie d'une entrée en secondes (0 = illimitée).
+            max_entries (int): Nombre maximal d'entrées conservées (0 = illimité).
+            logger: Logger où tracer les opérations de maintenance.
+        """
+        self.model = model
+        self.prompt_version = prompt_version
+        self.ttl_seconds = ttl_seconds or 0
+        self.max_entries = max_entries or 0
+        self.logger = logger
+        self.hits = 0      # Réponses servies depuis le cache
+        self.misses = 0    # Réponses absentes du cache (appel à l'API nécessaire)
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._create_table()
+        self._invalidate_other_versions()
+        self.evict()
+
+    def _create_table(self):
+        """
+        Crée la table 'llm_cache' si elle n'existe pas encore.
+        """
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+            self._conn.commit()
+
+    def _invalidate_other_versions(self):
+        """
+        Supprime les entrées d'un autre modèle ou d'une autre version du prompt.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_cache WHERE model != ? OR prompt_version != ?", (self.model, self.prompt_version))
+            self._conn.commit()
+        if cursor.rowcount and self.logger:
+            self.logger.info(f"Cache : {cursor.rowcount} réponses invalidées (modèle ou prompt modifié).")
+
+    def make_key(self, content: str) -> str:
+        """
+        Calcule la clé de cache d'un email : hash du corps normalisé, du modèle et de la version du prompt.
+
+        Args:
+            content (str): Texte de l'email.
+
+        Returns:
+            str: Empreinte SHA256.
+        """
+        return FileUtils.calculate_hash("\n".join((self.model, self.prompt_version, TextUtils.normalize_text(content))))
+
+    def get(self, key: str):
+        """
+        Cherche une réponse dans le cache.
+
+        Args:
+            key (str): Clé calculée par make_key.
+
+        Returns:
+            str: Réponse mémorisée, ou None si absente ou expirée.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM llm_cache WHERE key=?", (key,)).fetchone()
+            if row and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key=?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access=? WHERE key=?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str):
+        """
+        Mémorise une réponse du modèle.
+
+        Args:
+            key (str): Clé calculée par make_key.
+            response (str): Réponse du modèle.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, prompt_version, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (key, self.model, self.prompt_version, response, now, now))
+            self._conn.commit()
+            self._puts += 1
+            evict_now = self._puts % 100 == 0
+        if evict_now:
+            self.evict()
+
+    def evict(self):
+        """
+        Supprime les entrées expirées (TTL) puis les moins récemment utilisées au-delà de max_entries.
+        """
+        with self._lock:
+            if self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            if self.max_entries:
+                self._conn.execute("""
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """
+        Renvoie les compteurs du cache.
+
+        Returns:
+            dict: {"hits", "misses", "entries"}.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        """
+        Ferme la connexion à la base du cache.
+        """
+        with self._lock:
+            self._conn.close()
@@ -1,6 +1,5 @@
 # --- Importation des modules nécessaires ---
 import os
-from dotenv import load_dotenv    # Charge les variables d'environnement d'un fichier .env
 import json
 
 # --- Définition de la classe pour charger et préparer la configuration ---
@@ -12,6 +11,7 @@ class Config:
         Args:
             config_path (str): Chemin vers le fichier JSON de configuration.
         """
+        from dotenv import load_dotenv  # Import différé : chargement des variables d'un fichier .env
         load_dotenv()  # Charge d'abord les variables environnementales (.env)
 
         # Vérifie que le fichier de configuration existe
@@ -29,15 +29,100 @@ class Config:
         self.email_pass = os.getenv("EMAIL_PASS", data.get("email_pass"))  # Mot de passe utilisateur (priorité à .env)
         self.use_ssl = data.get("use_ssl", True)    # SSL activé/désactivé
         self.fetch_limit = data.get("fetch_limit", 10)  # Limite d'emails à récupérer
+        self.fetch_mode = data.get("fetch_mode", "batched")  # Mode de récupération : "batched" ou "full"
+        self.fetch_batch_size = data.get("fetch_batch_size", 500)  # Nombre d'UID par commande FETCH
+        self.sync_mode = data.get("sync_mode", "incremental")  # "incremental" (nouveaux emails seulement) ou "full"
+        self.max_connections = data.get("max_connections", 2)  # Connexions IMAP simultanées maximum par compte
+        self.fetch_workers = data.get("fetch_workers", 4)      # Nombre de dossiers récupérés en parallèle
+        self.daemon_idle_timeout = data.get("daemon_idle_timeout", 1500)    # Renouvellement de IMAP IDLE (secondes, < 29 min)
+        self.daemon_poll_interval = data.get("daemon_poll_interval", 60)    # NOOP périodique si le serveur ne gère pas IDLE (secondes)
+        self.daemon_sync_interval = data.get("daemon_sync_interval", 3600)  # Synchronisation complète de sécurité (secondes)
+        self.daemon_reconnect_delay = data.get("daemon_reconnect_delay", 5) # Premier délai avant reconnexion, doublé à chaque échec
+        self.pipeline_queue_size = data.get("pipeline_queue_size", 50)  # Emails en attente maximum entre deux étapes du pipeline
+        self.accounts = self._load_accounts(data)              # Comptes et dossiers à surveiller
 
         # --- Paramètres OpenAI ---
         self.openai_api_key = os.getenv("OPENAI_API_KEY", data.get("openai_api_key"))  # Clé API OpenAI
         self.gpt_model = data.get("gpt_model", "gpt-4")        # Modèle IA utilisé
-        self.confidence_threshold = data.get("confidence_threshold", 0.75)  # Seuil minimal de confiance IA
+        self.structured_output = data.get("structured_output", "none")  # "none" (prompt seul, gpt-4), "json_object" ou "json_schema" (modèles récents)
+        self.confidence_threshold = data.get("confidence_threshold", 0.75)  # Score minimal du pré-filtre de pertinence
+        self.relevance_filter_enabled = data.get("relevance_filter_enabled", True)  # Pré-filtre local avant l'appel à l'IA
+        self.relevance_keywords = data.get("relevance_keywords")  # Mots-clés {terme: poids} du pré-filtre (None = liste par défaut)
+        self.openai_api_base = os.getenv("OPENAI_API_BASE", data.get("openai_api_base"))  # Point d'accès de l'API (None = OpenAI)
+        self.analysis_concurrency = data.get("analysis_concurrency", 4)  # Nombre d'appels simultanés à l'API
+        self.requests_per_minute = data.get("requests_per_minute", 500)  # Quota de requêtes par minute (0 = illimité)
+        self.tokens_per_minute = data.get("tokens_per_minute", 30000)    # Quota de tokens par minute (0 = illimité)
+        self.request_timeout = data.get("request_timeout", 60)           # Délai maximal d'un appel à l'API (secondes)
+        self.max_chunk_tokens = data.get("max_chunk_tokens", 3000)       # Taille maximale d'un morceau d'email long (tokens)
+        self.max_retries = data.get("max_retries", 5)                    # Nouvelles tentatives sur erreur 429/5xx/timeout
+        self.retry_base_delay = data.get("retry_base_delay", 1.0)        # Délai initial du backoff exponentiel (secondes)
+        self.cache_enabled = data.get("cache_enabled", True)             # Cache des réponses de l'IA activé/désactivé
+        self.cache_path = data.get("cache_path")                         # Base SQLite du cache (None = database_path)
+        self.cache_ttl_seconds = data.get("cache_ttl_seconds", 2592000)  # Durée de vie d'une réponse en cache (30 jours)
+        self.cache_max_entries = data.get("cache_max_entries", 100000)   # Nombre maximal de réponses en cache
+        self.dedup_enabled = data.get("dedup_enabled", True)             # Détection des quasi-doublons (MinHash/LSH) avant l'analyse
+        self.dedup_action = data.get("dedup_action", "link")             # "link" (rattaché au projet existant) ou "skip" (ignoré)
+        self.dedup_threshold = data.get("dedup_threshold", 0.8)          # Similarité minimale (0 à 1) d'un quasi-doublon
+        self.dedup_num_perm = data.get("dedup_num_perm", 128)            # Taille de la signature MinHash
+        self.dedup_bands = data.get("dedup_bands", 16)                   # Bandes de l'index LSH (diviseur de dedup_num_perm)
+        self.dedup_shingle_size = data.get("dedup_shingle_size", 3)      # Mots par shingle
+        self.batch_dir = data.get("batch_dir", "batches")                # Dossier des fichiers JSONL du mode batch
+        self.batch_max_requests = data.get("batch_max_requests", 50000)  # Requêtes maximum par lot (limite de l'API Batch)
+        self.batch_poll_interval = data.get("batch_poll_interval", 60)   # Pause entre deux consultations de l'état des lots (secondes)
+        self.batch_completion_window = data.get("batch_completion_window", "24h")  # Délai de traitement demandé à l'API Batch
+        self.batch_max_attempts = data.get("batch_max_attempts", 3)      # Soumissions maximales d'une requête en échec
 
         # --- Paramètres Base de données & Logs ---
         self.database_path = data.get("database_path", "projects.db")  # Chemin de la base de données
+        self.db_batch_size = data.get("db_batch_size", 50)             # Projets enregistrés par transaction
+        self.store_enabled = data.get("store_enabled", True)           # Copie locale des emails récupérés (relecture avec --from-store)
+        self.store_dir = data.get("store_dir", "store")                # Dossier des segments et de l'index du stockage local
+        self.store_segment_size = data.get("store_segment_size", 268435456)  # Taille maximale d'un segment (256 Mo)
+        self.search_page_size = data.get("search_page_size", 20)       # Résultats par page de la commande search
         self.reports_dir = data.get("reports_dir", "reports")          # Dossier pour les rapports
+        self.report_format = data.get("report_format", ["text"])       # Formats : "text", "jsonl", "csv", "parquet", "html"
+        self.report_batch_size = data.get("report_batch_size", 100)    # Rapports écrits ensemble au maximum
+        self.report_max_file_size = data.get("report_max_file_size", 104857600)  # Taille avant un nouveau fichier JSONL/CSV (100 Mo)
         self.logs_dir = data.get("logs_dir", "logs")                   # Dossier pour les logs
         self.max_log_size = data.get("max_log_size", 5242880)           # Taille max d'un fichier log
         self.backup_log_count = data.get("backup_log_count", 3)         # Nombre de sauvegardes de logs à garder
+        self.log_level = data.get("log_level", "INFO")                  # Niveau minimal des logs ("DEBUG" pour le détail des analyses)
+        self.log_format = data.get("log_format", "text")                # "text" ou "json" (une ligne JSON par message)
+        self.log_sample_rate = data.get("log_sample_rate", 1.0)         # Part des messages DEBUG conservés (0.01 = 1 %)
+        self.metrics_enabled = data.get("metrics_enabled", True)        # Export des métriques à la fin de chaque passage
+        self.metrics_format = data.get("metrics_format", "json")        # "json" (résumé avec quantiles) ou "prometheus"
+        self.metrics_path = data.get("metrics_path")                    # Fichier des métriques (None = logs_dir/metrics.json ou .prom)
+        self.profile = data.get("profile")                              # Profilage : "cprofile", "tracemalloc", les deux (liste) ou None
+        self.profile_dir = data.get("profile_dir", "profiles")          # Dossier des résultats du profilage
+
+    def _load_accounts(self, data):
+        """
+        Construit la liste des comptes à surveiller.
+
+        Chaque compte de la clé "accounts" hérite des paramètres IMAP généraux qu'il ne redéfinit pas.
+        Sans clé "accounts", le compte principal (email_user) est utilisé avec la clé "folders".
+
+        Args:
+            data (dict): Contenu du fichier JSON de configuration.
+
+        Returns:
+            List[dict]: Comptes normalisés (name, imap_server, imap_port, email_user, email_pass, use_ssl, folders).
+        """
+        defaults = {
+            "imap_server": self.imap_server,
+            "imap_port": self.imap_port,
+            "email_user": self.email_user,
+            "email_pass": self.email_pass,
+            "use_ssl": self.use_ssl,
+            "folders": data.get("folders", ["INBOX"]),
+        }
+
+        accounts = []
+        for entry in data.get("accounts") or [{}]:
+            account = dict(defaults, **entry)
+            # Le mot de passe peut être lu dans une variable d'environnement dédiée
+            if entry.get("email_pass_env"):
+                account["email_pass"] = os.getenv(entry["email_pass_env"], account["email_pass"])
+            account["name"] = entry.get("name") or account["email_user"]
+            accounts.append(account)
+        return accounts
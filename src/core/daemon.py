@@ -0,0 +1,101 @@
+# --- Importation des modules nécessaires ---
+import logging            # Module pour écrire des messages dans des fichiers de logs
+import queue              # Dossiers signalés par les threads de surveillance
+import signal             # Arrêt propre sur SIGTERM / Ctrl+C
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from fetcher.idle_watcher import IdleWatcher  # Surveillance IDLE d'un dossier
+
+_DEBOUNCE = 1.0  # Attente (secondes) pour regrouper les emails arrivés presque ensemble
+
+
+# --- Définition du mode démon ---
+class Daemon:
+    def __init__(self, config, fetch_engine, run_cycle: Callable[[Optional[List[Tuple[str, str]]]], None], logger=None):
+        """
+        Initialise le mode démon : le programme reste lancé et traite les nouveaux emails dès leur arrivée.
+
+        Chaque dossier est surveillé par un IdleWatcher (connexion dédiée en IDLE) ; un dossier
+        signalé est synchronisé par run_cycle, avec les connexions déjà ouvertes du FetchEngine.
+        Tous les dossiers sont aussi synchronisés toutes les daemon_sync_interval secondes,
+        au cas où une notification aurait été perdue.
+
+        Args:
+            config: Configuration contenant "daemon_sync_interval" et les réglages des IdleWatcher.
+            fetch_engine: FetchEngine (comptes, dossiers et connexions).
+            run_cycle: Fonction (liste de (compte, dossier), ou None pour tous) qui fait passer
+                       les nouveaux emails de ces dossiers dans le pipeline.
+            logger: Logger pour le suivi du démon.
+        """
+        self.config = config
+        self.fetch_engine = fetch_engine
+        self.run_cycle = run_cycle
+        self.sync_interval = config.daemon_sync_interval  # Synchronisation complète de sécurité (secondes)
+        self.logger = logger or logging.getLogger('Daemon')
+        self.watchers = []
+        self._pending = queue.Queue()   # Dossiers signalés (compte, dossier)
+        self._stop = threading.Event()
+
+    def stop(self, *args):
+        """Demande l'arrêt du démon (utilisable comme gestionnaire de signal)."""
+        self._stop.set()
+        self._pending.put(None)  # Réveille la boucle principale
+
+    def notify(self, account: str, folder: str):
+        """Signale qu'un dossier a peut-être de nouveaux emails (appelée par les IdleWatcher)."""
+        self._pending.put((account, folder))
+
+    def run(self):
+        """
+        Boucle principale : synchronise les dossiers signalés jusqu'à l'arrêt (SIGTERM, SIGINT ou stop()).
+        """
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        for name, folder in self.fetch_engine.targets():
+            watcher = IdleWatcher(self.fetch_engine.fetchers[name], name, folder, self.notify, self.config)
+            watcher.start()
+            self.watchers.append(watcher)
+        self.logger.info(f"Mode démon : {len(self.watchers)} dossiers surveillés.")
+
+        # Chaque IdleWatcher signale son dossier une fois connecté : le premier cycle rattrape le retard
+        next_full_sync = time.monotonic() + self.sync_interval
+        try:
+            while not self._stop.is_set():
+                try:
+                    target = self._pending.get(timeout=max(0.0, next_full_sync - time.monotonic()))
+                except queue.Empty:
+                    self._cycle(None)
+                    next_full_sync = time.monotonic() + self.sync_interval
+                    continue
+                if target is None:
+                    continue
+
+                # Regroupe les notifications arrivées entre-temps (un seul cycle par rafale d'emails)
+                self._stop.wait(_DEBOUNCE)
+                targets = {target}
+                while True:
+                    try:
+                        target = self._pending.get_nowait()
+                    except queue.Empty:
+                        break
+                    if target is not None:
+                        targets.add(target)
+                if not self._stop.is_set():
+                    self._cycle(sorted(targets))
+        finally:
+            for watcher in self.watchers:
+                watcher.stop()
+            for watcher in self.watchers:
+                watcher.join(timeout=10)
+            self.logger.info("Mode démon arrêté.")
+
+    def _cycle(self, targets: Optional[List[Tuple[str, str]]]):
+        """Synchronise des dossiers ; une erreur est enregistrée sans arrêter le démon."""
+        try:
+            self.run_cycle(targets)
+        except Exception as e:
+            self.logger.exception(f"Erreur pendant la synchronisation de {targets or 'tous les dossiers'} : {e}")
@@ -1,42 +1,196 @@
 # --- Importation des modules nécessaires ---
+import atexit                      # Écrit les derniers logs à la fin du programme
+import json                        # Format de log structuré (une ligne JSON par message)
 import logging                     # Module pour la gestion des logs
-from logging.handlers import RotatingFileHandler  # Pour limiter la taille des fichiers de logs
 import os
+import queue                       # File entre les threads qui journalisent et le thread d'écriture
+import random                      # Échantillonnage des messages détaillés
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler  # File d'attente et rotation des fichiers
+
+# --- Réglages communs à tous les loggers (modifiés par configure_logging) ---
+_settings = {
+    "level": logging.INFO,         # Niveau minimal des messages
+    "format": "text",              # "text" ou "json"
+    "max_bytes": 5 * 1024 * 1024,  # Taille d'un fichier de log avant rotation
+    "backup_count": 5,             # Fichiers de sauvegarde conservés
+    "sample_rate": 1.0,            # Part des messages DEBUG conservés (1.0 = tous)
+}
+_queue = queue.Queue()             # File sans limite : journaliser ne bloque jamais l'appelant
+_listener = None                   # Thread d'écriture (démarré au premier logger)
+_router = None
+_loggers = set()                   # Loggers créés par setup_logger
+_lock = threading.Lock()
+
+
+# --- Formats des messages ---
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par message : date, niveau, logger, message (et trace de l'exception)."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _make_formatter():
+    if _settings["format"] == "json":
+        return JsonFormatter()
+    return logging.Formatter('%(asctime)s | %(levelname)s | %(message)s')
+
+
+# --- Côté appelant : mise en file des messages ---
+class _SamplingFilter(logging.Filter):
+    """Ne conserve qu'une partie des messages DEBUG (les autres niveaux passent toujours)."""
+
+    def filter(self, record):
+        rate = _settings["sample_rate"]
+        return record.levelno > logging.DEBUG or rate >= 1.0 or random.random() < rate
+
+
+class _EnqueueHandler(QueueHandler):
+    """Met les messages en file avec le fichier de destination ; la mise en forme se fait dans le thread d'écriture."""
+
+    def __init__(self, log_file: str):
+        super().__init__(_queue)
+        self.log_file = log_file
+        self.addFilter(_SamplingFilter())
+
+    def prepare(self, record):
+        # Seuls le message et la trace de l'exception sont calculés ici (les arguments peuvent changer ensuite)
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg, record.args = message, None
+        record.exc_info, record.exc_text = None, exc_text
+        record.log_file = self.log_file
+        return record
+
+
+# --- Côté thread d'écriture : mise en forme, fichiers et console ---
+class _RoutingHandler(logging.Handler):
+    """Écrit chaque message dans le fichier de son logger (avec rotation) et sur la console."""
+
+    def __init__(self):
+        super().__init__()
+        self.files = {}
+        self.console = logging.StreamHandler()
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        for handler in (self.console, *self.files.values()):
+            handler.setFormatter(fmt)
+
+    def emit(self, record):
+        handler = self.files.get(record.log_file)
+        if handler is None:
+            handler = RotatingFileHandler(record.log_file, maxBytes=_settings["max_bytes"],
+                                          backupCount=_settings["backup_count"], encoding='utf-8')
+            handler.setFormatter(self.formatter)
+            self.files[record.log_file] = handler
+        handler.handle(record)
+        self.console.handle(record)
+
+    def close(self):
+        for handler in self.files.values():
+            handler.close()
+        self.files.clear()
+        super().close()
+
+
+def _start_listener():
+    """Démarre le thread d'écriture s'il ne tourne pas déjà."""
+    global _listener, _router
+    with _lock:
+        if _listener is None:
+            _router = _RoutingHandler()
+            _router.setFormatter(_make_formatter())
+            _listener = QueueListener(_queue, _router)
+            _listener.start()
+
+
+# --- Configuration globale de la journalisation ---
+def configure_logging(config):
+    """
+    Applique les réglages de la configuration à tous les loggers (existants et futurs).
+
+    Args:
+        config: Configuration contenant "log_level", "log_format" ("text" ou "json"),
+                "log_sample_rate", "max_log_size" et "backup_log_count".
+    """
+    _settings["level"] = logging.getLevelName(str(config.log_level).upper())
+    if not isinstance(_settings["level"], int):
+        _settings["level"] = logging.INFO  # Niveau inconnu
+    _settings["format"] = config.log_format
+    _settings["max_bytes"] = config.max_log_size
+    _settings["backup_count"] = config.backup_log_count
+    _settings["sample_rate"] = config.log_sample_rate
+
+    with _lock:
+        for logger in _loggers:
+            logger.setLevel(_settings["level"])
+        if _router is not None:
+            _router.setFormatter(_make_formatter())
+            for handler in _router.files.values():
+                handler.maxBytes = _settings["max_bytes"]
+                handler.backupCount = _settings["backup_count"]
+    _start_listener()
+
+
+def shutdown_logging():
+    """
+    Écrit les messages encore en file puis arrête le thread d'écriture
+    (il redémarre au prochain appel de setup_logger ou configure_logging).
+    """
+    global _listener, _router
+    with _lock:
+        listener, router = _listener, _router
+        _listener = _router = None
+    if listener is not None:
+        listener.stop()   # Traite toute la file avant de s'arrêter
+        router.close()
+
+
+atexit.register(shutdown_logging)
+
 
 # --- Fonction pour configurer un système de journalisation ---
-def setup_logger(name: str, log_file: str, level=logging.INFO):
+def setup_logger(name: str, log_file: str, level=None):
     """
     Configure un logger qui écrit à la fois dans un fichier et sur la console.
-    
+
+    Les messages sont mis en file : un thread unique se charge de leur mise en forme,
+    de l'écriture des fichiers (avec rotation) et de la console.
+
     Args:
         name (str): Nom du logger.
         log_file (str): Chemin vers le fichier de log.
-        level (int): Niveau de journalisation (par défaut: INFO).
-    
+        level (int): Niveau de journalisation (par défaut : celui de la configuration, INFO).
+
     Returns:
         logger: Objet logger configuré.
     """
-    # Format des messages dans les logs
-    formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(message)s')
-
     # Crée le dossier du fichier log s'il n'existe pas
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
-
-    # Crée un handler pour écrire dans un fichier, avec rotation automatique des fichiers
-    handler = RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=5)
-    handler.setFormatter(formatter)
-
-    # Crée un handler pour afficher aussi les logs dans la console
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
 
     # Initialise le logger
     logger = logging.getLogger(name)
-    logger.setLevel(level)
+    logger.setLevel(level if level is not None else _settings["level"])
 
     # Évite d'ajouter plusieurs fois les mêmes handlers
     if not logger.handlers:
-        logger.addHandler(handler)
-        logger.addHandler(console_handler)
+        logger.addHandler(_EnqueueHandler(log_file))
+    with _lock:
+        _loggers.add(logger)
+    _start_listener()
 
     return logger
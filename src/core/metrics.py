@@ -0,0 +1,303 @@
+# --- Importation des modules nécessaires ---
+import bisect                 # Recherche de l'intervalle d'un histogramme
+import json                   # Export JSON des métriques
+import os
+import sys
+import threading              # Métriques mises à jour depuis plusieurs threads
+import time                   # Mesure des durées
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from core.logger import setup_logger  # Avertissement si le profilage est refusé
+
+# --- Bornes des histogrammes de durée (secondes), de 1 ms à 2 min ---
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+# --- Histogramme de durées ---
+class Histogram:
+    """Répartition d'observations par intervalles (format Prometheus), avec somme, minimum et maximum."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Dernier intervalle : au-delà de la plus grande borne
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estime un quantile par interpolation linéaire dans l'intervalle qui le contient.
+
+        Args:
+            q (float): Quantile entre 0 et 1 (ex : 0.99).
+
+        Returns:
+            float: Valeur estimée, ou None sans observation.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+# --- Registre des métriques d'un passage ---
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Initialise un registre de compteurs, jauges et histogrammes, identifiés par
+        un nom et des étiquettes (ex : histogramme "pipeline_stage_seconds", étiquette stage="parse").
+        """
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, tuple], float] = {}
+        self.gauges: Dict[Tuple[str, tuple], float] = {}
+        self.histograms: Dict[Tuple[str, tuple], Histogram] = {}
+        self.started_at = time.time()
+
+    @staticmethod
+    def _key(name: str, labels: Optional[dict]) -> Tuple[str, tuple]:
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name: str, value: float = 1, labels: dict = None) -> None:
+        """Incrémente un compteur."""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, labels: dict = None) -> None:
+        """Fixe la valeur d'une jauge."""
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: dict = None) -> None:
+        """Ajoute une observation (durée en secondes) à un histogramme."""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, labels: dict = None):
+        """
+        Mesure la durée d'un bloc de code (enregistrée même si le bloc lève une exception).
+
+        Exemple :
+            with metrics.timer("llm_request_seconds"):
+                ...
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+
+    def reset(self) -> None:
+        """Remet toutes les métriques à zéro (début d'un nouveau passage)."""
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.started_at = time.time()
+
+    # --- Exports ---
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: {"duration_seconds", "counters", "gauges", "histograms"} (clé : nom{étiquettes}).
+        """
+        with self._lock:
+            return {
+                "duration_seconds": round(time.time() - self.started_at, 3),
+                "counters": {self._label(key): value for key, value in sorted(self.counters.items())},
+                "gauges": {self._label(key): value for key, value in sorted(self.gauges.items())},
+                "histograms": {self._label(key): histogram.summary()
+                               for key, histogram in sorted(self.histograms.items())},
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Returns:
+            str: Métriques au format texte de Prometheus (pour le collecteur textfile de node_exporter).
+        """
+        lines = []
+        with self._lock:
+            for kind, values in (("counter", self.counters), ("gauge", self.gauges)):
+                declared = set()
+                for (name, labels), value in sorted(values.items()):
+                    if name not in declared:
+                        lines.append(f"# TYPE {name} {kind}")
+                        declared.add(name)
+                    lines.append(f"{name}{self._format_labels(labels)} {value}")
+
+            declared = set()
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in declared:
+                    lines.append(f"# TYPE {name} histogram")
+                    declared.add(name)
+                cumulative = 0
+                for bound, count in zip(self._bucket_labels(histogram), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{self._format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str, export_format: str = "json") -> None:
+        """
+        Écrit les métriques dans un fichier (remplacé de façon atomique).
+
+        Args:
+            path (str): Fichier de sortie.
+            export_format (str): "json" (résumé avec quantiles) ou "prometheus".
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = self.to_prometheus() if export_format == "prometheus" else json.dumps(self.summary(), indent=2)
+        temporary = path + ".tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    @staticmethod
+    def _bucket_labels(histogram: Histogram):
+        return [str(bound) for bound in histogram.buckets] + ["+Inf"]
+
+    @staticmethod
+    def _format_labels(labels: tuple) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{key}="{str(value)}"' for key, value in labels) + "}"
+
+    @staticmethod
+    def _label(key: Tuple[str, tuple]) -> str:
+        name, labels = key
+        return name + MetricsRegistry._format_labels(labels)
+
+
+# --- Registre partagé par tous les modules (comme logging.getLogger) ---
+metrics = MetricsRegistry()
+
+
+# --- Profilage optionnel d'un passage ---
+class RunProfiler:
+    def __init__(self, config):
+        """
+        Initialise le profilage demandé par la configuration (clé "profile").
+
+        Args:
+            config: Configuration contenant "profile" ("cprofile", "tracemalloc", une liste des deux, ou None)
+                    et "profile_dir" (dossier des résultats).
+        """
+        modes = config.profile or []
+        self.modes = {modes} if isinstance(modes, str) else set(modes)
+        self.profile_dir = config.profile_dir
+        self._profiles = []
+        self._lock = threading.Lock()
+        self.logger = setup_logger('RunProfiler', os.path.join(config.logs_dir, 'app.log'))
+
+    def start(self) -> None:
+        """Démarre le profilage (thread courant et tous les threads créés ensuite)."""
+        if "cprofile" in self.modes:
+            import cProfile  # Imports différés : profilage CPU et mémoire, désactivés par défaut
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:  # Un autre outil de profilage (débogueur, couverture...) est déjà actif
+                self.logger.warning(f"Profilage cProfile désactivé : {e}")
+                self.modes.discard("cprofile")
+            else:
+                self._profiles.append(profile)
+                # Avant 3.12, un profil ne voit que son thread : un profil par nouveau thread.
+                # Depuis 3.12, cProfile repose sur sys.monitoring : le profil unique couvre déjà tous les threads
+                # et un second profil actif est refusé.
+                if sys.version_info < (3, 12):
+                    threading.setprofile(self._start_thread_profile)
+        if "tracemalloc" in self.modes:
+            import tracemalloc
+            tracemalloc.start(25)
+
+    def _start_thread_profile(self, frame, event, arg):
+        """Appelée au démarrage de chaque thread : active un profil propre à ce thread."""
+        import cProfile
+        profile = cProfile.Profile()
+        try:
+            profile.enable()  # Remplace ce crochet pour le reste de la vie du thread
+        except ValueError as e:
+            sys.setprofile(None)  # Le thread continue sans profil plutôt que de mourir avant sa cible
+            self.logger.warning(f"Profilage cProfile désactivé pour {threading.current_thread().name} : {e}")
+            return
+        with self._lock:
+            self._profiles.append(profile)
+
+    def stop(self) -> list:
+        """
+        Arrête le profilage et écrit les résultats dans profile_dir.
+
+        Returns:
+            list: Chemins des fichiers écrits.
+        """
+        written = []
+        modes, self.modes = self.modes, set()  # Un second appel est sans effet
+        if not modes:
+            return written
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+
+        if "cprofile" in modes and self._profiles:
+            import pstats  # Fusion et tri des profils des différents threads
+            threading.setprofile(None)
+            self._profiles[0].disable()
+            stats = pstats.Stats(self._profiles[0])
+            for profile in self._profiles[1:]:
+                try:
+                    stats.add(profile)
+                except (TypeError, ValueError):
+                    pass  # Thread sans aucun appel profilé
+            path = os.path.join(self.profile_dir, f"cprofile-{stamp}.prof")
+            stats.dump_stats(path)  # Lisible avec snakeviz, ou python -m pstats
+            with open(path[:-5] + ".txt", 'w', encoding='utf-8') as f:
+                pstats.Stats(path, stream=f).sort_stats("cumulative").print_stats(50)
+            written += [path, path[:-5] + ".txt"]
+
+        import tracemalloc
+        if "tracemalloc" in modes and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            metrics.set("python_heap_peak_bytes", peak)
+            path = os.path.join(self.profile_dir, f"tracemalloc-{stamp}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"Mémoire allouée : {current / 1024:.0f} Ko, pic : {peak / 1024:.0f} Ko\n\n")
+                for stat in snapshot.statistics("lineno")[:50]:
+                    f.write(f"{stat}\n")
+            written.append(path)
+        return written
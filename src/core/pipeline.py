@@ -0,0 +1,207 @@
+# --- Importation des modules nécessaires ---
+import logging            # Module pour écrire des messages dans des fichiers de logs
+import queue              # Files bornées entre les étapes (contre-pression)
+import threading          # Chaque étape tourne dans ses propres threads
+import time
+from typing import Callable, Iterable
+from core.metrics import metrics  # Durée et issue de chaque étape
+
+_STOP = object()  # Marqueur de fin de flux transmis d'étape en étape
+
+
+# --- Élément circulant dans le pipeline ---
+class PipelineItem:
+    """Email en cours de traitement et résultats des étapes successives."""
+
+    __slots__ = ("folder_sync", "uid", "message", "content", "result", "projects", "dedup_entry", "duplicate",
+                 "deferred", "failed")
+
+    def __init__(self, folder_sync=None, uid=None, message=None):
+        """
+        Args:
+            folder_sync: Dossier d'origine (FolderSync) ou None.
+            uid (int): UID IMAP de l'email.
+            message: Email récupéré (objet Message).
+        """
+        self.folder_sync = folder_sync
+        self.uid = uid
+        self.message = message
+        self.content = None   # Texte extrait de l'email
+        self.result = None    # Projets extraits par l'analyse IA (liste de dict)
+        self.projects = None  # Projets enregistrés en base (un email peut en contenir plusieurs)
+        self.dedup_entry = None  # Entrée de l'email dans l'index des quasi-doublons
+        self.duplicate = None    # Email déjà vu dont celui-ci est un quasi-doublon (NearDuplicateIndex.find)
+        self.deferred = False    # Quasi-doublon en attente du projet de son email d'origine (traité après le pipeline)
+        self.failed = False      # Traitement en échec (erreur d'une étape, analyse impossible) : à refaire
+
+
+# --- Étape du pipeline ---
+class _Stage:
+    """Étape : fonction appliquée par un ou plusieurs threads à chaque élément."""
+
+    def __init__(self, name: str, func: Callable, workers: int, queue_size: int, batch_size: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.input = queue.Queue(maxsize=queue_size)
+        self.remaining = self.workers   # Threads encore actifs
+        self.processed = 0              # Éléments transmis à l'étape suivante
+        self.dropped = 0                # Éléments écartés (la fonction a renvoyé None)
+        self.failed = 0                 # Éléments en erreur
+        self.lock = threading.Lock()
+
+
+# --- Définition du pipeline producteur/consommateur ---
+class Pipeline:
+    def __init__(self, queue_size: int = 50, on_done: Callable = None, logger=None):
+        """
+        Initialise un pipeline d'étapes concurrentes reliées par des files bornées.
+
+        Chaque file contient au plus queue_size éléments : quand une étape est lente,
+        les étapes précédentes se bloquent, ce qui borne la mémoire utilisée
+        indépendamment du nombre d'emails traités.
+
+        Args:
+            queue_size (int): Taille maximale de chaque file entre deux étapes.
+            on_done: Fonction appelée pour chaque élément qui sort du pipeline
+                     (terminé, écarté ou en erreur).
+            logger: Logger pour les erreurs des étapes.
+        """
+        self.queue_size = max(1, queue_size)
+        self.on_done = on_done
+        self.logger = logger or logging.getLogger('Pipeline')
+        self.stages = []
+
+    def add_stage(self, name: str, func: Callable, workers: int = 1, batch_size: int = 1):
+        """
+        Ajoute une étape au pipeline.
+
+        Args:
+            name (str): Nom de l'étape (pour les logs et les statistiques).
+            func: Fonction (élément) -> élément, ou None pour écarter l'élément.
+                  Si batch_size > 1 : fonction (liste d'éléments) -> liste de résultats de même longueur.
+            workers (int): Nombre de threads exécutant l'étape.
+            batch_size (int): Nombre maximal d'éléments traités ensemble (ex : écritures groupées en base).
+
+        Returns:
+            Pipeline: Le pipeline lui-même (pour chaîner les appels).
+        """
+        self.stages.append(_Stage(name, func, workers, self.queue_size, batch_size))
+        return self
+
+    def run(self, source: Iterable) -> dict:
+        """
+        Fait passer tous les éléments produits par `source` à travers les étapes.
+
+        La source est consommée dans le thread appelant ; chaque étape tourne dans ses threads.
+
+        Args:
+            source: Itérable produisant les éléments à traiter.
+
+        Returns:
+            dict: Statistiques par étape {nom: {"processed", "dropped", "failed"}}.
+        """
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for i in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(index,), name=f"{stage.name}-{i}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in source:
+                if self.stages:
+                    self.stages[0].input.put(item)  # Bloque si la première étape est saturée
+                else:
+                    self._finish(item)
+        finally:
+            # Fin du flux (même en cas d'erreur de la source) : les étapes terminent les éléments en cours
+            if self.stages:
+                for _ in range(self.stages[0].workers):
+                    self.stages[0].input.put(_STOP)
+            for thread in threads:
+                thread.join()
+
+        return {stage.name: {"processed": stage.processed, "dropped": stage.dropped, "failed": stage.failed}
+                for stage in self.stages}
+
+    def _work(self, index: int):
+        """Boucle d'un thread d'étape."""
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        stopped = False
+        while not stopped:
+            item = stage.input.get()
+            if item is _STOP:
+                break
+            if stage.batch_size == 1:
+                self._process(stage, next_stage, [item])
+                continue
+
+            # Regroupe les éléments déjà disponibles, sans attendre les suivants
+            batch = [item]
+            while len(batch) < stage.batch_size:
+                try:
+                    item = stage.input.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopped = True
+                    break
+                batch.append(item)
+            self._process(stage, next_stage, batch)
+
+        # Le dernier thread de l'étape propage la fin du flux à l'étape suivante
+        with stage.lock:
+            stage.remaining -= 1
+            last = stage.remaining == 0
+        if last and next_stage is not None:
+            for _ in range(next_stage.workers):
+                next_stage.input.put(_STOP)
+
+    def _process(self, stage: _Stage, next_stage, items: list):
+        """Applique la fonction de l'étape et transmet les résultats."""
+        labels = {"stage": stage.name}
+        start = time.perf_counter()
+        try:
+            if stage.batch_size == 1:
+                outputs = [stage.func(items[0])]
+            else:
+                outputs = list(stage.func(items))
+        except Exception as e:
+            metrics.observe("pipeline_stage_seconds", time.perf_counter() - start, labels)
+            metrics.inc("pipeline_items_total", len(items), {"stage": stage.name, "outcome": "failed"})
+            with stage.lock:
+                stage.failed += len(items)
+            self.logger.error(f"Erreur dans l'étape {stage.name} : {e}")
+            for item in items:
+                if isinstance(item, PipelineItem):
+                    item.failed = True
+                self._finish(item)
+            return
+        metrics.observe("pipeline_stage_seconds", time.perf_counter() - start, labels)
+
+        for item, output in zip(items, outputs):
+            if output is None:
+                metrics.inc("pipeline_items_total", labels={"stage": stage.name, "outcome": "dropped"})
+                with stage.lock:
+                    stage.dropped += 1
+                self._finish(item)
+                continue
+
+            metrics.inc("pipeline_items_total", labels={"stage": stage.name, "outcome": "processed"})
+            with stage.lock:
+                stage.processed += 1
+            if next_stage is None:
+                self._finish(output)
+            else:
+                next_stage.input.put(output)
+
+    def _finish(self, item):
+        """Signale qu'un élément est sorti du pipeline."""
+        if self.on_done:
+            try:
+                self.on_done(item)
+            except Exception as e:
+                self.logger.error(f"Erreur en fin de pipeline : {e}")
@@ -4,7 +4,41 @@ import unicodedata           # Module pour normaliser les caractères (ex : enle
 import hashlib               # Module pour générer des empreintes numériques (hash)
 import os                    # Module pour la gestion de fichiers
 import importlib.util        # Module pour vérifier si un module Python est disponible
-from typing import List, Optional
+from datetime import datetime, timezone  # Dates de réception enregistrées en UTC
+from email.utils import parsedate_to_datetime, parseaddr  # Pour lire les entêtes Date et From
+from typing import Iterator, List, Optional
+
+# --- Expressions régulières compilées une seule fois (appelées pour chaque email) ---
+_NON_WORD_RE = re.compile(r'[^\w\s]')             # Caractères qui ne sont ni lettre/chiffre ni espace
+_EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')  # Adresses emails
+_WORD_RE = re.compile(r'\S+')                     # Mots (séparés par des espaces)
+
+
+# --- Table de normalisation utilisée par str.translate ---
+class _NormalizeTable(dict):
+    """
+    Table {code: remplacement} : décomposition NFKD sans diacritiques, puis ponctuation remplacée
+    par un espace. Chaque caractère est calculé à sa première rencontre puis mis en cache.
+    """
+
+    def __missing__(self, code):
+        decomposed = ''.join(c for c in unicodedata.normalize('NFKD', chr(code)) if not unicodedata.combining(c))
+        value = _NON_WORD_RE.sub(' ', decomposed)
+        self[code] = value
+        return value
+
+
+# Table précalculée pour l'ASCII et les alphabets latins (avant U+0370), complétée au besoin
+_NORMALIZE_TABLE = _NormalizeTable()
+for _code in range(0x370):
+    _NORMALIZE_TABLE[_code]
+
+# --- Expressions pour repérer l'historique cité dans les réponses ---
+# Entête introduisant le message cité : « Le ... a écrit : », « On ... wrote: », « -----Original Message----- »
+_REPLY_HEADER_RE = re.compile(
+    r'^[ \t]*(?:le\b.{0,200}?a [ée]crit\s*:|on\b.{0,200}?wrote\s*:|-{2,}\s*(?:original message|message d\'origine)\s*-{2,})',
+    re.MULTILINE | re.IGNORECASE | re.DOTALL)
+_QUOTED_LINE_RE = re.compile(r'^[ \t]*>.*(?:\n|$)', re.MULTILINE)  # Lignes citées (« > ... »)
 
 # --- Classe pour les outils liés au traitement de texte ---
 class TextUtils:
@@ -26,15 +60,10 @@ class TextUtils:
 
         # Mise en minuscules
         text = text.lower()
-        # Suppression des accents
-        text = unicodedata.normalize('NFKD', text)
-        text = ''.join(c for c in text if not unicodedata.combining(c))
-        # Suppression de tout caractère qui n'est pas lettre/chiffre/espace
-        text = re.sub(r'[^\w\s]', ' ', text)
+        # Suppression des accents et de tout caractère qui n'est pas lettre/chiffre/espace (une seule passe)
+        text = text.translate(_NORMALIZE_TABLE)
         # Suppression des espaces multiples
-        text = re.sub(r'\s+', ' ', text).strip()
-
-        return text
+        return ' '.join(text.split())
 
     @staticmethod
     def extract_emails(text: str) -> List[str]:
@@ -50,8 +79,49 @@ class TextUtils:
         if not text:
             return []
 
-        pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-        return re.findall(pattern, text)
+        return _EMAIL_RE.findall(text)
+
+    @staticmethod
+    def decode_bytes(data: bytes, charset: Optional[str] = None) -> str:
+        """
+        Décode des octets avec le charset déclaré, puis en UTF-8, Windows-1252 et enfin Latin-1.
+
+        Args:
+            data (bytes): Octets à décoder.
+            charset (str): Jeu de caractères déclaré par l'email (peut être absent, faux ou inconnu).
+
+        Returns:
+            str: Texte décodé (le décodage Latin-1 ne peut pas échouer).
+        """
+        if not data:
+            return ""
+        for candidate in (charset, 'utf-8', 'cp1252'):
+            if candidate:
+                try:
+                    return str(data, candidate)
+                except (LookupError, UnicodeDecodeError):
+                    continue
+        return str(data, 'latin-1')
+
+    @staticmethod
+    def strip_quoted_replies(text: str) -> str:
+        """
+        Retire l'historique cité d'une réponse (entête « Le ... a écrit : » et lignes « > »).
+
+        Args:
+            text (str): Texte brut de l'email.
+
+        Returns:
+            str: Texte de la réponse seule (le texte d'origine s'il ne contient que la citation).
+        """
+        if not text:
+            return ""
+
+        match = _REPLY_HEADER_RE.search(text)
+        if match and text[:match.start()].strip():
+            text = text[:match.start()]  # Tout ce qui suit l'entête est le message cité
+        stripped = _QUOTED_LINE_RE.sub('', text).strip()
+        return stripped or text.strip()
 
     @staticmethod
     def chunk_text(text: str, chunk_size: int = 2000) -> List[str]:
@@ -65,25 +135,37 @@ class TextUtils:
         Returns:
             List[str]: Liste de morceaux de texte.
         """
+        return list(TextUtils.iter_chunks(text, chunk_size))
+
+    @staticmethod
+    def iter_chunks(text: str, chunk_size: int = 2000) -> Iterator[str]:
+        """
+        Version générateur de chunk_text : produit les morceaux au fur et à mesure,
+        en une seule passe sur le texte (la longueur du morceau en cours est tenue à jour).
+
+        Args:
+            text (str): Texte à découper.
+            chunk_size (int): Taille maximale pour chaque morceau.
+
+        Yields:
+            str: Morceaux de texte (mots séparés par un espace).
+        """
         if not text:
-            return []
+            return
 
-        words = text.split()
-        chunks = []
         current_chunk = []
-
-        for word in words:
-            current_length = sum(len(w) + 1 for w in current_chunk)  # +1 pour les espaces
-            if current_length + len(word) + 1 > chunk_size:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [word]
-            else:
-                current_chunk.append(word)
+        current_length = 0  # Somme des len(mot) + 1 du morceau en cours (+1 pour les espaces)
+        for match in _WORD_RE.finditer(text):
+            word = match.group()
+            if current_chunk and current_length + len(word) + 1 > chunk_size:
+                yield ' '.join(current_chunk)
+                current_chunk = []
+                current_length = 0
+            current_chunk.append(word)
+            current_length += len(word) + 1
 
         if current_chunk:
-            chunks.append(' '.join(current_chunk))
-
-        return chunks
+            yield ' '.join(current_chunk)
 
 # --- Classe pour les outils liés à la gestion des fichiers ---
 class FileUtils:
@@ -125,3 +207,53 @@ class FileUtils:
             bool: True si le module est disponible, sinon False.
         """
         return importlib.util.find_spec(module_name) is not None
+
+# --- Classe pour les outils liés aux entêtes des emails ---
+class MessageUtils:
+    """Outils pour lire les métadonnées d'un email."""
+
+    @staticmethod
+    def extract_metadata(msg) -> dict:
+        """
+        Extrait le Message-ID, l'expéditeur et la date de réception d'un email.
+
+        Args:
+            msg: Objet Message.
+
+        Returns:
+            dict: {"message_id", "sender", "received_at" (ISO 8601 en UTC)}
+            (None si l'entête est absent ou illisible).
+        """
+        message_id = (msg.get('Message-ID') or '').strip() or None
+        sender = parseaddr(msg.get('From') or '')[1].lower() or None
+
+        received_at = None
+        try:
+            if msg.get('Date'):
+                received_at = MessageUtils.to_utc(parsedate_to_datetime(msg['Date']))
+        except (TypeError, ValueError):
+            pass  # Date mal formée : on ne la conserve pas
+
+        return {"message_id": message_id, "sender": sender, "received_at": received_at}
+
+    @staticmethod
+    def to_utc(value) -> Optional[str]:
+        """
+        Convertit une date en UTC : les dates de réception enregistrées sont ainsi comparables
+        et triables comme du texte, quel que soit le fuseau de l'expéditeur.
+
+        Args:
+            value: datetime, ou texte ISO 8601 ; sans fuseau, la date est considérée comme déjà en UTC.
+
+        Returns:
+            str: Date ISO 8601 en UTC (ex : "2024-01-08T07:00:00+00:00"), ou None si elle est illisible.
+        """
+        try:
+            date = datetime.fromisoformat(value) if isinstance(value, str) else value
+        except ValueError:
+            return None
+        if date is None:
+            return None
+        if date.tzinfo is None:
+            return date.replace(tzinfo=timezone.utc).isoformat()
+        return date.astimezone(timezone.utc).isoformat()
@@ -0,0 +1,227 @@
+# --- Importation des modules nécessaires ---
+import hashlib                  # Empreinte du contenu (adressage par contenu)
+import mmap                     # Lecture des segments sans les charger en mémoire
+import os
+import sqlite3                  # Index des messages stockés
+import threading                # Les threads de récupération écrivent en parallèle
+import zlib                     # Compression des messages
+from email import message_from_bytes  # Reconstruction des emails relus
+from typing import Iterator, Optional, Tuple
+from core.logger import setup_logger   # Module pour configurer un système de journaux (logs)
+
+_SEGMENT_NAME = "segment_{:05d}.seg"
+_PAGE_SIZE = 1000   # Lignes d'index lues à la fois pendant un parcours
+
+
+# --- Définition du stockage local des emails récupérés ---
+class MessageStore:
+    def __init__(self, config):
+        """
+        Initialise le stockage local des emails.
+
+        Chaque email est compressé (zlib) et ajouté à la fin d'un fichier segment ; un index SQLite
+        associe (compte, dossier, UIDVALIDITY, UID) à l'empreinte SHA256 du contenu, et chaque
+        empreinte à sa position dans les segments. Un contenu identique n'est stocké qu'une fois.
+        Les segments sont relus par mmap : une archive volumineuse n'est jamais chargée en mémoire.
+
+        Args:
+            config: Configuration contenant le dossier du stockage et la taille des segments.
+        """
+        self.store_dir = config.store_dir                 # Dossier des segments et de l'index
+        self.segment_size = config.store_segment_size     # Taille maximale d'un segment (octets)
+        self.logger = setup_logger("MessageStore", os.path.join(config.logs_dir, 'message_store.log'))
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(self.store_dir, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+        self._maps = {}          # Segments ouverts en lecture {numéro: (fichier, mmap)}
+        self._segment = self._conn.execute("SELECT COALESCE(MAX(segment), 1) FROM blobs").fetchone()[0]
+        self._writer = open(self._segment_path(self._segment), 'ab')
+
+    def _create_tables(self):
+        """
+        Crée les tables de l'index : 'blobs' (contenus stockés) et 'messages' (emails récupérés).
+        """
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    segment INTEGER NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    account TEXT NOT NULL,
+                    folder TEXT NOT NULL,
+                    uidvalidity INTEGER NOT NULL DEFAULT 0,
+                    uid INTEGER NOT NULL,
+                    message_id TEXT,
+                    hash TEXT NOT NULL REFERENCES blobs (hash),
+                    stored_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (account, folder, uidvalidity, uid)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_message_id ON messages (message_id)")
+
+    def put(self, account: str, folder: str, uidvalidity: Optional[int], uid: int, msg) -> str:
+        """
+        Enregistre un email récupéré.
+
+        Args:
+            account (str): Nom du compte.
+            folder (str): Dossier IMAP.
+            uidvalidity (int): UIDVALIDITY du dossier (None si inconnue).
+            uid (int): UID de l'email.
+            msg: Objet Message récupéré.
+
+        Returns:
+            str: Empreinte SHA256 du contenu stocké.
+        """
+        data = msg.as_bytes()
+        content_hash = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            known = self._conn.execute("SELECT 1 FROM blobs WHERE hash=?", (content_hash,)).fetchone()
+            with self._conn:
+                if not known:
+                    segment, offset, length = self._append(zlib.compress(data))
+                    self._conn.execute("INSERT INTO blobs (hash, segment, offset, length, size) VALUES (?, ?, ?, ?, ?)",
+                                       (content_hash, segment, offset, length, len(data)))
+                self._conn.execute("""
+                    INSERT OR REPLACE INTO messages (account, folder, uidvalidity, uid, message_id, hash)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (account, folder, uidvalidity or 0, uid, (msg.get('Message-ID') or '').strip() or None, content_hash))
+        return content_hash
+
+    def get(self, content_hash: str) -> Optional[bytes]:
+        """
+        Relit un contenu stocké.
+
+        Args:
+            content_hash (str): Empreinte renvoyée par put.
+
+        Returns:
+            bytes: Email brut, ou None s'il est absent.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT segment, offset, length FROM blobs WHERE hash=?", (content_hash,)).fetchone()
+        return self._read(*row) if row else None
+
+    def get_by_message_id(self, message_id: str):
+        """
+        Relit un email d'après son entête Message-ID.
+
+        Returns:
+            Message: Email stocké, ou None s'il est absent.
+        """
+        with self._lock:
+            row = self._conn.execute("""
+                SELECT b.segment, b.offset, b.length FROM messages m JOIN blobs b ON b.hash = m.hash
+                WHERE m.message_id=? LIMIT 1
+            """, (message_id,)).fetchone()
+        return message_from_bytes(self._read(*row)) if row else None
+
+    def iter_messages(self, account: str = None, folder: str = None,
+                      after: int = 0) -> Iterator[Tuple[int, str, str, int, object]]:
+        """
+        Parcourt les emails stockés dans l'ordre où ils ont été enregistrés (lecture séquentielle des segments).
+
+        Args:
+            account (str): Limite le parcours à un compte (None = tous).
+            folder (str): Limite le parcours à un dossier (None = tous).
+            after (int): Position à partir de laquelle reprendre le parcours (0 = depuis le début).
+
+        Yields:
+            Tuple[int, str, str, int, Message]: Position dans le stockage, compte, dossier, UID et email.
+        """
+        last_rowid = after
+        while True:
+            with self._lock:
+                rows = self._conn.execute("""
+                    SELECT m.rowid, m.account, m.folder, m.uid, b.segment, b.offset, b.length
+                    FROM messages m JOIN blobs b ON b.hash = m.hash
+                    WHERE m.rowid > ? AND (? IS NULL OR m.account = ?) AND (? IS NULL OR m.folder = ?)
+                    ORDER BY m.rowid LIMIT ?
+                """, (last_rowid, account, account, folder, folder, _PAGE_SIZE)).fetchall()
+            if not rows:
+                return
+            for rowid, row_account, row_folder, uid, segment, offset, length in rows:
+                last_rowid = rowid
+                try:
+                    yield rowid, row_account, row_folder, uid, message_from_bytes(self._read(segment, offset, length))
+                except (OSError, ValueError, zlib.error) as e:
+                    self.logger.error(f"Email illisible dans le stockage ({row_account}/{row_folder} UID {uid}) : {e}")
+
+    def positions(self, after: int = 0) -> list:
+        """
+        Returns:
+            list: Positions (croissantes) des emails enregistrés après `after`.
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT rowid FROM messages WHERE rowid > ? ORDER BY rowid",
+                                                         (after,))]
+
+    def last_position(self) -> int:
+        """
+        Returns:
+            int: Position du dernier email enregistré (0 si le stockage est vide).
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM messages").fetchone()[0]
+
+    def count(self) -> int:
+        """
+        Returns:
+            int: Nombre d'emails indexés.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def close(self):
+        """
+        Ferme les segments et l'index.
+        """
+        with self._lock:
+            self._writer.close()
+            for handle, mapping in self._maps.values():
+                mapping.close()
+                handle.close()
+            self._maps.clear()
+            self._conn.close()
+
+    # --- Méthodes internes ---
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.store_dir, _SEGMENT_NAME.format(segment))
+
+    def _append(self, data: bytes) -> Tuple[int, int, int]:
+        """Ajoute des octets à la fin du segment courant (nouveau segment s'il est plein)."""
+        offset = self._writer.tell()
+        if offset and offset + len(data) > self.segment_size:
+            self._writer.close()
+            self._segment += 1
+            self._writer = open(self._segment_path(self._segment), 'ab')
+            offset = 0
+        self._writer.write(data)
+        self._writer.flush()  # Les données sont sur disque avant d'être indexées
+        return self._segment, offset, len(data)
+
+    def _read(self, segment: int, offset: int, length: int) -> bytes:
+        """Lit et décompresse un contenu à partir du mmap de son segment."""
+        with self._lock:
+            handle, mapping = self._maps.get(segment, (None, None))
+            if mapping is None or offset + length > len(mapping):
+                # Premier accès au segment, ou segment courant agrandi depuis l'ouverture
+                if mapping is not None:
+                    mapping.close()
+                    handle.close()
+                handle = open(self._segment_path(segment), 'rb')
+                mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = (handle, mapping)
+            compressed = mapping[offset:offset + length]
+        return zlib.decompress(compressed)
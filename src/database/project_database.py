@@ -1,7 +1,39 @@
 # --- Importation des modules nécessaires ---
 import sqlite3                  # Module pour manipuler une base de données SQLite
 import os
+import re                       # Découpage de la recherche en mots
+import json                     # Liste des technologies (colonne JSON)
+import threading                # La connexion unique est partagée entre les threads du pipeline
 from core.logger import setup_logger   # Module pour configurer un système de journaux (logs)
+from core.utils import FileUtils, MessageUtils  # Empreinte (hash) des projets, dates de réception en UTC
+from core.metrics import metrics       # Durée des écritures et projets enregistrés
+from analyzer.project_schema import PROJECT_FIELDS, ProjectParser  # Colonnes typées d'un projet et son texte lisible
+
+# --- Colonnes ajoutées à la table projects (mise à jour du schéma) ---
+PROJECT_COLUMNS = {
+    "message_id": "TEXT",    # Entête Message-ID de l'email d'origine
+    "sender": "TEXT",        # Expéditeur de l'email
+    "received_at": "TEXT",   # Date de réception (ISO 8601, UTC)
+    "content_hash": "TEXT",  # Empreinte SHA256 de l'email d'origine et du rang du projet (déduplication)
+    "duplicate_of": "INTEGER",  # Projet d'origine si l'email en est un quasi-doublon (sans contenu propre)
+    **PROJECT_FIELDS,        # Champs extraits par l'analyse (titre, client, technologies, budget, dates, contact...)
+}
+_INSERT_COLUMNS = ["content", "message_id", "sender", "received_at", "content_hash", *PROJECT_FIELDS]
+
+# Version du schéma (PRAGMA user_version) : migrations des données déjà enregistrées
+#   1 : l'empreinte des projets identifie leur email d'origine (Message-ID) et non plus le texte produit par l'IA
+#   2 : dates de réception (received_at) en UTC
+SCHEMA_VERSION = 2
+
+# --- Colonnes ajoutées à la table batch_requests après sa création ---
+BATCH_REQUEST_COLUMNS = {
+    "dedup_entry": "INTEGER",  # Entrée de l'email dans l'index des quasi-doublons (rattachée au projet enregistré)
+    "attempts": "INTEGER NOT NULL DEFAULT 0",  # Nombre de soumissions de la requête
+}
+
+_SEARCH_TERM_RE = re.compile(r'[\w*]+')  # Mots de la recherche (avec * pour une recherche par préfixe)
+_SEARCH_OPERATORS = {"OR", "NOT", "AND"}    # Opérateurs FTS5 conservés tels quels
+_SENDER_DOMAIN = "substr(p.sender, instr(p.sender, '@'))"  # Domaine de l'expéditeur (« @agence.fr »), indexé
 
 # --- Définition de la classe pour gérer la base de données des projets ---
 class ProjectDatabase:
@@ -9,44 +41,522 @@ class ProjectDatabase:
         """
         Initialise la classe ProjectDatabase.
 
+        Une seule connexion (mode WAL) est ouverte et réutilisée pour toutes les opérations.
+
         Args:
             config: Configuration contenant le chemin vers la base de données et les dossiers de logs.
         """
         self.db_path = config.database_path  # Chemin vers le fichier de la base de données SQLite
         self.logger = setup_logger("ProjectDatabase", os.path.join(config.logs_dir, 'project_database.log'))  # Création d'un logger dédié
+        self._lock = threading.RLock()  # Sérialise l'accès à la connexion partagée
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")    # Lectures non bloquées par les écritures
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # Suffisant en WAL, beaucoup moins de fsync
         self._create_projects_table()  # Vérifie que la table nécessaire existe
+        self.search_enabled = self._create_search_index()  # Index plein texte des projets (FTS5)
+        self._create_sync_state_table()  # Table des points de reprise de synchronisation IMAP
+        self._create_batch_tables()  # Tables du mode batch (lots soumis à l'API Batch et leurs requêtes)
 
     def _create_projects_table(self):
         """
-        Crée la table 'projects' dans la base de données si elle n'existe pas encore.
+        Crée la table 'projects' dans la base de données si elle n'existe pas encore,
+        puis ajoute les colonnes indexées des versions récentes (message-id, expéditeur, date, empreinte).
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS projects (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     content TEXT
                 )
             """)  # Crée une table avec deux colonnes : id et contenu du projet
-            conn.commit()  # Sauvegarde la création de la table
-            self.logger.info("Table projects prête.")  # Log pour indiquer que la table est prête
 
-    def save_project(self, project_data):
+            # Mise à jour d'une base existante : ajout des colonnes manquantes
+            existing = {row["name"] for row in cursor.execute("PRAGMA table_info(projects)")}
+            for column, column_type in PROJECT_COLUMNS.items():
+                if column not in existing:
+                    cursor.execute(f"ALTER TABLE projects ADD COLUMN {column} {column_type}")
+            self._backfill_content_hash(cursor)
+            self._migrate(cursor)
+
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_message_id ON projects (message_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_sender ON projects (sender)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_received_at ON projects (received_at)")
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_projects_content_hash ON projects (content_hash)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_duplicate_of ON projects (duplicate_of)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_sender_domain "
+                           "ON projects (substr(sender, instr(sender, '@')))")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_client ON projects (client)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_start_date ON projects (start_date)")
+        self.logger.info("Table projects prête.")  # Log pour indiquer que la table est prête
+
+    def _create_search_index(self):
+        """
+        Crée l'index plein texte 'projects_fts' (SQLite FTS5) sur le contenu des projets.
+
+        L'index ne recopie pas le texte (table à contenu externe) et des triggers le tiennent
+        à jour à chaque insertion, modification ou suppression dans 'projects'.
+        Une base existante est indexée entièrement à la création de l'index.
+
+        Returns:
+            bool: True si l'index est disponible (SQLite compilé avec FTS5).
+        """
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.cursor()
+                exists = cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='projects_fts'").fetchone()
+                cursor.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+                        content, content='projects', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TRIGGER IF NOT EXISTS projects_fts_insert AFTER INSERT ON projects
+                    WHEN new.content IS NOT NULL BEGIN
+                        INSERT INTO projects_fts (rowid, content) VALUES (new.id, new.content);
+                    END
+                """)
+                cursor.execute("""
+                    CREATE TRIGGER IF NOT EXISTS projects_fts_delete AFTER DELETE ON projects
+                    WHEN old.content IS NOT NULL BEGIN
+                        INSERT INTO projects_fts (projects_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                    END
+                """)
+                cursor.execute("""
+                    CREATE TRIGGER IF NOT EXISTS projects_fts_update AFTER UPDATE OF content ON projects BEGIN
+                        INSERT INTO projects_fts (projects_fts, rowid, content)
+                            SELECT 'delete', old.id, old.content WHERE old.content IS NOT NULL;
+                        INSERT INTO projects_fts (rowid, content)
+                            SELECT new.id, new.content WHERE new.content IS NOT NULL;
+                    END
+                """)
+                if not exists:
+                    cursor.execute("INSERT INTO projects_fts (projects_fts) VALUES ('rebuild')")
+                    self.logger.info("Index de recherche des projets créé.")
+            return True
+        except sqlite3.OperationalError as e:
+            # SQLite sans FTS5 : la recherche se fait par LIKE (plus lente, sans classement)
+            self.logger.warning(f"Index de recherche indisponible ({e}), recherche sans index.")
+            return False
+
+    def _backfill_content_hash(self, cursor):
+        """
+        Calcule l'empreinte des projets enregistrés avant l'ajout de la colonne content_hash.
+        Les doublons déjà présents gardent une empreinte vide pour respecter la contrainte UNIQUE.
+        """
+        rows = cursor.execute("SELECT id, content FROM projects WHERE content_hash IS NULL ORDER BY id").fetchall()
+        if not rows:
+            return
+        known = {row[0] for row in cursor.execute("SELECT content_hash FROM projects WHERE content_hash IS NOT NULL")}
+        updates = []
+        for row in rows:
+            content_hash = FileUtils.calculate_hash(row["content"] or "")
+            if content_hash not in known:
+                known.add(content_hash)
+                updates.append((content_hash, row["id"]))
+        if updates:
+            cursor.executemany("UPDATE projects SET content_hash=? WHERE id=?", updates)
+            self.logger.info(f"{len(updates)} projets existants indexés par empreinte.")
+
+    def _migrate(self, cursor):
+        """
+        Met à jour les données d'une base créée par une version précédente (PRAGMA user_version).
+        """
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Empreinte d'un projet = Message-ID de son email + rang du projet dans l'email
+            rows = cursor.execute("""
+                SELECT id, message_id FROM projects
+                WHERE message_id IS NOT NULL AND duplicate_of IS NULL ORDER BY message_id, id
+            """).fetchall()
+            ranks, updates = {}, []
+            for row in rows:
+                rank = ranks[row["message_id"]] = ranks.get(row["message_id"], -1) + 1
+                updates.append((self.project_key(row["message_id"], rank), row["id"]))
+            if updates:
+                cursor.executemany("UPDATE projects SET content_hash=? WHERE id=?", updates)
+                self.logger.info(f"{len(updates)} projets existants indexés par email d'origine.")
+        if version < 2:
+            # Dates de réception enregistrées avec le fuseau de l'expéditeur : converties en UTC
+            tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+            for table, key in (("projects", "id"), ("batch_requests", "custom_id")):
+                if table not in tables:
+                    continue
+                rows = cursor.execute(f"SELECT {key}, received_at FROM {table} WHERE received_at IS NOT NULL").fetchall()
+                updates = []
+                for row_key, received_at in rows:
+                    utc = MessageUtils.to_utc(received_at)
+                    if utc and utc != received_at:
+                        updates.append((utc, row_key))
+                if updates:
+                    cursor.executemany(f"UPDATE {table} SET received_at=? WHERE {key}=?", updates)
+                    self.logger.info(f"{len(updates)} dates de réception converties en UTC ({table}).")
+        if version < SCHEMA_VERSION:
+            cursor.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    @staticmethod
+    def project_key(email_key, rank):
+        """
+        Empreinte d'un projet : son email d'origine et son rang dans cet email. Une nouvelle analyse
+        du même email (autre dossier, --from-store...) ne crée pas de doublon, même si l'IA ne
+        renvoie pas exactement le même texte ; deux emails distincts ne se masquent jamais.
+
+        Args:
+            email_key: Message-ID de l'email, ou empreinte de son texte s'il n'en a pas.
+            rank (int): Rang du projet dans l'email (0 pour le premier).
+
+        Returns:
+            str: Empreinte SHA256.
+        """
+        return FileUtils.calculate_hash(f"{email_key}\n{rank}")
+
+    def _create_sync_state_table(self):
+        """
+        Crée la table 'sync_state' qui mémorise, par compte et par dossier,
+        l'UIDVALIDITY et le plus grand UID déjà traité.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    account TEXT NOT NULL,
+                    folder TEXT NOT NULL,
+                    uidvalidity INTEGER,
+                    last_uid INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (account, folder)
+                )
+            """)
+
+    def _create_batch_tables(self):
+        """
+        Crée les tables du mode batch :
+        'batch_jobs' (un lot soumis à l'API Batch) et 'batch_requests' (une requête par email ou morceau d'email).
+        """
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS batch_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    batch_id TEXT,
+                    input_file_id TEXT,
+                    output_file_id TEXT,
+                    error_file_id TEXT,
+                    status TEXT NOT NULL DEFAULT 'created',
+                    request_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS batch_requests (
+                    custom_id TEXT PRIMARY KEY,
+                    email_key TEXT NOT NULL,
+                    part_index INTEGER NOT NULL,
+                    part_count INTEGER NOT NULL,
+                    body TEXT NOT NULL,
+                    message_id TEXT,
+                    sender TEXT,
+                    received_at TEXT,
+                    cache_key TEXT,
+                    job_id INTEGER REFERENCES batch_jobs (id),
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    result TEXT
+                )
+            """)
+            # Mise à jour d'une base existante : ajout des colonnes manquantes
+            existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(batch_requests)")}
+            for column, column_type in BATCH_REQUEST_COLUMNS.items():
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE batch_requests ADD COLUMN {column} {column_type}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_batch_requests_job ON batch_requests (job_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_batch_requests_status ON batch_requests (status)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_batch_requests_email ON batch_requests (email_key)")
+
+    def add_batch_requests(self, requests):
+        """
+        Enregistre des requêtes en attente de soumission (les requêtes déjà connues sont ignorées).
+
+        Args:
+            requests: Liste de dictionnaires {"custom_id", "email_key", "part_index", "part_count", "body",
+                      "message_id", "sender", "received_at", "cache_key", "dedup_entry"}.
+
+        Returns:
+            int: Nombre de requêtes ajoutées.
+        """
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("""
+                INSERT OR IGNORE INTO batch_requests
+                    (custom_id, email_key, part_index, part_count, body, message_id, sender, received_at, cache_key,
+                     dedup_entry)
+                VALUES (:custom_id, :email_key, :part_index, :part_count, :body, :message_id, :sender, :received_at,
+                        :cache_key, :dedup_entry)
+            """, [dict(request, dedup_entry=request.get("dedup_entry")) for request in requests])
+            return self._conn.total_changes - before
+
+    def get_pending_batch_requests(self, limit):
+        """
+        Liste les requêtes qui ne font partie d'aucun lot.
+
+        Args:
+            limit (int): Nombre maximal de requêtes.
+
+        Returns:
+            List[str]: custom_id des requêtes, dans l'ordre d'arrivée.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT custom_id FROM batch_requests WHERE status='pending' ORDER BY rowid LIMIT ?", (limit,))
+            return [row[0] for row in rows]
+
+    def create_batch_job(self, custom_ids):
+        """
+        Crée un lot et lui rattache des requêtes en attente.
+
+        Args:
+            custom_ids: Identifiants des requêtes du lot.
+
+        Returns:
+            int: Identifiant local du lot.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute("INSERT INTO batch_jobs (request_count) VALUES (?)", (len(custom_ids),))
+            job_id = cursor.lastrowid
+            self._conn.executemany("""
+                UPDATE batch_requests SET job_id=?, status='submitted', attempts=attempts + 1 WHERE custom_id=?
+            """, [(job_id, custom_id) for custom_id in custom_ids])
+        return job_id
+
+    def update_batch_job(self, job_id, fields):
+        """
+        Met à jour un lot (identifiants distants, statut...).
+
+        Args:
+            job_id (int): Identifiant local du lot.
+            fields (dict): Colonnes à modifier.
+        """
+        assignments = ", ".join(f"{column}=:{column}" for column in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE batch_jobs SET {assignments}, updated_at=CURRENT_TIMESTAMP WHERE id=:job_id",
+                               dict(fields, job_id=job_id))
+
+    def get_open_batch_jobs(self):
+        """
+        Liste les lots dont les résultats n'ont pas encore été intégrés.
+
+        Returns:
+            List[dict]: Lots (colonnes de batch_jobs).
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM batch_jobs WHERE status != 'ingested' ORDER BY id")
+            return [dict(row) for row in rows]
+
+    def get_batch_requests(self, job_id):
+        """
+        Liste les requêtes d'un lot.
+
+        Returns:
+            List[dict]: Requêtes (colonnes de batch_requests).
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM batch_requests WHERE job_id=? ORDER BY rowid", (job_id,))
+            return [dict(row) for row in rows]
+
+    def set_batch_request_results(self, results):
+        """
+        Enregistre le résultat des requêtes d'un lot terminé.
+
+        Args:
+            results: Liste de dictionnaires {"custom_id", "status", "result"} ;
+                     le statut 'pending' détache la requête de son lot pour qu'elle soit soumise à nouveau.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                UPDATE batch_requests
+                SET status=:status, result=:result, job_id=CASE WHEN :status='pending' THEN NULL ELSE job_id END
+                WHERE custom_id=:custom_id
+            """, results)
+
+    def get_completed_batch_requests(self):
+        """
+        Liste les requêtes des emails dont toutes les parties sont terminées (réussies ou en échec définitif).
+
+        Returns:
+            List[dict]: Requêtes (colonnes de batch_requests), groupées par email et dans l'ordre des parties.
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT * FROM batch_requests WHERE email_key IN (
+                    SELECT email_key FROM batch_requests GROUP BY email_key
+                    HAVING SUM(status IN ('pending', 'submitted')) = 0 AND SUM(status IN ('done', 'failed')) > 0
+                )
+                ORDER BY email_key, part_index
+            """)
+            return [dict(row) for row in rows]
+
+    def mark_batch_requests(self, email_keys, status="saved"):
+        """
+        Marque les requêtes d'emails dont le traitement est terminé.
+
+        Args:
+            email_keys: Clés des emails concernés.
+            status: 'saved' (projets enregistrés) ou 'abandoned' (aucune réponse exploitable après toutes les tentatives).
+        """
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE batch_requests SET status=? WHERE email_key=?",
+                                   [(status, key) for key in email_keys])
+
+    def get_sync_state(self, account, folder):
+        """
+        Récupère le point de reprise de synchronisation d'un dossier.
+
+        Args:
+            account: Identifiant du compte email.
+            folder: Nom du dossier IMAP.
+
+        Returns:
+            dict: {"uidvalidity": int, "last_uid": int}, ou None si le dossier n'a jamais été synchronisé.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uidvalidity, last_uid FROM sync_state WHERE account=? AND folder=?", (account, folder)).fetchone()
+            return {"uidvalidity": row[0], "last_uid": row[1]} if row else None
+
+    def save_sync_state(self, account, folder, sync_state):
+        """
+        Enregistre le point de reprise de synchronisation d'un dossier.
+
+        Args:
+            account: Identifiant du compte email.
+            folder: Nom du dossier IMAP.
+            sync_state: {"uidvalidity": int, "last_uid": int} renvoyé par EmailFetcher.fetch_new_emails.
+        """
+        if not sync_state:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO sync_state (account, folder, uidvalidity, last_uid) VALUES (?, ?, ?, ?)
+                ON CONFLICT(account, folder) DO UPDATE SET uidvalidity=excluded.uidvalidity, last_uid=excluded.last_uid
+            """, (account, folder, sync_state.get("uidvalidity"), sync_state.get("last_uid") or 0))
+        self.logger.info(f"Point de reprise {account}/{folder} : UID {sync_state.get('last_uid')}.")
+
+    def save_project(self, project_data, message_id=None, sender=None, received_at=None):
         """
         Enregistre un projet dans la base de données.
 
         Args:
             project_data: Le contenu du projet à sauvegarder.
+            message_id: Entête Message-ID de l'email d'origine.
+            sender: Expéditeur de l'email d'origine.
+            received_at: Date de réception de l'email (ISO 8601).
+
+        Returns:
+            int: L'identifiant unique (id) du projet sauvegardé, ou None si ce contenu existe déjà.
+        """
+        record = self.save_projects_many([{
+            "content": project_data, "message_id": message_id, "sender": sender, "received_at": received_at,
+        }])[0]
+        return record["id"] if record else None
+
+    def save_projects_many(self, projects):
+        """
+        Enregistre un lot de projets dans une seule transaction.
+
+        Les champs extraits (PROJECT_FIELDS) sont enregistrés dans leurs colonnes ; sans "content",
+        le texte lisible du projet est calculé à partir de ces champs. Les projets d'un email déjà
+        enregistré (même Message-ID, ou même texte d'email sans Message-ID, et même rang) sont ignorés.
+        Les projets d'un même email doivent être consécutifs et dans le même appel.
+
+        Args:
+            projects: Liste de dictionnaires {"message_id", "sender", "received_at", "email_hash"
+                      (empreinte du texte de l'email)} et champs de PROJECT_FIELDS
+                      (ou "content" seul, format des versions précédentes).
 
         Returns:
-            int: L'identifiant unique (id) du projet sauvegardé.
+            list: Pour chaque projet, dans le même ordre, l'enregistrement sauvegardé
+            (dict avec id et colonnes) ou None si c'était un doublon.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO projects (content) VALUES (?)", (project_data,))  # Insère le contenu du projet
-            conn.commit()  # Sauvegarde l'insertion
-            self.logger.info(f"Projet sauvegardé.")  # Log pour confirmer l'enregistrement
-            return cursor.lastrowid  # Retourne l'id du nouveau projet inséré
+        records, ranks = [], {}
+        with metrics.timer("db_write_seconds"), self._lock, self._conn:
+            cursor = self._conn.cursor()
+            for project in projects:
+                content = project.get("content")
+                if content is None and project.get("title"):
+                    content = ProjectParser.render(project)
+                # Sans Message-ID ni empreinte de l'email (format des versions précédentes) : texte du projet
+                email_key = project.get("message_id") or project.get("email_hash")
+                if email_key:
+                    ranks[email_key] = ranks.get(email_key, -1) + 1
+                    content_hash = self.project_key(email_key, ranks[email_key])
+                else:
+                    content_hash = FileUtils.calculate_hash(content or "")
+                record = {field: project.get(field) for field in PROJECT_FIELDS}
+                if record["technologies"] is not None:
+                    record["technologies"] = json.dumps(record["technologies"], ensure_ascii=False)
+                record.update({
+                    "content": content,
+                    "message_id": project.get("message_id"),
+                    "sender": project.get("sender"),
+                    "received_at": project.get("received_at"),
+                    "content_hash": content_hash,
+                })
+                # Une requête par ligne (et non executemany) pour connaître l'id créé sans relire la table
+                cursor.execute(f"""
+                    INSERT OR IGNORE INTO projects ({', '.join(_INSERT_COLUMNS)})
+                    VALUES ({', '.join(':' + column for column in _INSERT_COLUMNS)})
+                """, record)
+                if cursor.rowcount:
+                    record["id"] = cursor.lastrowid
+                    records.append(record)
+                else:
+                    records.append(None)  # Doublon : ce projet de cet email est déjà enregistré
+
+        saved = sum(1 for record in records if record)
+        metrics.inc("projects_saved_total", saved)
+        metrics.inc("projects_duplicate_total", len(records) - saved)
+        self.logger.info(f"{saved} projets sauvegardés, {len(records) - saved} doublons ignorés.")  # Log pour confirmer l'enregistrement
+        return records
+
+    def link_duplicates(self, links):
+        """
+        Enregistre des emails quasi-doublons d'un projet existant, sans contenu propre.
+
+        Un email déjà enregistré (même Message-ID) n'est pas ajouté une seconde fois.
+
+        Args:
+            links: Liste de dictionnaires {"duplicate_of", "message_id", "sender", "received_at"}.
+
+        Returns:
+            list: Pour chaque lien, dans le même ordre, l'enregistrement sauvegardé
+            (dict avec id et colonnes) ou None si l'email était déjà enregistré.
+        """
+        records = []
+        with metrics.timer("db_write_seconds"), self._lock, self._conn:
+            cursor = self._conn.cursor()
+            for link in links:
+                record = {
+                    "content": None,
+                    "message_id": link.get("message_id"),
+                    "sender": link.get("sender"),
+                    "received_at": link.get("received_at"),
+                    "content_hash": None,
+                    "duplicate_of": link["duplicate_of"],
+                }
+                cursor.execute("""
+                    INSERT INTO projects (message_id, sender, received_at, duplicate_of)
+                    SELECT :message_id, :sender, :received_at, :duplicate_of
+                    WHERE :message_id IS NULL OR NOT EXISTS (SELECT 1 FROM projects WHERE message_id=:message_id)
+                """, record)
+                if cursor.rowcount:
+                    record["id"] = cursor.lastrowid
+                    records.append(record)
+                else:
+                    records.append(None)
+
+        linked = sum(1 for record in records if record)
+        metrics.inc("projects_linked_total", linked)
+        self.logger.info(f"{linked} quasi-doublons rattachés à un projet existant.")
+        return records
 
     def get_full_project_data(self, project_id):
         """
@@ -56,9 +566,149 @@ class ProjectDatabase:
             project_id: L'identifiant du projet à récupérer.
 
         Returns:
-            tuple: Les données du projet sous forme (id, contenu).
+            dict: Les données du projet (id, content, message_id, sender, received_at, content_hash, duplicate_of
+            et champs de PROJECT_FIELDS, technologies en JSON), ou None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM projects WHERE id=?", (project_id,)).fetchone()  # Recherche du projet par son id
+            return dict(row) if row else None  # Retourne le premier résultat trouvé (ou None)
+
+    def search_projects(self, query, sender=None, since=None, until=None, limit=20, offset=0):
+        """
+        Recherche des projets par mots-clés, du plus pertinent au moins pertinent (BM25).
+
+        Chaque mot doit être présent (accents et majuscules ignorés) ; « mot* » cherche un préfixe,
+        OR et NOT (en majuscules) combinent les mots.
+
+        Args:
+            query (str): Mots recherchés (vide = tous les projets, du plus récent au plus ancien).
+            sender (str): Expéditeur exact, ou domaine s'il commence par « @ » (ex : "@agence.fr").
+            since (str): Date de réception minimale (ISO 8601, ex : "2024-01-31").
+            until (str): Date de réception maximale, incluse (ISO 8601).
+            limit (int): Nombre de résultats par page.
+            offset (int): Nombre de résultats à sauter (pagination).
+
+        Returns:
+            dict: {"total": nombre de projets trouvés, "results": liste de
+            {"id", "message_id", "sender", "received_at", "score", "snippet"}}.
+        """
+        terms = [term for term in _SEARCH_TERM_RE.findall(query or "") if term.strip("*")]
+        if all(term in _SEARCH_OPERATORS for term in terms):
+            terms = []  # Aucun mot à chercher
+        filters, params = [], []
+        if sender:
+            if sender.startswith("@"):
+                filters.append(f"{_SENDER_DOMAIN} = ?")  # Index sur le domaine de l'expéditeur
+            else:
+                filters.append("p.sender = ?")
+            params.append(sender.lower())
+        if since:
+            filters.append("p.received_at >= ?")
+            params.append(since)
+        if until:
+            filters.append("p.received_at < ?")
+            params.append(until + "\uffff")  # Toute la journée (ou l'instant) indiquée est incluse
+
+        with self._lock:
+            if terms and self.search_enabled:
+                match = self._fts_query(terms)
+                if filters:
+                    source = "projects_fts f JOIN projects p ON p.id = f.rowid"
+                    where = " AND ".join(["projects_fts MATCH ?"] + filters)
+                else:
+                    source, where = "projects_fts f", "projects_fts MATCH ?"  # Comptage sur l'index seul
+                total = self._conn.execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", [match] + params).fetchone()[0]
+                # Classement BM25 sur les seuls identifiants ; extraits calculés pour la page affichée uniquement
+                ranked = self._conn.execute(f"""
+                    SELECT f.rowid, bm25(projects_fts) AS score FROM {source} WHERE {where}
+                    ORDER BY score, f.rowid DESC LIMIT ? OFFSET ?
+                """, [match] + params + [limit, offset]).fetchall()
+                ids = [row[0] for row in ranked]
+                placeholders = ",".join("?" * len(ids))
+                snippets = dict(self._conn.execute(f"""
+                    SELECT rowid, snippet(projects_fts, 0, '[', ']', '…', 16) FROM projects_fts
+                    WHERE projects_fts MATCH ? AND rowid IN ({placeholders})
+                """, [match] + ids).fetchall()) if ids else {}
+                rows = {row["id"]: dict(row) for row in self._conn.execute(
+                    f"SELECT id, message_id, sender, received_at FROM projects WHERE id IN ({placeholders})", ids)}
+                results = [dict(rows[project_id], score=score, snippet=snippets.get(project_id))
+                           for project_id, score in ranked]
+            else:
+                # Sans mot (ou sans FTS5) : projets filtrés, du plus récent au plus ancien
+                filters.insert(0, "p.duplicate_of IS NULL")
+                for term in (terms if not self.search_enabled else []):
+                    if term not in _SEARCH_OPERATORS:
+                        filters.append("p.content LIKE ?")
+                        params.append(f"%{term.strip('*')}%")
+                where = " AND ".join(filters)
+                total = self._conn.execute(f"SELECT COUNT(*) FROM projects p WHERE {where}", params).fetchone()[0]
+                results = [dict(row) for row in self._conn.execute(f"""
+                    SELECT p.id, p.message_id, p.sender, p.received_at, NULL AS score, substr(p.content, 1, 200) AS snippet
+                    FROM projects p WHERE {where} ORDER BY p.received_at DESC, p.id DESC LIMIT ? OFFSET ?
+                """, params + [limit, offset])]
+        return {"total": total, "results": results}
+
+    @staticmethod
+    def _fts_query(terms):
+        """
+        Traduit les mots de la recherche en requête FTS5 : chaque mot est mis entre guillemets
+        (la ponctuation n'est pas interprétée), sauf les opérateurs OR / NOT / AND.
+        """
+        parts = []
+        for term in terms:
+            if term in _SEARCH_OPERATORS:
+                # Un opérateur en tête, en fin ou répété est une erreur de syntaxe FTS5 : seul le premier est gardé
+                if parts and parts[-1] not in _SEARCH_OPERATORS:
+                    parts.append(term)
+            elif term.endswith("*"):
+                parts.append(f'"{term.strip("*")}"*')
+            else:
+                parts.append(f'"{term.strip("*")}"')
+        if parts and parts[-1] in _SEARCH_OPERATORS:
+            parts.pop()
+        return " ".join(parts)
+
+    def iter_projects(self, after_id=0, page_size=1000):
+        """
+        Parcourt les projets enregistrés par ordre d'identifiant (lecture par pages).
+
+        Args:
+            after_id: Identifiant à partir duquel reprendre (0 = tous les projets).
+            page_size: Nombre de projets lus à la fois.
+
+        Yields:
+            dict: Données du projet (colonnes de la table projects, technologies en JSON).
+        """
+        while True:
+            with self._lock:
+                rows = self._conn.execute("SELECT * FROM projects WHERE id > ? ORDER BY id LIMIT ?",
+                                          (after_id, page_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+            after_id = rows[-1]["id"]
+
+    def get_stats(self):
+        """
+        Résume le contenu de la base.
+
+        Returns:
+            dict: {"projects", "duplicates", "last_project_at", "sync_state", "batch_requests"}.
+        """
+        with self._lock:
+            projects, duplicates, last_received = self._conn.execute(
+                "SELECT COUNT(*) - COUNT(duplicate_of), COUNT(duplicate_of), MAX(received_at) FROM projects").fetchone()
+            sync_state = {f"{row['account']}/{row['folder']}": {"uidvalidity": row["uidvalidity"], "last_uid": row["last_uid"]}
+                          for row in self._conn.execute("SELECT * FROM sync_state ORDER BY account, folder")}
+            batch_requests = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM batch_requests GROUP BY status").fetchall())
+        return {"projects": projects, "duplicates": duplicates, "last_project_at": last_received,
+                "sync_state": sync_state, "batch_requests": batch_requests}
+
+    def close(self):
+        """
+        Ferme la connexion à la base de données.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM projects WHERE id=?", (project_id,))  # Recherche du projet par son id
-            return cursor.fetchone()  # Retourne le premier résultat trouvé (ou None)
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,318 @@
+# --- Importation des modules nécessaires ---
+import re                      # Pour analyser les commandes IMAP reçues
+import socket                  # Coupure des connexions (test de la reconnexion)
+import socketserver            # Serveur TCP multi-thread de la bibliothèque standard
+import sys
+import threading               # Pour servir les clients et notifier les connexions IDLE
+from email import message_from_bytes
+from email.message import Message
+
+# --- Expressions régulières précompilées ---
+_COMMAND_RE = re.compile(r'^(\S+) (\S+)(?: (.*))?$')
+_SECTION_RE = re.compile(r'BODY(?:\.PEEK)?\[([^\]]*)\]', re.IGNORECASE)
+
+
+# --- Boîte mail en mémoire partagée par toutes les connexions ---
+class FakeMailbox:
+    """Stockage en mémoire des dossiers et des messages du serveur IMAP de test."""
+
+    def __init__(self, uidvalidity: int = 1):
+        """
+        Initialise une boîte mail vide.
+
+        Args:
+            uidvalidity (int): Valeur UIDVALIDITY annoncée pour chaque dossier.
+        """
+        self.uidvalidity = uidvalidity
+        self.folders = {"INBOX": []}       # dossier -> liste de (uid, octets bruts)
+        self.next_uid = {"INBOX": 1}
+        self.condition = threading.Condition()  # Réveille les connexions en IDLE
+
+    def add_message(self, raw: bytes, folder: str = "INBOX") -> int:
+        """
+        Ajoute un message brut dans un dossier et réveille les clients en IDLE.
+
+        Args:
+            raw (bytes): Message RFC822 complet.
+            folder (str): Dossier de destination.
+
+        Returns:
+            int: UID attribué au message.
+        """
+        raw = re.sub(rb'\r?\n', b'\r\n', raw)  # IMAP impose des fins de ligne CRLF
+        with self.condition:
+            self.folders.setdefault(folder, [])
+            uid = self.next_uid.get(folder, 1)
+            self.next_uid[folder] = uid + 1
+            self.folders[folder].append((uid, raw))
+            self.condition.notify_all()
+            return uid
+
+    def reset_uidvalidity(self, uidvalidity: int) -> None:
+        """Change l'UIDVALIDITY (simule une reconstruction du dossier côté serveur)."""
+        with self.condition:
+            self.uidvalidity = uidvalidity
+
+
+# --- Traitement d'une connexion cliente ---
+class _ImapHandler(socketserver.StreamRequestHandler):
+    """Interprète les commandes d'un client IMAP (sous-ensemble d'IMAP4rev1)."""
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.clients.add(self.request)
+
+    def finish(self):
+        with self.server.lock:
+            self.server.clients.discard(self.request)
+        super().finish()
+
+    def handle(self):
+        mailbox = self.server.mailbox
+        self.folder = None
+        self._send("* OK FakeIMAP prêt")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            match = _COMMAND_RE.match(line.decode('utf-8', 'replace').rstrip('\r\n'))
+            if not match:
+                continue
+            tag, command, args = match.group(1), match.group(2).upper(), match.group(3) or ""
+            use_uid = command == "UID"
+            if use_uid:
+                command, _, args = args.partition(" ")
+                command = command.upper()
+
+            if command == "CAPABILITY":
+                self._send(f"* CAPABILITY {self.server.capabilities}")
+            elif command == "LOGIN":
+                pass
+            elif command in ("SELECT", "EXAMINE"):
+                self.folder = args.strip('"')
+                with mailbox.condition:
+                    messages = mailbox.folders.setdefault(self.folder, [])
+                    self._send(f"* {len(messages)} EXISTS")
+                    self._send("* 0 RECENT")
+                    self._send(f"* OK [UIDVALIDITY {mailbox.uidvalidity}] UIDs valides")
+                    self._send(f"* OK [UIDNEXT {mailbox.next_uid.get(self.folder, 1)}] UID suivant")
+            elif command == "STATUS":
+                folder = args.split(" ")[0].strip('"')
+                with mailbox.condition:
+                    count = len(mailbox.folders.get(folder, []))
+                    self._send(f'* STATUS "{folder}" (MESSAGES {count} UIDVALIDITY {mailbox.uidvalidity})')
+            elif command == "SEARCH":
+                self._send("* SEARCH " + " ".join(str(n) for n in self._search(args, use_uid)))
+            elif command == "FETCH":
+                self._fetch(args, use_uid)
+            elif command == "NOOP":
+                with mailbox.condition:
+                    self._send(f"* {len(mailbox.folders.get(self.folder, []))} EXISTS")
+            elif command == "IDLE":
+                self._idle(tag)
+                continue
+            elif command == "LOGOUT":
+                self._send("* BYE Au revoir")
+                self._send(f"{tag} OK LOGOUT terminé")
+                return
+            self._send(f"{tag} OK {command} terminé")
+
+    # --- Commandes ---
+    def _messages(self):
+        with self.server.mailbox.condition:
+            return list(self.server.mailbox.folders.get(self.folder, []))
+
+    def _resolve(self, sequence_set: str, use_uid: bool):
+        """Renvoie les (numéro, uid, brut) correspondant à un ensemble de séquences."""
+        messages = self._messages()
+        if not messages:
+            return []
+        highest = messages[-1][0] if use_uid else len(messages)
+        wanted = set()
+        for item in sequence_set.split(","):
+            if ":" in item:
+                a, b = item.split(":")
+                a = highest if a == "*" else int(a)
+                b = highest if b == "*" else int(b)
+                wanted.update(range(min(a, b), max(a, b) + 1))
+            else:
+                wanted.add(highest if item == "*" else int(item))
+        return [(i + 1, uid, raw) for i, (uid, raw) in enumerate(messages)
+                if (uid if use_uid else i + 1) in wanted]
+
+    def _search(self, args: str, use_uid: bool):
+        criteria = args.split()
+        if criteria and criteria[0].upper() == "CHARSET":
+            criteria = criteria[2:]
+        if len(criteria) >= 2 and criteria[0].upper() == "UID":
+            matches = self._resolve(criteria[1], True)
+        else:
+            matches = [(i + 1, uid, raw) for i, (uid, raw) in enumerate(self._messages())]
+        return [uid if use_uid else seq for seq, uid, _ in matches]
+
+    def _fetch(self, args: str, use_uid: bool):
+        sequence_set, _, items = args.partition(" ")
+        items = items.strip()
+        if items.startswith("(") and items.endswith(")"):
+            items = items[1:-1]
+        sections = _SECTION_RE.findall(items)
+        names = _SECTION_RE.sub("", items).upper().split()
+
+        for seq, uid, raw in self._resolve(sequence_set, use_uid):
+            msg = message_from_bytes(raw)
+            self.wfile.write(f"* {seq} FETCH (UID {uid}".encode())
+            if "BODYSTRUCTURE" in names:
+                self.wfile.write(b" BODYSTRUCTURE " + _bodystructure(msg))
+            if "RFC822" in names:
+                self._literal("RFC822", raw)
+            for section in sections:
+                self._literal(f"BODY[{section}]", _section(raw, msg, section))
+            self.wfile.write(b")\r\n")
+
+    def _idle(self, tag: str):
+        mailbox = self.server.mailbox
+        self._send("+ idling")
+        known = len(self._messages())
+        stop = threading.Event()
+
+        def wait_for_done():
+            self.rfile.readline()  # "DONE"
+            stop.set()
+            with mailbox.condition:
+                mailbox.condition.notify_all()
+
+        reader = threading.Thread(target=wait_for_done, daemon=True)
+        reader.start()
+        with mailbox.condition:
+            while not stop.is_set():
+                count = len(mailbox.folders.get(self.folder, []))
+                if count != known:
+                    known = count
+                    self._send(f"* {count} EXISTS")
+                mailbox.condition.wait(0.5)
+        reader.join()
+        self._send(f"{tag} OK IDLE terminé")
+
+    # --- Écriture sur la socket ---
+    def _send(self, line: str):
+        self.wfile.write(line.encode('utf-8') + b"\r\n")
+        self.wfile.flush()
+
+    def _literal(self, name: str, data: bytes):
+        self.wfile.write(f" {name} {{{len(data)}}}\r\n".encode() + data)
+
+
+# --- Construction des réponses BODYSTRUCTURE / BODY[section] ---
+def _quote(value) -> bytes:
+    if value is None:
+        return b"NIL"
+    return b'"' + str(value).replace('\\', '\\\\').replace('"', '\\"').encode('utf-8') + b'"'
+
+
+def _params(part: Message) -> bytes:
+    params = [(k, v) for k, v in part.get_params()[1:]] if part.get_params() else []
+    if not params:
+        return b"NIL"
+    return b"(" + b" ".join(_quote(k.upper()) + b" " + _quote(v) for k, v in params) + b")"
+
+
+def _bodystructure(part: Message) -> bytes:
+    if part.is_multipart():
+        children = b"".join(_bodystructure(child) for child in part.get_payload())
+        return b"(" + children + b" " + _quote(part.get_content_subtype().upper()) + b")"
+
+    raw = _raw_payload(part)
+    encoding = (part.get('Content-Transfer-Encoding') or "7BIT").upper()
+    fields = [
+        _quote(part.get_content_maintype().upper()), _quote(part.get_content_subtype().upper()),
+        _params(part), b"NIL", b"NIL", _quote(encoding), str(len(raw)).encode(),
+    ]
+    if part.get_content_maintype() == "text":
+        fields.append(str(raw.count(b"\n") + 1).encode())
+        disposition = part.get_content_disposition()
+        fields += [b"NIL", b"(" + _quote(disposition.upper()) + b" NIL)" if disposition else b"NIL", b"NIL", b"NIL"]
+    return b"(" + b" ".join(fields) + b")"
+
+
+def _section(raw: bytes, msg: Message, section: str) -> bytes:
+    section = section.upper()
+    separator = raw.find(b"\r\n\r\n")
+    if separator < 0:
+        separator = raw.find(b"\n\n")
+    if section == "HEADER":
+        return raw[:separator + 4] if separator >= 0 else raw
+    if section in ("", "RFC822"):
+        return raw
+    if section == "TEXT":
+        return raw[separator + 4:] if separator >= 0 else b""
+
+    part = msg
+    for number in section.split("."):
+        index = int(number) - 1
+        if part.is_multipart():
+            part = part.get_payload()[index]
+        elif part.get_content_type() == "message/rfc822":
+            part = part.get_payload()[0]
+            if part.is_multipart():
+                part = part.get_payload()[index]
+    return _raw_payload(part)
+
+
+def _raw_payload(part: Message) -> bytes:
+    """Renvoie le contenu d'une partie tel qu'il est transmis (encodage de transfert conservé)."""
+    if (part.get('Content-Transfer-Encoding') or '').lower() in ('base64', 'quoted-printable'):
+        return part.get_payload(decode=False).encode('ascii', 'replace')
+    return part.get_payload(decode=True) or b""
+
+
+# --- Serveur ---
+class FakeImapServer(socketserver.ThreadingTCPServer):
+    """
+    Serveur IMAP local (sans SSL) pour tester EmailFetcher et le mode démon.
+
+    Exemple :
+        server = FakeImapServer(mailbox)
+        server.start()
+        ... EmailFetcher avec imap_server="127.0.0.1", imap_port=server.port, use_ssl=False ...
+        server.stop()
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, mailbox: FakeMailbox = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _ImapHandler)
+        self.mailbox = mailbox or FakeMailbox()
+        self.port = self.server_address[1]
+        self.capabilities = "IMAP4rev1 IDLE UIDPLUS"  # Sans "IDLE" : teste le repli sur NOOP
+        self.clients = set()   # Sockets des connexions ouvertes
+        self.lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Démarre le serveur dans un thread d'arrière-plan."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def handle_error(self, request, client_address):
+        """Les connexions coupées (drop_connections, client arrêté) ne sont pas des erreurs du serveur."""
+        if not isinstance(sys.exc_info()[1], (ConnectionError, OSError)):
+            super().handle_error(request, client_address)
+
+    def drop_connections(self):
+        """Coupe brutalement toutes les connexions ouvertes (simule une panne réseau)."""
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stop(self):
+        """Arrête le serveur."""
+        self.drop_connections()
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,263 @@
+# --- Importation des modules nécessaires ---
+import email                   # Lecture des envois multipart (fichiers)
+import json                    # Corps des requêtes et réponses de l'API
+import random                  # Injection aléatoire d'erreurs
+import re                      # Technologies et adresses reconnues par la réponse par défaut
+import threading               # Serveur lancé en arrière-plan, compteurs partagés
+import time                    # Latence simulée du modèle
+import uuid                    # Identifiants des fichiers et des lots
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Technologies reconnues par la réponse par défaut
+_TECHNOLOGIES = ["Python", "Java", "React", "Angular", "Kubernetes", "Terraform", "SAP", "Salesforce", "PHP",
+                 "Symfony", "Go", "Rust", "Spark", "Snowflake", "Azure", "AWS", "GCP", "Flutter", "Node.js"]
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+
+
+def default_responder(messages) -> str:
+    """
+    Réponse par défaut : un projet au format JSON attendu par l'analyseur, dont le titre est le début
+    du texte envoyé, avec les technologies connues et la première adresse email qu'il contient.
+    """
+    text = messages[-1]["content"] if messages else ""
+    contact = _EMAIL_RE.search(text)
+    project = {"title": " ".join(text.split())[:80] or "Projet", "client": None,
+               "technologies": [name for name in _TECHNOLOGIES
+                                if re.search(r'(?<!\w)' + re.escape(name) + r'(?!\w)', text, re.IGNORECASE)],
+               "budget_min": None, "budget_max": None, "budget_currency": None, "budget_period": None,
+               "start_date": None, "duration_months": None, "location": None,
+               "contact": contact.group(0) if contact else None}
+    return json.dumps({"projects": [project]}, ensure_ascii=False)
+
+
+# --- Traitement des requêtes HTTP ---
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    """Répond aux requêtes /v1/chat/completions, /v1/files et /v1/batches comme l'API OpenAI."""
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        data = self.rfile.read(length)
+        path = self.path.rstrip('/')
+
+        if path.endswith('/files'):
+            return self._reply(200, server.create_file(self.headers.get('Content-Type') or '', data))
+        if path.endswith('/batches'):
+            batch = server.create_batch(json.loads(data or b'{}'))
+            return self._reply(200 if batch else 400, batch or {"error": {"message": "Fichier inconnu"}})
+        if not path.endswith('/chat/completions'):
+            return self._reply(404, {"error": {"message": f"Route inconnue : {self.path}"}})
+        body = json.loads(data or b'{}')
+
+        with server.lock:
+            server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.reject_response_format and "response_format" in body:
+            return self._reply(400, {"error": server.response_format_error()})
+        if server.error_rate and random.random() < server.error_rate:
+            with server.lock:
+                server.errors += 1
+            status = random.choice(server.error_statuses)
+            return self._reply(status, {"error": {"message": "Erreur simulée", "type": "server_error"}},
+                               headers={"Retry-After": "0"} if status == 429 else None)
+
+        self._reply(200, server.completion(body))
+
+    def do_GET(self):
+        server = self.server
+        parts = self.path.rstrip('/').split('/')
+        if len(parts) >= 2 and parts[-2] == 'batches':
+            batch = server.get_batch(parts[-1])
+            return self._reply(200, batch) if batch else self._reply(404, {"error": {"message": "Lot inconnu"}})
+        if len(parts) >= 3 and parts[-1] == 'content' and parts[-3] == 'files':
+            with server.lock:
+                stored = server.files.get(parts[-2])
+            if stored is None:
+                return self._reply(404, {"error": {"message": "Fichier inconnu"}})
+            return self._reply(200, stored, content_type='application/jsonl')
+        self._reply(404, {"error": {"message": f"Route inconnue : {self.path}"}})
+
+    def _reply(self, status: int, payload, headers: dict = None, content_type: str = 'application/json'):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Pas de trace sur la console pendant les tests
+
+
+# --- Serveur ---
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """
+    Serveur local imitant le point d'accès chat completions d'OpenAI.
+
+    Exemple :
+        server = FakeOpenAIServer(latency=0.2, error_rate=0.1).start()
+        config.openai_api_base = server.api_base
+        ...
+        server.stop()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, error_statuses=(429, 500, 503), responder=None, batch_delay: float = 0.0,
+                 reject_response_format: bool = False):
+        """
+        Initialise le serveur.
+
+        Args:
+            host (str): Adresse d'écoute.
+            port (int): Port d'écoute (0 = port libre choisi par le système).
+            latency (float): Latence simulée de chaque réponse (secondes).
+            error_rate (float): Proportion de requêtes qui échouent (entre 0 et 1).
+            error_statuses: Codes HTTP renvoyés pour les requêtes en échec.
+            responder: Fonction (messages) -> str produisant le texte de la réponse (par défaut default_responder).
+            batch_delay (float): Durée de traitement simulée d'un lot (secondes).
+            reject_response_format (bool): Refuse (HTTP 400) les requêtes avec response_format, comme gpt-4.
+        """
+        super().__init__((host, port), _OpenAIHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.responder = responder or default_responder
+        self.batch_delay = batch_delay
+        self.reject_response_format = reject_response_format
+        self.lock = threading.Lock()
+        self.files = {}     # Fichiers envoyés ou produits {id: contenu}
+        self.batches = {}   # Lots créés {id: objet batch}
+        self.requests = 0   # Nombre de requêtes reçues
+        self.errors = 0     # Nombre d'erreurs simulées
+        self._thread = None
+
+    @property
+    def api_base(self) -> str:
+        """URL à utiliser comme openai_api_base."""
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+    def completion(self, body: dict) -> dict:
+        """
+        Construit une réponse chat completion pour une requête donnée.
+
+        Args:
+            body (dict): Corps de la requête (model, messages...).
+
+        Returns:
+            dict: Réponse au format de l'API OpenAI.
+        """
+        messages = body.get("messages") or []
+        content = self.responder(messages)
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    @staticmethod
+    def response_format_error() -> dict:
+        """Erreur renvoyée par l'API quand le modèle ne gère pas la sortie structurée."""
+        return {"message": "Invalid parameter: 'response_format' of type 'json_schema' is not supported with this model.",
+                "type": "invalid_request_error", "param": "response_format", "code": None}
+
+    def create_file(self, content_type: str, data: bytes) -> dict:
+        """
+        Enregistre un fichier envoyé en multipart/form-data (champ "file").
+
+        Returns:
+            dict: Objet file de l'API.
+        """
+        form = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + data)
+        content = b''
+        for part in form.walk():
+            if part.get_param('name', header='content-disposition') == 'file':
+                content = part.get_payload(decode=True) or b''
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with self.lock:
+            self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "purpose": "batch"}
+
+    def create_batch(self, body: dict) -> dict:
+        """
+        Crée un lot à partir d'un fichier déjà envoyé.
+
+        Returns:
+            dict: Objet batch de l'API, ou None si le fichier est inconnu.
+        """
+        with self.lock:
+            if body.get("input_file_id") not in self.files:
+                return None
+            batch = {"id": f"batch_{uuid.uuid4().hex[:24]}", "object": "batch", "endpoint": body.get("endpoint"),
+                     "input_file_id": body["input_file_id"], "completion_window": body.get("completion_window"),
+                     "status": "in_progress", "output_file_id": None, "error_file_id": None,
+                     "created_at": int(time.time()), "request_counts": {"total": 0, "completed": 0, "failed": 0}}
+            self.batches[batch["id"]] = batch
+        return dict(batch)
+
+    def get_batch(self, batch_id: str) -> dict:
+        """
+        Renvoie l'état d'un lot ; il est traité une fois batch_delay écoulé.
+
+        Returns:
+            dict: Objet batch de l'API, ou None si le lot est inconnu.
+        """
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            if batch["status"] == "in_progress" and time.time() - batch["created_at"] >= self.batch_delay:
+                self._run_batch(batch)
+            return dict(batch)
+
+    def _run_batch(self, batch: dict):
+        """Exécute toutes les requêtes d'un lot et produit les fichiers de résultats et d'erreurs."""
+        outputs, errors = [], []
+        for line in self.files[batch["input_file_id"]].splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            self.requests += 1
+            if self.reject_response_format and "response_format" in (request.get("body") or {}):
+                errors.append({"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": request.get("custom_id"),
+                               "response": {"status_code": 400, "body": {"error": self.response_format_error()}},
+                               "error": None})
+                continue
+            if self.error_rate and random.random() < self.error_rate:
+                self.errors += 1
+                errors.append({"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": request.get("custom_id"),
+                               "response": {"status_code": 500, "body": {"error": {"message": "Erreur simulée"}}},
+                               "error": None})
+                continue
+            outputs.append({"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": request.get("custom_id"),
+                            "response": {"status_code": 200, "body": self.completion(request.get("body") or {})},
+                            "error": None})
+
+        for key, lines in (("output_file_id", outputs), ("error_file_id", errors)):
+            if lines:
+                file_id = f"file-{uuid.uuid4().hex[:24]}"
+                self.files[file_id] = b''.join(json.dumps(l).encode('utf-8') + b'\n' for l in lines)
+                batch[key] = file_id
+        batch["request_counts"] = {"total": len(outputs) + len(errors), "completed": len(outputs), "failed": len(errors)}
+        batch["status"] = "completed"
+
+    def start(self):
+        """Démarre le serveur dans un thread d'arrière-plan."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrête le serveur."""
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,224 @@
+# --- Importation des modules nécessaires ---
+import random                  # Contenu pseudo-aléatoire, reproductible grâce à la graine
+from datetime import datetime, timedelta, timezone
+from email.header import Header            # Sujets encodés dans le jeu de caractères de l'email
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import format_datetime
+from typing import Iterator
+
+# --- Pièces jointes : type MIME et extension de chaque sorte ---
+ATTACHMENT_TYPES = {
+    "pdf": ("pdf", "cv.pdf"),
+    "docx": ("vnd.openxmlformats-officedocument.wordprocessingml.document", "fiche_mission.docx"),
+    "png": ("octet-stream", "logo.png"),
+    "ics": ("octet-stream", "entretien.ics"),
+}
+
+# --- Vocabulaire des emails générés ---
+_FIRST_NAMES = ["Camille", "Julien", "Sophie", "Nicolas", "Amélie", "Thomas", "Léa", "Hugo", "Chloé", "Mathieu"]
+_LAST_NAMES = ["Martin", "Bernard", "Dubois", "Lefèvre", "Moreau", "Laurent", "Girard", "Roux", "Fournier", "Mercier"]
+_AGENCIES = [f"agence{i}" for i in range(40)] + ["talents-it", "freelance-conseil", "esn-horizon", "digital-staffing"]
+_ROLES = ["développeur", "architecte", "lead developer", "ingénieur DevOps", "data engineer", "chef de projet",
+          "consultant fonctionnel", "product owner", "ingénieur sécurité", "data scientist"]
+_TECHNOLOGIES = ["Python", "Java", "React", "Angular", "Kubernetes", "Terraform", "SAP", "Salesforce", "PHP",
+                 "Symfony", "Go", "Rust", "Spark", "Snowflake", "Azure", "AWS", "GCP", "Flutter", "Node.js",
+                 "PostgreSQL", "Kafka", "Airflow", "Vue.js", "C#", ".NET", "Scala", "Elasticsearch", "Ansible"]
+_CLIENTS = ["une banque de détail", "un assureur", "un e-commerçant", "un industriel de l'aéronautique",
+            "une startup de la santé", "un opérateur télécom", "une mutuelle", "un éditeur de logiciels",
+            "une collectivité", "un groupe de médias", "un énergéticien", "un acteur du luxe"]
+_CITIES = ["Paris", "Lyon", "Nantes", "Lille", "Bordeaux", "Toulouse", "Marseille", "Rennes", "Grenoble", "Sophia"]
+_REMOTE = ["", ", 2 jours de télétravail par semaine", ", full remote possible", ", présentiel complet"]
+_SENIORITY = ["junior accepté", "3 ans d'expérience minimum", "senior", "confirmé, 5 ans et plus"]
+_TASKS = ["concevoir les nouveaux services", "reprendre le code existant", "mettre en place la CI/CD",
+          "accompagner l'équipe dans la migration vers le cloud", "rédiger les spécifications",
+          "optimiser les performances des traitements", "animer les ateliers avec les métiers",
+          "assurer le support de niveau 3", "industrialiser les modèles", "sécuriser les accès",
+          "piloter les prestataires", "automatiser les déploiements", "superviser la production"]
+_REPLIES = ["le client confirme le budget", "le démarrage est décalé de deux semaines",
+            "un entretien est possible jeudi", "le télétravail partiel est accepté",
+            "le client souhaite un second profil", "la mission est prolongée de trois mois"]
+_NEWS_TOPICS = ["les tendances du marché", "notre prochain webinaire", "les nouveautés de notre plateforme",
+                "le salon de la rentrée", "notre guide des bonnes pratiques", "les résultats de notre enquête"]
+
+
+# --- Générateur de boîtes mail synthétiques ---
+class MailboxGenerator:
+    """
+    Produit des emails de recrutement synthétiques (RFC822) pour les tests et benchmarks,
+    toujours identiques pour une même graine.
+
+    Exemple :
+        generator = MailboxGenerator(emails=1000, attachments={"pdf": 0.2}, thread_depth=3)
+        stats = generator.fill(mailbox, folders=["INBOX", "Missions"])
+    """
+
+    def __init__(self, emails: int = 500, attachments: dict = None, attachment_kb: int = 200,
+                 charsets=("utf-8", "iso-8859-1", "windows-1252"), thread_depth: int = 1,
+                 noise_ratio: float = 0.1, long_ratio: float = 0.02, html_ratio: float = 0.3, seed: int = 1):
+        """
+        Initialise le générateur.
+
+        Args:
+            emails (int): Nombre total d'emails.
+            attachments (dict): Probabilité de chaque sorte de pièce jointe par email (ex : {"pdf": 0.2, "png": 0.1}).
+            attachment_kb (int): Taille moyenne d'une pièce jointe (Ko, de 0,5 à 1,5 fois cette valeur).
+            charsets: Jeux de caractères des emails, tirés au hasard.
+            thread_depth (int): Nombre maximal d'emails d'une conversation (réponses citant les précédents).
+            noise_ratio (float): Part des emails sans projet (newsletters), écartés par le pré-filtre.
+            long_ratio (float): Part des emails longs, découpés en plusieurs morceaux pour l'analyse.
+            html_ratio (float): Part des emails avec une version HTML.
+            seed (int): Graine du générateur pseudo-aléatoire.
+        """
+        unknown = set(attachments or {}) - set(ATTACHMENT_TYPES)
+        if unknown:
+            raise ValueError(f"Pièces jointes inconnues : {', '.join(sorted(unknown))} "
+                             f"(possibles : {', '.join(ATTACHMENT_TYPES)})")
+        self.emails = emails
+        self.attachments = dict(attachments or {})
+        self.attachment_kb = attachment_kb
+        self.charsets = list(charsets) or ["utf-8"]
+        self.thread_depth = max(1, thread_depth)
+        self.noise_ratio = noise_ratio
+        self.long_ratio = long_ratio
+        self.html_ratio = html_ratio
+        self.seed = seed
+
+    def threads(self) -> Iterator[list]:
+        """
+        Génère les conversations : listes d'emails bruts, l'email d'origine en premier.
+
+        Returns:
+            Iterator[list]: Conversations, jusqu'à atteindre le nombre d'emails demandé.
+        """
+        rng = random.Random(self.seed)
+        start = datetime(2024, 1, 8, 8, 0, tzinfo=timezone(timedelta(hours=1)))
+        produced = 0
+        while produced < self.emails:
+            depth = min(rng.randint(1, self.thread_depth), self.emails - produced)
+            sender = self._person(rng)
+            charset = rng.choice(self.charsets)
+            noise = rng.random() < self.noise_ratio
+            subject, body = self._newsletter(rng, sender) if noise else self._project(rng, sender)
+
+            thread, references = [], []
+            for reply in range(depth):
+                index = produced + reply
+                message_id = f"<bench-{self.seed}-{index}@synthetic.local>"
+                date = start + timedelta(minutes=37 * index)
+                if reply:
+                    previous = body
+                    body = (f"Bonjour,\n\nPetite précision : {rng.choice(_REPLIES)}.\n\nCordialement,\n{sender[0]}\n\n"
+                            f"Le {format_datetime(date - timedelta(minutes=37))}, {sender[1]} a écrit :\n"
+                            + "\n".join("> " + line for line in previous.splitlines()))
+                thread.append(self._message(rng, message_id, references, sender, charset,
+                                            ("RE: " if reply else "") + subject, body, date, noise))
+                references = references + [message_id]
+            produced += depth
+            yield thread
+
+    def messages(self) -> Iterator[bytes]:
+        """Génère les emails bruts, conversation par conversation."""
+        for thread in self.threads():
+            yield from thread
+
+    def fill(self, mailbox, folders=("INBOX",)) -> dict:
+        """
+        Remplit une FakeMailbox ; les conversations sont réparties entre les dossiers.
+
+        Args:
+            mailbox: FakeMailbox à remplir.
+            folders: Dossiers de destination.
+
+        Returns:
+            dict: {"emails", "threads", "bytes"} ajoutés.
+        """
+        stats = {"emails": 0, "threads": 0, "bytes": 0}
+        for index, thread in enumerate(self.threads()):
+            folder = folders[index % len(folders)]
+            for raw in thread:
+                mailbox.add_message(raw, folder)
+                stats["emails"] += 1
+                stats["bytes"] += len(raw)
+            stats["threads"] += 1
+        return stats
+
+    # --- Construction des emails ---
+    @staticmethod
+    def _person(rng) -> tuple:
+        """(nom affiché, adresse) d'un recruteur."""
+        first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+        address = f"{first.lower()}.{last.lower()}@{rng.choice(_AGENCIES)}.fr"
+        return f"{first} {last}", address.replace("é", "e").replace("è", "e")
+
+    def _project(self, rng, sender) -> tuple:
+        """Sujet et texte d'une demande de mission."""
+        technologies = rng.sample(_TECHNOLOGIES, rng.randint(3, 6))
+        role, city, duration = rng.choice(_ROLES), rng.choice(_CITIES), rng.choice([3, 6, 9, 12, 18, 24])
+        tjm = rng.randrange(350, 900, 25)
+        reference = rng.randint(10000, 99999)
+        subject = f"Mission {role} {technologies[0]} - {city} - réf. {reference}"
+        lines = [
+            "Bonjour,",
+            "",
+            f"Pour {rng.choice(_CLIENTS)}, nous recherchons un {role} {technologies[0]} / {technologies[1]} "
+            f"({rng.choice(_SENIORITY)}) pour une mission freelance de {duration} mois à {city}{rng.choice(_REMOTE)}.",
+            f"Démarrage : {rng.choice(['ASAP', 'sous 2 semaines', 'début du mois prochain', '2024-09-02'])}. "
+            f"TJM : {tjm} - {tjm + rng.randrange(0, 150, 25)} euros selon profil.",
+            f"Environnement technique : {', '.join(technologies)}.",
+            f"Missions : {'; '.join(rng.sample(_TASKS, rng.randint(2, 4)))}.",
+            "",
+            f"Merci de m'envoyer votre CV à {sender[1]} en précisant votre disponibilité (réf. {reference}).",
+            "",
+            f"Cordialement,\n{sender[0]}",
+        ]
+        if rng.random() < self.long_ratio:
+            # Email long (contexte détaillé) : plusieurs morceaux pour l'analyse
+            context = [f"{task.capitalize()} ({rng.choice(technologies)}, lot {n})."
+                       for n, task in enumerate(rng.choices(_TASKS, k=400))]
+            lines[6:6] = ["", "Contexte détaillé du projet :", " ".join(context)]
+        return subject, "\n".join(lines)
+
+    @staticmethod
+    def _newsletter(rng, sender) -> tuple:
+        """Sujet et texte d'un email sans projet."""
+        topics = rng.sample(_NEWS_TOPICS, 3)
+        subject = f"Newsletter n°{rng.randint(1, 400)} : {topics[0]}"
+        body = (f"Bonjour,\n\nCe mois-ci, découvrez {topics[0]}, {topics[1]} et {topics[2]}.\n"
+                f"Bonne lecture !\n\n{sender[0]}\n\nPour vous désabonner, répondez STOP à cet email.")
+        return subject, body
+
+    def _message(self, rng, message_id, references, sender, charset, subject, body, date, noise) -> bytes:
+        """Email RFC822 complet : texte (et HTML), pièces jointes, entêtes de conversation."""
+        body = body.encode(charset, 'replace').decode(charset)  # Caractères absents du jeu remplacés
+        text = MIMEText(body, 'plain', charset)
+        if not noise and rng.random() < self.html_ratio:
+            paragraphs = "".join(f"<p>{line}</p>" for line in body.splitlines() if line)
+            alternative = MIMEMultipart('alternative')
+            alternative.attach(text)
+            alternative.attach(MIMEText(f"<html><body>{paragraphs}</body></html>", 'html', charset))
+            text = alternative
+
+        attached = [kind for kind, probability in self.attachments.items() if not noise and rng.random() < probability]
+        if attached:
+            msg = MIMEMultipart('mixed')
+            msg.attach(text)
+            for kind in attached:
+                subtype, filename = ATTACHMENT_TYPES[kind]
+                size = int(self.attachment_kb * 1024 * rng.uniform(0.5, 1.5))
+                part = MIMEApplication(rng.randbytes(size), subtype)
+                part.add_header('Content-Disposition', 'attachment', filename=filename)
+                msg.attach(part)
+        else:
+            msg = text
+
+        msg['Subject'] = Header(subject, charset)
+        msg['From'] = f"{Header(sender[0], charset).encode()} <{sender[1]}>"
+        msg['To'] = "freelance@example.com"
+        msg['Date'] = format_datetime(date)
+        msg['Message-ID'] = message_id
+        if references:
+            msg['In-Reply-To'] = references[-1]
+            msg['References'] = " ".join(references)
+        return msg.as_bytes()
@@ -0,0 +1,90 @@
+# --- Importation des modules nécessaires ---
+import imaplib            # Erreurs de connexion IMAP
+import logging            # Module pour écrire des messages dans des fichiers de logs
+import queue              # File d'attente thread-safe pour les connexions inactives
+import threading          # Sémaphore limitant le nombre de connexions ouvertes
+import time               # Durée d'inactivité des connexions
+from contextlib import contextmanager
+
+_CHECK_AFTER = 60  # Inactivité (secondes) au-delà de laquelle une connexion est vérifiée (NOOP) avant réutilisation
+
+
+# --- Définition du pool de connexions IMAP d'un compte ---
+class ImapConnectionPool:
+    def __init__(self, fetcher, max_connections: int = 2):
+        """
+        Initialise un pool borné de connexions IMAP authentifiées pour un compte.
+
+        Args:
+            fetcher: EmailFetcher du compte, utilisé pour ouvrir et fermer les connexions.
+            max_connections (int): Nombre maximal de connexions ouvertes simultanément.
+        """
+        self.fetcher = fetcher
+        self.max_connections = max(1, max_connections)
+        self._slots = threading.BoundedSemaphore(self.max_connections)  # Limite imposée par le fournisseur
+        self._idle = queue.LifoQueue()  # Connexions ouvertes disponibles (la plus récente d'abord), avec leur date de remise
+        self.logger = logging.getLogger('ImapConnectionPool')
+
+    @contextmanager
+    def connection(self):
+        """
+        Fournit une connexion du pool le temps d'un bloc `with`.
+
+        Une connexion existante est réutilisée si possible (après un NOOP si elle est inactive
+        depuis longtemps, le serveur ayant pu la fermer), sinon une nouvelle est ouverte.
+        Si le bloc lève une exception, la connexion est fermée au lieu d'être remise dans le pool.
+
+        Yields:
+            Connexion IMAP authentifiée.
+
+        Raises:
+            ConnectionError: Si la connexion au serveur échoue.
+        """
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._reuse()
+            if conn is None:
+                conn = self.fetcher.connect()
+            if conn is None:
+                raise ConnectionError(f"Impossible de se connecter au serveur IMAP {self.fetcher.server}.")
+
+            try:
+                yield conn
+            except (imaplib.IMAP4.abort, OSError):
+                # Connexion coupée : les autres connexions inactives l'ont sans doute été aussi
+                self.close_all()
+                raise
+            self._idle.put((conn, time.monotonic()))  # Connexion saine : elle retourne dans le pool
+            conn = None
+        finally:
+            if conn is not None:
+                self.fetcher.disconnect(conn)
+            self._slots.release()
+
+    def _reuse(self):
+        """Renvoie une connexion inactive encore ouverte, ou None s'il n'y en a pas."""
+        while True:
+            try:
+                conn, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if time.monotonic() - released_at < _CHECK_AFTER:
+                return conn
+            try:
+                conn.noop()
+                return conn
+            except Exception as e:
+                self.logger.info(f"Connexion IMAP inactive fermée par le serveur ({e}) : nouvelle connexion.")
+                self.fetcher.disconnect(conn)
+
+    def close_all(self):
+        """
+        Ferme toutes les connexions inactives du pool.
+        """
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.fetcher.disconnect(conn)
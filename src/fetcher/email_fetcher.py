@@ -1,27 +1,43 @@
 # --- Importation des modules nécessaires ---
 import imaplib            # Module pour se connecter à une boîte mail via IMAP
+import re                 # Module pour lire les réponses STATUS du serveur
 import email              # Module pour manipuler les emails
 import logging            # Module pour écrire des messages dans des fichiers de logs
 from email import message_from_bytes  # Fonction pour convertir un email brut en objet manipulable
 from email.message import Message     # Type utilisé pour les emails
+from email.charset import Charset     # Corps reconstruit en UTF-8 sans encodage de transfert
 from email.header import decode_header # Pour décoder les entêtes d'email
-from typing import List               # Pour préciser les types de retour de fonctions
+from typing import Iterator, List, Optional, Tuple  # Pour préciser les types de retour de fonctions
+from fetcher.imap_utils import ImapUtils  # Outils pour interpréter les réponses IMAP
+from fetcher.mime_extractor import MimeExtractor  # Texte d'un email brut sans lire les pièces jointes
+from core.metrics import metrics  # Durées de connexion et de récupération
+
+# --- Corps reconstruit : UTF-8 en 8bit, le texte déjà décodé n'est pas réencodé en base64 ---
+_UTF8_8BIT = Charset('utf-8')
+_UTF8_8BIT.body_encoding = None
 
 # --- Définition de la classe pour récupérer les emails ---
 class EmailFetcher:
-    def __init__(self, config):
+    def __init__(self, config, account=None, store=None):
         """
         Initialise la classe EmailFetcher avec la configuration donnée.
 
         Args:
             config: Configuration contenant les paramètres de connexion au serveur mail.
+            account (dict): Compte de config.accounts à utiliser à la place du compte principal.
+            store: MessageStore où copier chaque email récupéré (None = pas de copie locale).
         """
-        self.server = config.imap_server      # Adresse du serveur IMAP
-        self.port = config.imap_port           # Port utilisé pour la connexion
-        self.user = config.email_user          # Identifiant de connexion (adresse email)
-        self.password = config.email_pass      # Mot de passe de l'email
-        self.use_ssl = config.use_ssl          # Indique si la connexion doit être sécurisée (SSL)
+        account = account or {}
+        self.server = account.get("imap_server", config.imap_server)  # Adresse du serveur IMAP
+        self.port = account.get("imap_port", config.imap_port)        # Port utilisé pour la connexion
+        self.user = account.get("email_user", config.email_user)      # Identifiant de connexion (adresse email)
+        self.password = account.get("email_pass", config.email_pass)  # Mot de passe de l'email
+        self.use_ssl = account.get("use_ssl", config.use_ssl)         # Indique si la connexion doit être sécurisée (SSL)
         self.fetch_limit = config.fetch_limit  # Nombre maximum d'emails à récupérer
+        self.fetch_mode = config.fetch_mode    # "batched" (par paquets d'UID) ou "full" (RFC822 message par message)
+        self.batch_size = config.fetch_batch_size  # Nombre d'UID demandés par commande FETCH
+        self.account_name = account.get("name") or self.user  # Nom du compte dans le stockage local
+        self.store = store                     # Stockage local des emails récupérés
         self.logger = logging.getLogger('EmailFetcher')  # Système de journalisation pour cette classe
 
     def connect(self):
@@ -32,18 +48,20 @@ class EmailFetcher:
             Connexion au serveur ou None en cas d'erreur.
         """
         try:
-            # Utilise une connexion sécurisée si SSL est demandé
-            if self.use_ssl:
-                conn = imaplib.IMAP4_SSL(self.server, self.port)
-            else:
-                conn = imaplib.IMAP4(self.server, self.port)
-            
-            # Connexion au serveur avec identifiant et mot de passe
-            conn.login(self.user, self.password)
+            with metrics.timer("imap_connect_seconds"):
+                # Utilise une connexion sécurisée si SSL est demandé
+                if self.use_ssl:
+                    conn = imaplib.IMAP4_SSL(self.server, self.port)
+                else:
+                    conn = imaplib.IMAP4(self.server, self.port)
+
+                # Connexion au serveur avec identifiant et mot de passe
+                conn.login(self.user, self.password)
             self.logger.info(f"Connecté au serveur IMAP : {self.server}")
             return conn
         except Exception as e:
             # En cas d'erreur de connexion, enregistre l'erreur et retourne None
+            metrics.inc("imap_connect_errors_total")
             self.logger.error(f"Erreur de connexion IMAP: {e}")
             return None
 
@@ -58,6 +76,9 @@ class EmailFetcher:
         Returns:
             Liste d'objets Message représentant les emails récupérés.
         """
+        if self.fetch_mode == "batched":
+            return self.fetch_emails_batched(mail_conn, folder)
+
         try:
             mail_conn.select(folder)  # Sélectionne le dossier d'emails
             typ, data = mail_conn.search(None, 'ALL')  # Cherche tous les emails disponibles
@@ -69,9 +90,8 @@ class EmailFetcher:
                 typ, msg_data = mail_conn.fetch(mail_id, '(RFC822)')  # Récupère le contenu complet de l'email
                 for response_part in msg_data:
                     if isinstance(response_part, tuple):
-                        # Convertit les données brutes en objet email manipulable
-                        msg = message_from_bytes(response_part[1])
-                        fetched_mails.append(msg)
+                        # Entêtes + texte seulement : les pièces jointes ne sont pas analysées
+                        fetched_mails.append(self._parse_raw(response_part[1]))
 
             self.logger.info(f"{len(fetched_mails)} emails récupérés.")
             return fetched_mails
@@ -80,6 +100,232 @@ class EmailFetcher:
             self.logger.error(f"Erreur lors de la récupération des emails: {e}")
             return []
 
+    def fetch_emails_batched(self, mail_conn, folder: str = "INBOX") -> List[Message]:
+        """
+        Récupère les emails d'un dossier par paquets d'UID, sans télécharger les pièces jointes.
+
+        Args:
+            mail_conn: Connexion active au serveur IMAP.
+            folder (str): Nom du dossier à consulter (par défaut "INBOX").
+
+        Returns:
+            Liste d'objets Message (entêtes + texte brut) représentant les emails récupérés.
+        """
+        try:
+            mail_conn.select(folder, readonly=True)  # Lecture seule : les emails restent non lus
+            typ, data = mail_conn.uid('SEARCH', None, 'ALL')
+            uids = [int(uid) for uid in data[0].split()]
+            if self.fetch_limit:
+                uids = uids[-self.fetch_limit:]  # Uniquement les derniers emails selon la limite définie
+
+            fetched_mails = [msg for _, msg in self.iter_messages(mail_conn, uids)]
+            self.logger.info(f"{len(fetched_mails)} emails récupérés par paquets de {self.batch_size}.")
+            return fetched_mails
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la récupération des emails: {e}")
+            return []
+
+    def fetch_new_emails(self, mail_conn, folder: str = "INBOX", sync_state: Optional[dict] = None):
+        """
+        Synchronisation incrémentale : ne récupère que les emails arrivés depuis le dernier passage.
+
+        Si aucun point de reprise n'existe ou si l'UIDVALIDITY du dossier a changé,
+        une resynchronisation complète est faite (limitée à fetch_limit comme fetch_emails).
+
+        Args:
+            mail_conn: Connexion active au serveur IMAP.
+            folder (str): Nom du dossier à consulter (par défaut "INBOX").
+            sync_state (dict): Point de reprise {"uidvalidity": int, "last_uid": int} ou None.
+
+        Returns:
+            Tuple[List[Message], dict]: Les emails récupérés et le nouveau point de reprise
+            (inchangé en cas d'erreur).
+        """
+        try:
+            uids, new_state = self.plan_sync(mail_conn, folder, sync_state)
+            fetched_mails = [msg for _, msg in self.iter_uids(mail_conn, uids, folder, new_state["uidvalidity"])]
+            self.logger.info(f"{len(fetched_mails)} nouveaux emails récupérés dans {folder}.")
+            return fetched_mails, new_state
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la synchronisation des emails: {e}")
+            return [], sync_state
+
+    def plan_sync(self, mail_conn, folder: str = "INBOX", sync_state: Optional[dict] = None):
+        """
+        Sélectionne un dossier et détermine les UID à récupérer depuis le point de reprise.
+
+        Args:
+            mail_conn: Connexion active au serveur IMAP.
+            folder (str): Nom du dossier à consulter.
+            sync_state (dict): Point de reprise {"uidvalidity": int, "last_uid": int} ou None
+                               (None = les fetch_limit derniers emails).
+
+        Returns:
+            Tuple[List[int], dict]: Les UID à récupérer (croissants) et le point de reprise
+            à enregistrer une fois ces emails traités.
+        """
+        mail_conn.select(folder, readonly=True)
+        uidvalidity = self._get_uidvalidity(mail_conn, folder)
+
+        if sync_state and sync_state.get("uidvalidity") == uidvalidity:
+            # --- Incrémental : uniquement les UID supérieurs au dernier vu ---
+            last_uid = sync_state.get("last_uid") or 0
+            typ, data = mail_conn.uid('SEARCH', None, f'UID {last_uid + 1}:*')
+            # "n:*" renvoie toujours le dernier email, même s'il est déjà connu
+            uids = [uid for uid in (int(u) for u in data[0].split()) if uid > last_uid]
+        else:
+            # --- Resynchronisation complète ---
+            if sync_state:
+                self.logger.warning(f"UIDVALIDITY modifiée pour {folder} : resynchronisation complète.")
+            last_uid = 0
+            typ, data = mail_conn.uid('SEARCH', None, 'ALL')
+            uids = [int(uid) for uid in data[0].split()]
+            if self.fetch_limit:
+                uids = uids[-self.fetch_limit:]
+
+        uids.sort()
+        return uids, {"uidvalidity": uidvalidity, "last_uid": max(uids, default=last_uid)}
+
+    def _get_uidvalidity(self, mail_conn, folder: str) -> Optional[int]:
+        """
+        Lit l'UIDVALIDITY du dossier sélectionné (réponse au SELECT, sinon commande STATUS).
+
+        Args:
+            mail_conn: Connexion active au serveur IMAP.
+            folder (str): Nom du dossier sélectionné.
+
+        Returns:
+            int: Valeur UIDVALIDITY du dossier, ou None si le serveur ne la fournit pas.
+        """
+        typ, data = mail_conn.response('UIDVALIDITY')
+        if data and data[0]:
+            return int(data[0])
+
+        typ, data = mail_conn.status(folder, '(UIDVALIDITY)')
+        match = re.search(rb'UIDVALIDITY (\d+)', data[0] or b'') if data else None
+        return int(match.group(1)) if match else None
+
+    def iter_uids(self, mail_conn, uids: List[int], folder: str = None,
+                  uidvalidity: Optional[int] = None) -> Iterator[Tuple[int, Message]]:
+        """
+        Récupère une liste d'UID selon le mode de récupération configuré.
+
+        Chaque email est aussi copié dans le stockage local (s'il est configuré).
+
+        Args:
+            mail_conn: Connexion active au serveur IMAP (dossier déjà sélectionné).
+            uids (List[int]): UID des emails à récupérer.
+            folder (str): Dossier sélectionné (clé du stockage local).
+            uidvalidity (int): UIDVALIDITY du dossier (clé du stockage local).
+
+        Yields:
+            Tuple[int, Message]: L'UID et l'email récupéré.
+        """
+        for uid, msg in self._fetch_uids(mail_conn, uids):
+            metrics.inc("emails_fetched_total")
+            if self.store is not None and folder is not None:
+                try:
+                    self.store.put(self.account_name, folder, uidvalidity, uid, msg)
+                except Exception as e:
+                    # Le stockage local est une copie : son échec n'interrompt pas la récupération
+                    self.logger.error(f"Erreur d'écriture dans le stockage local (UID {uid}) : {e}")
+            yield uid, msg
+
+    def _fetch_uids(self, mail_conn, uids: List[int]) -> Iterator[Tuple[int, Message]]:
+        """Récupère une liste d'UID, en mode "batched" ou "full"."""
+        if self.fetch_mode == "batched":
+            yield from self.iter_messages(mail_conn, uids)
+            return
+
+        for uid in uids:
+            with metrics.timer("imap_fetch_seconds", {"pass": "full"}):
+                typ, msg_data = mail_conn.uid('FETCH', str(uid), '(RFC822)')  # Contenu complet de l'email
+            for response_part in msg_data:
+                if isinstance(response_part, tuple):
+                    yield uid, self._parse_raw(response_part[1])
+
+    def iter_messages(self, mail_conn, uids: List[int]) -> Iterator[Tuple[int, Message]]:
+        """
+        Récupère une liste d'UID du dossier sélectionné, paquet par paquet.
+
+        Premier passage : entêtes et BODYSTRUCTURE uniquement.
+        Second passage : seulement les parties text/plain utiles à l'analyse.
+
+        Args:
+            mail_conn: Connexion active au serveur IMAP (dossier déjà sélectionné).
+            uids (List[int]): UID des emails à récupérer.
+
+        Yields:
+            Tuple[int, Message]: L'UID et l'email reconstruit.
+        """
+        for chunk in ImapUtils.chunk_uids(sorted(uids), self.batch_size):
+            # --- Passage 1 : entêtes + structure MIME ---
+            with metrics.timer("imap_fetch_seconds", {"pass": "structure"}):
+                typ, data = mail_conn.uid('FETCH', ImapUtils.to_sequence_set(chunk), '(UID BODYSTRUCTURE BODY.PEEK[HEADER])')
+            headers, text_parts = {}, {}
+            for attributes, sections in ImapUtils.parse_fetch_response(data):
+                if attributes.get('UID') is None:
+                    continue  # Réponse non sollicitée (ex : FLAGS)
+                uid = int(attributes['UID'])
+                headers[uid] = sections.get('BODY[HEADER]', b'')
+                text_parts[uid] = ImapUtils.find_text_parts(attributes.get('BODYSTRUCTURE'))
+
+            # --- Passage 2 : parties texte, regroupées par numéros de partie identiques ---
+            groups = {}
+            for uid, parts in text_parts.items():
+                groups.setdefault(tuple(number for number, _, _ in parts), []).append(uid)
+
+            bodies = {}
+            for numbers, group_uids in groups.items():
+                if not numbers:
+                    continue  # Aucun texte à récupérer (ex : email composé d'une seule pièce jointe)
+                items = " ".join(f"BODY.PEEK[{number}]" for number in numbers)
+                with metrics.timer("imap_fetch_seconds", {"pass": "text"}):
+                    typ, data = mail_conn.uid('FETCH', ImapUtils.to_sequence_set(group_uids), f'(UID {items})')
+                for attributes, sections in ImapUtils.parse_fetch_response(data):
+                    if attributes.get('UID') is not None:
+                        bodies[int(attributes['UID'])] = sections
+
+            for uid in chunk:
+                if uid not in headers:
+                    continue
+                sections = bodies.get(uid, {})
+                text = "\n".join(
+                    ImapUtils.decode_part(sections.get(f"BODY[{number}]", b''), encoding, charset)
+                    for number, charset, encoding in text_parts[uid]
+                )
+                yield uid, self._build_message(headers[uid], text)
+
+    def _parse_raw(self, raw: bytes) -> Message:
+        """
+        Convertit un email brut (RFC822) en email simple (entêtes + texte), sans construire l'arbre MIME.
+
+        Args:
+            raw (bytes): Email brut renvoyé par FETCH RFC822.
+
+        Returns:
+            Message: Email non multipart dont le corps est le texte en UTF-8.
+        """
+        header_bytes, text = MimeExtractor.extract(raw)
+        return self._build_message(header_bytes, text)
+
+    def _build_message(self, header_bytes: bytes, text: str) -> Message:
+        """
+        Reconstruit un email simple (entêtes d'origine + corps texte) à partir des morceaux récupérés.
+
+        Args:
+            header_bytes (bytes): Entêtes bruts de l'email.
+            text (str): Texte déjà décodé des parties text/plain.
+
+        Returns:
+            Message: Email non multipart dont le corps est le texte en UTF-8 (8bit).
+        """
+        msg = message_from_bytes(header_bytes)
+        del msg['Content-Type']
+        del msg['Content-Transfer-Encoding']
+        msg.set_payload(text, _UTF8_8BIT)
+        return msg
+
     def disconnect(self, mail_conn):
         """
         Se déconnecte proprement du serveur IMAP.
@@ -0,0 +1,167 @@
+# --- Importation des modules nécessaires ---
+import imaplib            # Erreurs de connexion IMAP
+import logging            # Module pour écrire des messages dans des fichiers de logs
+import queue              # File bornée entre les threads de récupération et le consommateur
+import threading          # Threads de récupération et signal d'arrêt
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from fetcher.email_fetcher import EmailFetcher           # Récupération des emails d'un compte
+from fetcher.connection_pool import ImapConnectionPool   # Pool de connexions IMAP par compte
+from fetcher.sync_tracker import FolderSync              # Dossier en cours de synchronisation
+
+_DONE = object()  # Marqueur de fin d'un thread de récupération
+
+
+class _Stopped(Exception):
+    """Levée dans un thread de récupération quand le consommateur a abandonné la lecture des emails."""
+
+
+# --- Définition du moteur de récupération multi-comptes / multi-dossiers ---
+class FetchEngine:
+    def __init__(self, config, store=None):
+        """
+        Initialise le moteur de récupération pour tous les comptes configurés.
+
+        Args:
+            config: Configuration contenant la liste des comptes (config.accounts) et les limites de parallélisme.
+            store: MessageStore où copier les emails récupérés (None = pas de copie locale).
+        """
+        self.sync_mode = config.sync_mode      # "incremental" ou "full"
+        self.workers = max(1, config.fetch_workers)  # Nombre de dossiers récupérés en parallèle
+        self.queue_size = max(1, config.pipeline_queue_size)  # Emails récupérés en attente de traitement
+        self.logger = logging.getLogger('FetchEngine')
+
+        # Un EmailFetcher et un pool de connexions par compte
+        self.fetchers = {}
+        self.pools = {}
+        self.folders = {}
+        for account in config.accounts:
+            name = account["name"]
+            self.fetchers[name] = EmailFetcher(config, account, store)
+            self.pools[name] = ImapConnectionPool(self.fetchers[name], config.max_connections)
+            self.folders[name] = account.get("folders") or ["INBOX"]
+
+    def targets(self) -> List[Tuple[str, str]]:
+        """
+        Liste les couples (compte, dossier) à récupérer.
+
+        Returns:
+            List[Tuple[str, str]]: Couples (nom du compte, dossier).
+        """
+        return [(name, folder) for name, folders in self.folders.items() for folder in folders]
+
+    def iter_emails(self, sync_states: Optional[Dict[Tuple[str, str], dict]] = None,
+                    targets: Optional[List[Tuple[str, str]]] = None) -> Iterator[tuple]:
+        """
+        Récupère tous les dossiers de tous les comptes en parallèle et produit les emails un par un.
+
+        Les threads de récupération déposent leurs résultats dans une file bornée :
+        si le traitement en aval prend du retard, la récupération se met en pause.
+
+        Args:
+            sync_states (dict): Points de reprise {(compte, dossier): {"uidvalidity", "last_uid"}}.
+            targets (list): Couples (compte, dossier) à récupérer (None = tous, voir targets()).
+
+        Yields:
+            Événements sous forme de tuples :
+            ("start", FolderSync) avant les emails d'un dossier,
+            ("email", FolderSync, uid, Message) pour chaque email,
+            ("end", FolderSync, ok) quand le dossier est terminé (ok=False en cas d'erreur).
+        """
+        sync_states = sync_states or {}
+        events = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        tasks = queue.Queue()
+        for target in (self.targets() if targets is None else targets):
+            tasks.put(target)
+
+        def put(event):
+            # Attente bornée pour pouvoir s'arrêter si le consommateur abandonne :
+            # _Stopped interrompt alors la récupération du dossier en cours
+            while not stop.is_set():
+                try:
+                    events.put(event, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+            raise _Stopped()
+
+        def worker():
+            try:
+                while not stop.is_set():
+                    try:
+                        name, folder = tasks.get_nowait()
+                    except queue.Empty:
+                        break
+                    self._fetch_folder(name, folder, sync_states.get((name, folder)), put)
+                put(_DONE)
+            except _Stopped:
+                pass  # Plus personne ne lit les événements
+
+        threads = [threading.Thread(target=worker, name=f"fetch-{i}", daemon=True)
+                   for i in range(min(self.workers, max(1, tasks.qsize())))]
+        for thread in threads:
+            thread.start()
+
+        try:
+            finished = 0
+            while finished < len(threads):
+                event = events.get()
+                if event is _DONE:
+                    finished += 1
+                else:
+                    yield event
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def _fetch_folder(self, name: str, folder: str, sync_state: Optional[dict], put):
+        """
+        Récupère un dossier d'un compte avec une connexion du pool.
+
+        Si la connexion est coupée avant le premier email (connexion inactive fermée par
+        le serveur, fréquent en mode démon), le dossier est repris une fois avec une nouvelle connexion.
+
+        Args:
+            name (str): Nom du compte.
+            folder (str): Dossier IMAP.
+            sync_state (dict): Point de reprise du dossier (mode incrémental).
+            put: Fonction recevant les événements produits.
+
+        Raises:
+            _Stopped: Levée par put quand le consommateur a abandonné ; la récupération s'arrête.
+        """
+        fetcher = self.fetchers[name]
+        for attempt in range(2):
+            folder_sync = None
+            try:
+                with self.pools[name].connection() as conn:
+                    state = sync_state if self.sync_mode == "incremental" else None
+                    uids, new_state = fetcher.plan_sync(conn, folder, state)
+                    folder_sync = FolderSync(name, folder, uids, new_state if self.sync_mode == "incremental" else None)
+                    put(("start", folder_sync))
+                    for uid, msg in fetcher.iter_uids(conn, uids, folder, (new_state or {}).get("uidvalidity")):
+                        put(("email", folder_sync, uid, msg))
+                self.logger.info(f"{len(folder_sync.uids)} emails récupérés dans {name}/{folder}.")
+                put(("end", folder_sync, True))
+                return
+            except _Stopped:
+                raise  # Arrêt demandé : ni nouvelle tentative ni événement de fin
+            except (imaplib.IMAP4.abort, OSError) as e:
+                if attempt == 0 and folder_sync is None:
+                    self.logger.warning(f"Connexion perdue pour {name}/{folder} ({e}), nouvelle tentative.")
+                    continue
+                self.logger.error(f"Erreur lors de la récupération de {name}/{folder}: {e}")
+            except Exception as e:
+                self.logger.error(f"Erreur lors de la récupération de {name}/{folder}: {e}")
+            if folder_sync is not None:
+                put(("end", folder_sync, False))
+            return
+
+    def close(self):
+        """
+        Ferme toutes les connexions ouvertes de tous les comptes.
+        """
+        for pool in self.pools.values():
+            pool.close_all()
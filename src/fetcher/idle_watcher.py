@@ -0,0 +1,172 @@
+# --- Importation des modules nécessaires ---
+import itertools          # Numérotation des commandes IDLE
+import logging            # Module pour écrire des messages dans des fichiers de logs
+import re                 # Lecture des réponses "* n EXISTS"
+import socket             # Délai de lecture pendant l'attente IDLE
+import threading          # Un thread de surveillance par dossier
+import time
+from typing import Callable, Optional
+
+_EXISTS_RE = re.compile(rb'^\* (\d+) EXISTS', re.IGNORECASE)
+_READ_TIMEOUT = 1.0           # Lecture bornée pendant IDLE : le signal d'arrêt est vu en une seconde au plus
+_MAX_RECONNECT_DELAY = 300    # Délai maximal entre deux tentatives de reconnexion (secondes)
+
+
+# --- Lecture ligne par ligne directement sur la socket ---
+class _LineReader:
+    """
+    Lit les réponses du serveur pendant IDLE, avec un délai de lecture.
+
+    La lecture se fait sur la socket et non sur le fichier tampon d'imaplib : un délai
+    dépassé sur ce fichier le rendrait inutilisable pour les commandes suivantes.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b""
+
+    def readline(self, timeout: float) -> Optional[bytes]:
+        """
+        Returns:
+            bytes: Ligne reçue (sans CRLF), ou None si rien n'est arrivé pendant `timeout` secondes.
+
+        Raises:
+            ConnectionError: Si le serveur a fermé la connexion.
+        """
+        while b"\n" not in self.buffer:
+            self.sock.settimeout(timeout)
+            try:
+                data = self.sock.recv(4096)
+            except socket.timeout:
+                return None
+            if not data:
+                raise ConnectionError("Connexion fermée par le serveur pendant IDLE.")
+            self.buffer += data
+        line, _, self.buffer = self.buffer.partition(b"\n")
+        return line.rstrip(b"\r")
+
+
+# --- Surveillance d'un dossier IMAP (IDLE, NOOP, reconnexion) ---
+class IdleWatcher(threading.Thread):
+    _tags = itertools.count(1)
+
+    def __init__(self, fetcher, account: str, folder: str, notify: Callable, config):
+        """
+        Initialise la surveillance d'un dossier sur une connexion dédiée.
+
+        Le dossier est surveillé avec IDLE (RFC 2177) : le serveur signale les nouveaux emails
+        dès leur arrivée. IDLE est renouvelé toutes les idle_timeout secondes, avec un NOOP
+        qui maintient la connexion. Si le serveur ne gère pas IDLE, un NOOP est envoyé toutes
+        les poll_interval secondes. En cas de coupure, la connexion est rouverte avec un délai croissant.
+
+        Args:
+            fetcher: EmailFetcher du compte (ouverture et fermeture des connexions).
+            account (str): Nom du compte.
+            folder (str): Dossier surveillé.
+            notify: Fonction (compte, dossier) appelée quand le dossier a peut-être de nouveaux emails.
+            config: Configuration contenant "daemon_idle_timeout", "daemon_poll_interval"
+                    et "daemon_reconnect_delay".
+        """
+        super().__init__(name=f"idle-{account}-{folder}", daemon=True)
+        self.fetcher = fetcher
+        self.account = account
+        self.folder = folder
+        self.notify = notify
+        self.idle_timeout = config.daemon_idle_timeout        # Renouvellement de IDLE (< 29 min, RFC 2177)
+        self.poll_interval = config.daemon_poll_interval      # NOOP périodique si IDLE n'est pas disponible
+        self.reconnect_delay = config.daemon_reconnect_delay  # Premier délai avant reconnexion
+        self.logger = logging.getLogger('IdleWatcher')
+        self._stopping = threading.Event()  # Pas « _stop » : méthode interne de threading.Thread, utilisée par join()
+
+    def stop(self):
+        """Demande l'arrêt de la surveillance (effectif en une seconde au plus)."""
+        self._stopping.set()
+
+    def run(self):
+        """Boucle de surveillance : connexion, attente des nouveaux emails, reconnexion après une coupure."""
+        delay = self.reconnect_delay
+        while not self._stopping.is_set():
+            conn = self.fetcher.connect()
+            if conn is None:
+                self._stopping.wait(delay)
+                delay = min(delay * 2, _MAX_RECONNECT_DELAY)
+                continue
+            try:
+                conn.select(self.folder, readonly=True)
+                delay = self.reconnect_delay
+                # Rattrapage : des emails ont pu arriver avant la (re)connexion
+                self.notify(self.account, self.folder)
+                if "IDLE" in conn.capabilities:
+                    self._watch_idle(conn)
+                else:
+                    self.logger.info(f"IDLE non disponible pour {self.account}/{self.folder} : NOOP toutes les "
+                                     f"{self.poll_interval}s.")
+                    self._watch_noop(conn)
+            except Exception as e:
+                if not self._stopping.is_set():
+                    self.logger.warning(f"Surveillance de {self.account}/{self.folder} interrompue ({e}), "
+                                        f"reconnexion dans {delay}s.")
+                    self._stopping.wait(delay)
+                    delay = min(delay * 2, _MAX_RECONNECT_DELAY)
+            finally:
+                self.fetcher.disconnect(conn)
+
+    def _watch_idle(self, conn):
+        """Enchaîne les attentes IDLE, séparées par un NOOP de maintien de la connexion."""
+        sock = conn.socket()
+        timeout = sock.gettimeout()
+        try:
+            while not self._stopping.is_set():
+                if self._idle(sock):
+                    self.notify(self.account, self.folder)
+                sock.settimeout(timeout)
+                conn.noop()  # Maintien de la connexion (et détection d'une coupure silencieuse)
+        finally:
+            sock.settimeout(timeout)
+
+    def _idle(self, sock) -> bool:
+        """
+        Une attente IDLE, jusqu'à un nouvel email, l'arrêt ou idle_timeout.
+
+        Returns:
+            bool: True si le serveur a signalé un changement du nombre d'emails (EXISTS).
+        """
+        tag = b"IDLE%d" % next(self._tags)
+        reader = _LineReader(sock)
+        sock.sendall(tag + b" IDLE\r\n")
+        line = reader.readline(self.idle_timeout)
+        if line is None or not line.startswith(b"+"):
+            raise ConnectionError(f"IDLE refusé par le serveur : {line!r}")
+
+        changed = False
+        deadline = time.monotonic() + self.idle_timeout
+        while not changed and not self._stopping.is_set() and time.monotonic() < deadline:
+            line = reader.readline(_READ_TIMEOUT)
+            if line is None:
+                continue
+            if line.upper().startswith(b"* BYE"):
+                raise ConnectionError(f"Connexion fermée par le serveur : {line!r}")
+            changed = _EXISTS_RE.match(line) is not None
+
+        # Fin de IDLE : le serveur termine la commande par une réponse étiquetée
+        sock.sendall(b"DONE\r\n")
+        while True:
+            line = reader.readline(self.idle_timeout)
+            if line is None:
+                raise ConnectionError("Pas de réponse du serveur à la fin de IDLE.")
+            if line.startswith(tag + b" "):
+                if not line[len(tag) + 1:].upper().startswith(b"OK"):
+                    raise ConnectionError(f"Fin de IDLE refusée : {line!r}")
+                return changed
+            changed = changed or _EXISTS_RE.match(line) is not None
+
+    def _watch_noop(self, conn):
+        """Serveur sans IDLE : un NOOP périodique fait remonter les nouveaux emails (réponse EXISTS)."""
+        typ, data = conn.response('EXISTS')
+        known = data[-1] if data and data[-1] else None
+        while not self._stopping.wait(self.poll_interval):
+            conn.noop()
+            typ, data = conn.response('EXISTS')
+            if data and data[-1] and data[-1] != known:
+                known = data[-1]
+                self.notify(self.account, self.folder)
@@ -0,0 +1,262 @@
+# --- Importation des modules nécessaires ---
+import re                     # Module pour gérer les expressions régulières
+import base64                 # Pour décoder les parties encodées en base64
+import quopri                 # Pour décoder les parties encodées en quoted-printable
+from typing import Dict, List, Optional, Tuple
+from core.utils import TextUtils  # Décodage avec repli sur d'autres jeux de caractères
+
+# --- Expressions régulières précompilées pour lire les réponses IMAP ---
+_TOKEN_RE = re.compile(rb'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))')
+_MESSAGE_START_RE = re.compile(rb'^\d+ \(')
+_SECTION_LITERAL_RE = re.compile(rb'(BODY\[[^\]]*\](?:<\d+>)?)\s*\{\d+\}$')
+_LITERAL_RE = re.compile(rb'\{\d+\}$')
+
+
+# --- Classe regroupant les outils de lecture du protocole IMAP ---
+class ImapUtils:
+    """Outils pour construire les requêtes IMAP et interpréter leurs réponses."""
+
+    @staticmethod
+    def to_sequence_set(uids: List[int]) -> str:
+        """
+        Compacte une liste d'UID en ensemble de séquences IMAP (ex : "1:500,502").
+
+        Args:
+            uids (List[int]): Liste des UID à regrouper.
+
+        Returns:
+            str: Ensemble de séquences utilisable dans une commande UID FETCH.
+        """
+        ranges = []
+        start = previous = None
+        for uid in sorted(set(uids)):
+            if start is None:
+                start = previous = uid
+            elif uid == previous + 1:
+                previous = uid
+            else:
+                ranges.append((start, previous))
+                start = previous = uid
+        if start is not None:
+            ranges.append((start, previous))
+
+        return ",".join(f"{a}:{b}" if a != b else str(a) for a, b in ranges)
+
+    @staticmethod
+    def chunk_uids(uids: List[int], chunk_size: int) -> List[List[int]]:
+        """
+        Découpe une liste d'UID en paquets de taille maximale chunk_size.
+
+        Args:
+            uids (List[int]): Liste des UID.
+            chunk_size (int): Nombre maximal d'UID par paquet.
+
+        Returns:
+            List[List[int]]: Liste de paquets d'UID.
+        """
+        chunk_size = max(1, chunk_size)
+        return [uids[i:i + chunk_size] for i in range(0, len(uids), chunk_size)]
+
+    @staticmethod
+    def parse_fetch_response(data) -> List[Tuple[Dict[str, object], Dict[str, bytes]]]:
+        """
+        Interprète la réponse brute d'imaplib à une commande FETCH.
+
+        Args:
+            data: Liste renvoyée par imaplib (octets et tuples (entête, littéral)).
+
+        Returns:
+            Liste de couples (attributs, sections) pour chaque message :
+            les attributs (UID, BODYSTRUCTURE...) et le contenu des sections BODY[...]
+            (littéral {n} ou chaîne entre guillemets).
+        """
+        groups = []
+        for item in data or []:
+            if item is None:
+                continue
+            head = item[0] if isinstance(item, tuple) else item
+            if _MESSAGE_START_RE.match(head) or not groups:
+                groups.append([])
+            groups[-1].append(item)
+
+        messages = []
+        for group in groups:
+            pieces, sections = [], {}
+            for item in group:
+                if isinstance(item, tuple):
+                    prefix, literal = item[0], item[1]
+                    match = _SECTION_LITERAL_RE.search(prefix)
+                    if match:
+                        # Section du corps : on la garde à part sans la recopier dans les métadonnées
+                        sections[ImapUtils._section_name(match.group(1))] = literal
+                        pieces.append(prefix[:match.end(1)] + b' NIL')
+                    else:
+                        # Littéral interne (ex : nom de fichier) : réinjecté comme chaîne
+                        escaped = literal.replace(b'\\', b'\\\\').replace(b'"', b'\\"')
+                        pieces.append(_LITERAL_RE.sub(b'', prefix) + b'"' + escaped + b'"')
+                else:
+                    pieces.append(item)
+
+            tokens = ImapUtils.parse_list(b''.join(pieces))
+            if len(tokens) < 2 or not isinstance(tokens[1], list):
+                continue
+            attributes = {}
+            values = tokens[1]
+            for i in range(0, len(values) - 1, 2):
+                key, value = values[i], values[i + 1]
+                if not isinstance(key, bytes):
+                    continue
+                if key.upper().startswith(b'BODY[') and isinstance(value, bytes):
+                    # Section courte renvoyée en chaîne entre guillemets au lieu d'un littéral {n}
+                    sections.setdefault(ImapUtils._section_name(key), value)
+                attributes[key.decode('ascii', 'replace').upper()] = value
+            messages.append((attributes, sections))
+
+        return messages
+
+    @staticmethod
+    def parse_list(data: bytes) -> List[object]:
+        """
+        Convertit une expression IMAP parenthésée en listes Python imbriquées.
+
+        Args:
+            data (bytes): Texte brut de la réponse.
+
+        Returns:
+            List[object]: Éléments (octets, None pour NIL, ou sous-listes).
+        """
+        root = []
+        stack = [root]
+        pos = 0
+        while pos < len(data):
+            match = _TOKEN_RE.match(data, pos)
+            if not match or match.end() == pos:
+                break
+            pos = match.end()
+            open_paren, close_paren, quoted, atom = match.groups()
+            if open_paren:
+                child = []
+                stack[-1].append(child)
+                stack.append(child)
+            elif close_paren:
+                if len(stack) > 1:
+                    stack.pop()
+            elif quoted is not None:
+                stack[-1].append(re.sub(rb'\\(.)', rb'\1', quoted))
+            elif atom is not None:
+                stack[-1].append(None if atom.upper() == b'NIL' else atom)
+        return root
+
+    @staticmethod
+    def find_text_parts(structure) -> List[Tuple[str, str, str]]:
+        """
+        Parcourt une BODYSTRUCTURE et liste les parties texte utiles à l'analyse.
+
+        Args:
+            structure: BODYSTRUCTURE déjà convertie par parse_list.
+
+        Returns:
+            List[Tuple[str, str, str]]: Triplets (numéro de partie, charset, encodage).
+        """
+        parts = []
+        if isinstance(structure, list) and structure:
+            if isinstance(structure[0], list):
+                ImapUtils._walk_body(structure, "", parts)
+            else:
+                # Message simple : on garde le corps s'il est textuel, comme l'analyse historique
+                if ImapUtils._lower(structure[0]) == "text":
+                    parts.append(("1",) + ImapUtils._part_encoding(structure))
+        return parts
+
+    @staticmethod
+    def decode_part(payload: bytes, encoding: str, charset: Optional[str]) -> str:
+        """
+        Décode une partie de message selon son encodage de transfert et son charset.
+
+        Args:
+            payload (bytes): Contenu brut de la partie.
+            encoding (str): Encodage de transfert (base64, quoted-printable, 7bit...).
+            charset (str): Jeu de caractères déclaré (utf-8 par défaut).
+
+        Returns:
+            str: Texte décodé.
+        """
+        payload = payload or b''
+        encoding = (encoding or '').lower()
+        try:
+            if encoding == 'base64':
+                payload = base64.b64decode(payload)
+            elif encoding == 'quoted-printable':
+                payload = quopri.decodestring(payload)
+        except Exception:
+            pass  # Contenu mal encodé : on garde les octets bruts
+
+        return TextUtils.decode_bytes(payload, charset)
+
+    # --- Méthodes internes ---
+    @staticmethod
+    def _walk_body(body, prefix: str, parts: list) -> None:
+        """Parcourt le corps d'un message (principal ou encapsulé)."""
+        if isinstance(body[0], list):
+            for index, child in enumerate(ImapUtils._children(body)):
+                ImapUtils._walk_part(child, ImapUtils._join(prefix, index + 1), parts)
+        else:
+            ImapUtils._walk_part(body, ImapUtils._join(prefix, 1), parts)
+
+    @staticmethod
+    def _walk_part(part, number: str, parts: list) -> None:
+        """Parcourt une partie numérotée d'une BODYSTRUCTURE."""
+        if not isinstance(part, list) or not part:
+            return
+        if isinstance(part[0], list):
+            for index, child in enumerate(ImapUtils._children(part)):
+                ImapUtils._walk_part(child, f"{number}.{index + 1}", parts)
+            return
+
+        maintype, subtype = ImapUtils._lower(part[0]), ImapUtils._lower(part[1])
+        if maintype == "message" and subtype == "rfc822" and len(part) > 8 and isinstance(part[8], list):
+            ImapUtils._walk_body(part[8], number, parts)
+        elif maintype == "text" and subtype == "plain" and not ImapUtils._is_attachment(part):
+            parts.append((number,) + ImapUtils._part_encoding(part))
+
+    @staticmethod
+    def _children(multipart) -> list:
+        """Renvoie les sous-parties d'une partie multipart."""
+        children = []
+        for item in multipart:
+            if not isinstance(item, list):
+                break  # Le sous-type marque la fin des sous-parties
+            children.append(item)
+        return children
+
+    @staticmethod
+    def _is_attachment(part) -> bool:
+        """Indique si une partie est déclarée comme pièce jointe."""
+        disposition = part[9] if len(part) > 9 else None
+        return isinstance(disposition, list) and bool(disposition) and ImapUtils._lower(disposition[0]) == "attachment"
+
+    @staticmethod
+    def _part_encoding(part) -> Tuple[str, str]:
+        """Renvoie le charset et l'encodage de transfert d'une partie."""
+        charset = "utf-8"
+        params = part[2] if len(part) > 2 and isinstance(part[2], list) else []
+        for i in range(0, len(params) - 1, 2):
+            if ImapUtils._lower(params[i]) == "charset" and params[i + 1]:
+                charset = params[i + 1].decode('ascii', 'replace')
+        encoding = ImapUtils._lower(part[5]) if len(part) > 5 else "7bit"
+        return charset, encoding or "7bit"
+
+    @staticmethod
+    def _section_name(section: bytes) -> str:
+        """Normalise le nom d'une section (BODY[1]<0> -> BODY[1])."""
+        return re.sub(r'<\d+>$', '', section.decode('ascii', 'replace').upper())
+
+    @staticmethod
+    def _join(prefix: str, index: int) -> str:
+        """Construit le numéro d'une sous-partie."""
+        return f"{prefix}.{index}" if prefix else str(index)
+
+    @staticmethod
+    def _lower(value) -> str:
+        """Convertit un atome IMAP en texte minuscule."""
+        return value.decode('ascii', 'replace').lower() if isinstance(value, bytes) else ""
@@ -0,0 +1,124 @@
+# --- Importation des modules nécessaires ---
+from email.parser import BytesHeaderParser  # Lecture des entêtes seuls (le corps n'est pas analysé)
+from typing import Iterator, List, Tuple
+from fetcher.imap_utils import ImapUtils    # Décodage base64 / quoted-printable et charset
+
+_MAX_DEPTH = 20   # Imbrication maximale de parties multipart (protection contre les emails malformés)
+
+
+# --- Extraction du texte d'un email brut, sans construire l'arbre MIME complet ---
+class MimeExtractor:
+    """
+    Lit les entêtes et le texte (parties text/plain, ou corps textuel d'un message simple) d'un email RFC822 directement dans les octets bruts.
+
+    Les frontières multipart sont repérées avec bytes.find sur le message d'origine : seules
+    les parties texte sont copiées et décodées, les pièces jointes ne sont jamais lues
+    (contrairement à email.message_from_bytes qui découpe et stocke chaque partie).
+    """
+
+    _parser = BytesHeaderParser()
+
+    @staticmethod
+    def extract(raw: bytes) -> Tuple[bytes, str]:
+        """
+        Extrait les entêtes et le texte d'un email.
+
+        Args:
+            raw (bytes): Email brut (RFC822).
+
+        Returns:
+            Tuple[bytes, str]: Entêtes bruts de l'email et texte des parties text/plain (séparées par un saut de ligne),
+                              ou corps d'un message simple text/*.
+        """
+        header_end, body_start = MimeExtractor._split_entity(raw, 0, len(raw))
+        header_bytes = raw[:header_end]
+        texts = []
+        MimeExtractor._walk(raw, body_start, len(raw), MimeExtractor._parser.parsebytes(header_bytes), texts, 0)
+        return header_bytes, "\n".join(texts)
+
+    # --- Méthodes internes ---
+    @staticmethod
+    def _walk(raw: bytes, start: int, end: int, headers, texts: List[str], depth: int) -> None:
+        """Parcourt une partie (entêtes déjà lus, corps entre start et end) et collecte son texte."""
+        content_type = headers.get_content_type()
+        if headers.get_content_maintype() == "multipart":
+            boundary = headers.get_boundary()
+            if not boundary or depth >= _MAX_DEPTH:
+                return
+            for part_start, part_end in MimeExtractor._iter_parts(raw, start, end, b"--" + boundary.encode('latin-1')):
+                header_end, body_start = MimeExtractor._split_entity(raw, part_start, part_end)
+                part_headers = MimeExtractor._parser.parsebytes(raw[part_start:header_end])
+                if content_type == "multipart/digest":
+                    part_headers.set_default_type("message/rfc822")
+                MimeExtractor._walk(raw, body_start, part_end, part_headers, texts, depth + 1)
+        elif content_type == "message/rfc822" and depth < _MAX_DEPTH:
+            # Email transféré en pièce jointe : son texte est analysé comme celui de l'email principal
+            header_end, body_start = MimeExtractor._split_entity(raw, start, end)
+            MimeExtractor._walk(raw, body_start, end, MimeExtractor._parser.parsebytes(raw[start:header_end]),
+                                texts, depth + 1)
+        elif (depth == 0 and headers.get_content_maintype() == "text") or \
+                (content_type == "text/plain" and headers.get_content_disposition() != "attachment"):
+            # Message simple : tout corps textuel est gardé (text/html compris), comme ImapUtils.find_text_parts
+            encoding = (headers.get('Content-Transfer-Encoding') or '7bit').strip()
+            texts.append(ImapUtils.decode_part(raw[start:end], encoding, headers.get_content_charset()))
+
+    @staticmethod
+    def _split_entity(raw: bytes, start: int, end: int) -> Tuple[int, int]:
+        """
+        Sépare les entêtes du corps d'une partie.
+
+        Returns:
+            Tuple[int, int]: Fin des entêtes et début du corps (positions dans raw).
+        """
+        if raw.startswith(b"\r\n", start):
+            return start, start + 2   # Partie sans entête
+        if raw.startswith(b"\n", start):
+            return start, start + 1
+        crlf = raw.find(b"\r\n\r\n", start, end)
+        lf = raw.find(b"\n\n", start, crlf if crlf >= 0 else end)
+        if lf >= 0:
+            return lf + 1, lf + 2
+        if crlf >= 0:
+            return crlf + 2, crlf + 4
+        return end, end               # Entêtes seuls, sans corps
+
+    @staticmethod
+    def _iter_parts(raw: bytes, start: int, end: int, delimiter: bytes) -> Iterator[Tuple[int, int]]:
+        """
+        Repère les sous-parties d'un corps multipart.
+
+        Yields:
+            Tuple[int, int]: Début et fin de chaque sous-partie (entêtes compris) dans raw.
+        """
+        position = MimeExtractor._find_delimiter(raw, start, end, delimiter)
+        while position >= 0:
+            after = position + len(delimiter)
+            if raw.startswith(b"--", after):
+                return  # Délimiteur de fin
+            line_end = raw.find(b"\n", after, end)
+            part_start = line_end + 1 if line_end >= 0 else end
+            position = MimeExtractor._find_delimiter(raw, part_start, end, delimiter)
+            if position < 0:
+                yield part_start, end  # Délimiteur de fin absent : la partie va jusqu'au bout
+                return
+            # Le saut de ligne qui précède le délimiteur lui appartient
+            part_end = position - 1
+            if part_end > part_start and raw[part_end - 1] == 0x0D:
+                part_end -= 1
+            yield part_start, max(part_start, part_end)
+
+    @staticmethod
+    def _find_delimiter(raw: bytes, start: int, end: int, delimiter: bytes) -> int:
+        """Position du prochain délimiteur en début de ligne, ou -1."""
+        position = start
+        while True:
+            position = raw.find(delimiter, position, end)
+            if position < 0:
+                return -1
+            after = position + len(delimiter)
+            at_line_start = position == start or raw[position - 1] == 0x0A
+            # Le délimiteur est suivi de "--", d'espaces ou de la fin de ligne (pas d'une frontière plus longue,
+            # ex : « --abc-1 » quand la frontière est « abc »)
+            if at_line_start and (after >= end or raw.startswith(b"--", after, end) or raw[after] in b"\r\n \t"):
+                return position
+            position += 1
@@ -0,0 +1,135 @@
+# --- Importation des modules nécessaires ---
+import threading          # Le suivi est mis à jour depuis plusieurs threads du pipeline
+from typing import List, Optional
+
+
+# --- Synchronisation d'un dossier en cours ---
+class FolderSync:
+    """Dossier en cours de synchronisation : UID prévus et point de reprise visé."""
+
+    def __init__(self, account: str, folder: str, uids: List[int], new_state: Optional[dict]):
+        """
+        Args:
+            account (str): Nom du compte.
+            folder (str): Dossier IMAP.
+            uids (List[int]): UID qui vont être récupérés (croissants).
+            new_state (dict): Point de reprise atteint quand tous ces UID sont traités.
+        """
+        self.account = account
+        self.folder = folder
+        self.uids = uids
+        self.new_state = new_state
+
+
+# --- Définition du suivi des points de reprise en mode pipeline ---
+class SyncCheckpointTracker:
+    def __init__(self, save_state):
+        """
+        Initialise le suivi des emails traités par dossier.
+
+        Les emails sortent du pipeline dans le désordre : le point de reprise d'un dossier
+        n'avance que jusqu'au plus grand UID dont tous les prédécesseurs sont traités.
+        Un arrêt brutal ne fait donc perdre que les emails en cours de traitement.
+        Un email en échec (mark_failed) bloque le point de reprise juste avant lui :
+        il est récupéré à nouveau au passage suivant, avec les emails qui le suivent.
+
+        Args:
+            save_state: Fonction (compte, dossier, point de reprise) qui enregistre le point de reprise.
+        """
+        self.save_state = save_state
+        self._folders = {}
+        self._lock = threading.Lock()
+
+    def register(self, folder_sync):
+        """
+        Déclare un dossier dont les emails vont entrer dans le pipeline.
+
+        Args:
+            folder_sync: FolderSync produit par FetchEngine.iter_emails.
+        """
+        with self._lock:
+            self._folders[id(folder_sync)] = {"sync": folder_sync, "index": 0, "seen": set(), "done": set(),
+                                              "failed": set()}
+        if not folder_sync.uids:
+            self._save(folder_sync, folder_sync.new_state)  # Rien de nouveau : l'UIDVALIDITY est tout de même mémorisée
+
+    def seen(self, folder_sync, uid: int):
+        """
+        Signale qu'un email du dossier a été récupéré et entre dans le pipeline.
+        """
+        with self._lock:
+            self._folders[id(folder_sync)]["seen"].add(uid)
+
+    def mark_done(self, folder_sync, uid: int):
+        """
+        Signale qu'un email est sorti du pipeline après un traitement complet
+        (projets enregistrés, aucun projet, écarté par le filtre ou quasi-doublon).
+        """
+        self._mark(folder_sync, [uid])
+
+    def mark_failed(self, folder_sync, uid: int):
+        """
+        Signale qu'un email est sorti du pipeline sans avoir été traité (erreur d'analyse,
+        d'enregistrement...) : le point de reprise du dossier ne dépassera pas cet UID.
+        """
+        with self._lock:
+            state = self._folders.get(id(folder_sync))
+            if state is not None:
+                state["failed"].add(uid)
+
+    def finish(self) -> int:
+        """
+        Termine un passage : les dossiers encore incomplets (emails en échec, récupération
+        interrompue) sont oubliés, leur point de reprise reste là où il s'est arrêté.
+
+        Returns:
+            int: Nombre d'emails en échec (traités à nouveau au prochain passage).
+        """
+        with self._lock:
+            failed = sum(len(state["failed"]) for state in self._folders.values())
+            self._folders.clear()
+        return failed
+
+    def folder_finished(self, folder_sync, ok: bool):
+        """
+        Signale la fin de la récupération d'un dossier.
+
+        Si elle a réussi, les UID prévus mais absents de la réponse du serveur
+        (ex : emails supprimés entre-temps) sont considérés comme traités.
+
+        Args:
+            folder_sync: FolderSync du dossier.
+            ok (bool): False si la récupération a été interrompue par une erreur.
+        """
+        if not ok:
+            return  # Le point de reprise restera avant les emails non récupérés
+        with self._lock:
+            state = self._folders.get(id(folder_sync))
+            missing = [uid for uid in folder_sync.uids if uid not in state["seen"]] if state else []
+        if missing:
+            self._mark(folder_sync, missing)
+
+    def _mark(self, folder_sync, uids):
+        """Marque des UID comme traités et fait avancer le point de reprise si possible."""
+        with self._lock:
+            state = self._folders.get(id(folder_sync))
+            if state is None:
+                return
+            state["done"].update(uids)
+            start = state["index"]
+            planned = folder_sync.uids
+            while state["index"] < len(planned) and planned[state["index"]] in state["done"]:
+                state["index"] += 1
+            if state["index"] == start:
+                return
+            if state["index"] == len(planned):
+                new_state = folder_sync.new_state
+                del self._folders[id(folder_sync)]
+            else:
+                new_state = dict(folder_sync.new_state or {}, last_uid=planned[state["index"] - 1])
+        self._save(folder_sync, new_state)
+
+    def _save(self, folder_sync, new_state):
+        """Enregistre le point de reprise (ignoré en mode de synchronisation complète)."""
+        if folder_sync.new_state is not None:
+            self.save_state(folder_sync.account, folder_sync.folder, new_state)
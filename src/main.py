@@ -1,4 +1,6 @@
 # --- Importation des modules nécessaires ---
+import argparse
+import json
 import os
 import sys
 
@@ -6,60 +8,488 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # --- Importation des composants du projet ---
+# Seuls les modules légers sont importés ici : chaque commande importe ce qu'elle utilise
+# (le client openai, par exemple, n'est chargé qu'au premier appel à l'API).
 from config.config import Config          # Chargement de la configuration (paramètres du projet)
-from fetcher.email_fetcher import EmailFetcher    # Module pour récupérer les emails
-from analyzer.email_analyzer import EmailAnalyzer # Module pour analyser les emails
-from database.project_database import ProjectDatabase  # Module pour enregistrer les projets dans une base de données
-from reporter.report_generator import ReportGenerator   # Module pour générer des rapports à partir des projets
-from core.logger import setup_logger         # Module pour gérer les journaux d'activité (logs)
+from core.logger import setup_logger, configure_logging, shutdown_logging  # Module pour gérer les journaux d'activité (logs)
+from core.metrics import metrics, RunProfiler  # Métriques du passage et profilage optionnel
 
-# --- Définition de la fonction principale ---
-def main():
-    # Initialisation de la configuration et du système de logs
-    config = Config()
-    logger = setup_logger('Main', os.path.join(config.logs_dir, 'app.log'))
-    logger.info("=== Démarrage de Email Project Extractor ===")
+# Point de reprise de la commande "analyze" (position dans le stockage local, table sync_state)
+STORE_CHECKPOINT = ("local-store", "*")
+
+# --- Lecture des arguments de la ligne de commande ---
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Email Project Extractor")
+    commands = parser.add_subparsers(dest="command", metavar="commande")
+
+    run = commands.add_parser("run", help="Récupère, analyse, enregistre et publie les nouveaux emails (par défaut)")
+    run.add_argument("--batch", action="store_true",
+                     help="Analyse via l'API Batch d'OpenAI (moins chère, résultats différés, reprise automatique)")
+    run.add_argument("--from-store", action="store_true",
+                     help="Analyse à nouveau les emails du stockage local, sans connexion IMAP")
+    run.add_argument("--daemon", action="store_true",
+                     help="Reste lancé et traite les nouveaux emails dès leur arrivée (IMAP IDLE)")
+
+    commands.add_parser("daemon", help="Équivalent de run --daemon") \
+        .set_defaults(command="run", daemon=True, batch=False, from_store=False)
+
+    commands.add_parser("fetch", help="Récupère les nouveaux emails dans le stockage local, sans les analyser")
+
+    analyze = commands.add_parser("analyze", help="Analyse les emails du stockage local qui ne l'ont pas encore été")
+    analyze.add_argument("--batch", action="store_true", help="Analyse via l'API Batch d'OpenAI")
+    analyze.add_argument("--all", action="store_true", help="Analyse à nouveau tout le stockage local")
+    analyze.set_defaults(from_store=False, daemon=False)
+
+    report = commands.add_parser("report", help="Régénère les rapports à partir des projets enregistrés")
+    report.add_argument("--format", help="Formats séparés par des virgules (par défaut : report_format)")
+    report.add_argument("--since", type=int, default=0, help="Seulement les projets d'identifiant supérieur")
+
+    commands.add_parser("stats", help="Affiche l'état de la base et du stockage local (JSON)")
+
+    search = commands.add_parser("search", help="Recherche des projets par mots-clés (du plus pertinent au moins pertinent)")
+    search.add_argument("query", nargs="*", help="Mots recherchés (mot* = préfixe, OR / NOT en majuscules)")
+    search.add_argument("--sender", help="Expéditeur, ou domaine s'il commence par @ (ex : @agence.fr)")
+    search.add_argument("--since", help="Reçus à partir de cette date (AAAA-MM-JJ, UTC)")
+    search.add_argument("--until", help="Reçus jusqu'à cette date incluse (AAAA-MM-JJ, UTC)")
+    search.add_argument("--page", type=int, default=1, help="Numéro de la page de résultats")
+    search.add_argument("--limit", type=int, help="Résultats par page (par défaut : search_page_size)")
+    search.add_argument("--json", action="store_true", help="Résultats au format JSON")
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["run"] + argv  # Compatibilité : "main.py --batch" équivaut à "main.py run --batch"
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.daemon and (args.batch or args.from_store):
+        parser.error("--daemon ne peut pas être combiné avec --batch ou --from-store")
+    return args
+
+# --- Export des métriques et du profilage à la fin d'un passage ---
+def export_metrics(config, profiler, logger):
+    try:
+        for path in (profiler.stop() if profiler else []):
+            logger.info(f"Profil écrit : {path}")
+        if config.metrics_enabled:
+            extension = "prom" if config.metrics_format == "prometheus" else "json"
+            path = config.metrics_path or os.path.join(config.logs_dir, f"metrics.{extension}")
+            metrics.export(path, config.metrics_format)
+            logger.info(f"Métriques écrites : {path}")
+    except Exception as e:
+        # Les métriques ne doivent jamais faire échouer le passage
+        logger.error(f"Erreur d'export des métriques : {e}")
 
+# --- Commandes run / daemon / analyze : pipeline d'analyse ---
+def command_run(args, config, logger, profiler):
+    from analyzer.email_analyzer import EmailAnalyzer # Module pour analyser les emails
+    from database.project_database import ProjectDatabase  # Module pour enregistrer les projets dans une base de données
+    from database.message_store import MessageStore  # Stockage local des emails récupérés
+    from reporter.report_generator import ReportGenerator   # Module pour générer des rapports à partir des projets
+    from core.pipeline import Pipeline, PipelineItem  # Pipeline d'étapes concurrentes à files bornées
+    from core.utils import FileUtils, MessageUtils, TextUtils  # Empreinte, entêtes (Message-ID, expéditeur, date), nettoyage du texte
+    from fetcher.sync_tracker import SyncCheckpointTracker  # Suivi des points de reprise pendant le pipeline
+
+    from_store = args.command == "analyze" or args.from_store
+    # Une nouvelle analyse demandée explicitement (--from-store, analyze --all) ne saute aucun email déjà vu
+    rerun = getattr(args, "from_store", False) or getattr(args, "all", False)
+    store = fetch_engine = analyzer = reporter = database = dedup = None
     try:
         # Création des objets principaux
-        fetcher = EmailFetcher(config)     # Outil pour se connecter à la boîte mail
+        store = MessageStore(config) if config.store_enabled or from_store else None  # Copie locale des emails
+        if not from_store:
+            from fetcher.fetch_engine import FetchEngine  # Récupération des emails (multi-comptes, en parallèle)
+            fetch_engine = FetchEngine(config, store)  # Outil pour récupérer les emails de tous les comptes/dossiers
         analyzer = EmailAnalyzer(config)   # Outil pour analyser le contenu des emails
         database = ProjectDatabase(config) # Outil pour enregistrer les projets extraits
         reporter = ReportGenerator(config) # Outil pour créer des rapports des projets
+        if config.dedup_enabled and not rerun:
+            from analyzer.near_duplicate import NearDuplicateIndex  # Index MinHash/LSH des emails déjà vus
+            dedup = NearDuplicateIndex(config.database_path, config.dedup_threshold, config.dedup_num_perm,
+                                       config.dedup_bands, config.dedup_shingle_size, logger)
+        batch = None
+        if args.batch:
+            from analyzer.batch_analyzer import BatchAnalyzer  # Mode batch : analyse différée via l'API Batch d'OpenAI
+            batch = BatchAnalyzer(config, analyzer, database, reporter, dedup=dedup)
+        deferred = []  # Quasi-doublons d'un email dont le projet n'était pas encore enregistré
+
+        tracker = SyncCheckpointTracker(database.save_sync_state)
+
+        # Emails copiés dans le stockage local par run : déjà analysés, la commande analyze ne doit pas les
+        # reprendre. Son point de reprise suit donc run, sauf si des emails récupérés par fetch attendent encore
+        store_checkpoint = None
+        if store is not None and not from_store:
+            store_checkpoint = (database.get_sync_state(*STORE_CHECKPOINT) or {}).get("last_uid") or 0
+            if store.last_position() > store_checkpoint:
+                store_checkpoint = None
+
+        # --- Étapes du pipeline : récupération -> lecture -> analyse -> enregistrement -> rapport ---
+        def emails(targets=None):
+            # Points de reprise de chaque dossier (mode incrémental uniquement)
+            targets = fetch_engine.targets() if targets is None else targets
+            sync_states = {}
+            if config.sync_mode == "incremental":
+                sync_states = {target: database.get_sync_state(*target) for target in targets}
+            # Récupération : les dossiers sont lus en parallèle, les emails arrivent au fil de l'eau
+            for event in fetch_engine.iter_emails(sync_states, targets):
+                if event[0] == "start":
+                    tracker.register(event[1])
+                elif event[0] == "email":
+                    _, folder_sync, uid, msg = event
+                    tracker.seen(folder_sync, uid)
+                    yield PipelineItem(folder_sync, uid, msg)
+                else:
+                    tracker.folder_finished(event[1], event[2])
+
+        def stored_emails(tracked):
+            # Relecture du stockage local, sans connexion IMAP ; avec un point de reprise (position dans
+            # le stockage) pour la commande analyze, sans point de reprise pour --all et --from-store
+            after, folder_sync = 0, None
+            if tracked:
+                from fetcher.sync_tracker import FolderSync
+                after = (database.get_sync_state(*STORE_CHECKPOINT) or {}).get("last_uid") or 0
+                positions = store.positions(after)
+                folder_sync = FolderSync(*STORE_CHECKPOINT, positions,
+                                         {"uidvalidity": 0, "last_uid": max(positions, default=after)})
+                tracker.register(folder_sync)
+            for position, _, _, uid, msg in store.iter_messages(after=after):
+                if folder_sync is None:
+                    yield PipelineItem(None, uid, msg)
+                else:
+                    tracker.seen(folder_sync, position)
+                    yield PipelineItem(folder_sync, position, msg)
+            if folder_sync is not None:
+                tracker.folder_finished(folder_sync, True)
+
+        def parse(item):
+            # Lecture du texte de l'email
+            item.content = analyzer.extract_content(item.message)
+            return item
+
+        def relevance(item):
+            # Pré-filtre local : les emails sans projet probable ne partent pas à l'IA
+            return item if analyzer.is_relevant(item.message, item.content) else None
+
+        def deduplicate(item):
+            # Quasi-doublon d'un email déjà vu : ignoré, ou rattaché au projet existant sans appel à l'IA
+            with metrics.timer("dedup_lookup_seconds"):
+                signature = dedup.signature(TextUtils.strip_quoted_replies(item.content))
+                match = dedup.find(signature)
+                if match is None:
+                    item.dedup_entry = dedup.add(signature)
+                    return item
+            metrics.inc("near_duplicates_total", labels={"action": config.dedup_action})
+            logger.debug("Quasi-doublon (similarité %.2f) : %s", match["similarity"], item.message.get('Subject'))
+            if config.dedup_action != "link":
+                return None
+            item.duplicate = match
+            return item
+
+        def analyze(item):
+            # Analyse de l'email pour extraire les projets ; sans projet, l'email est écarté (traité) ;
+            # en échec (None), il est écarté et le point de reprise reste avant lui
+            if item.duplicate:
+                return item  # Quasi-doublon : le projet existe déjà
+            item.result = analyzer.analyze_content(item.content)
+            if item.result is None:
+                item.failed = True
+            return item if item.result else None
+
+        def enqueue(items):
+            # Mode batch : les requêtes sont mises en attente en base (seuls les contenus en cache continuent)
+            pending = [item for item in items if not item.duplicate]
+            results = batch.enqueue([(item.content, dict(MessageUtils.extract_metadata(item.message),
+                                                         dedup_entry=item.dedup_entry)) for item in pending])
+            for item, result in zip(pending, results):
+                item.result = result
+            return [item if item.duplicate or item.result else None for item in items]
+
+        def persist(items):
+            # Sauvegarde des projets par lots, en une seule transaction (doublons écartés) ;
+            # un email peut contenir plusieurs projets : une ligne par projet
+            originals = [item for item in items if not item.duplicate]
+            owners, projects = [], []
+            for item in originals:
+                metadata = dict(MessageUtils.extract_metadata(item.message),
+                                email_hash=FileUtils.calculate_hash(item.content or ""))
+                for project in item.result:
+                    owners.append(item)
+                    projects.append(dict(metadata, **project))
+            records = database.save_projects_many(projects) if projects else []
+            for item, record in zip(owners, records):
+                if record:
+                    item.projects = (item.projects or []) + [record]  # Enregistrements complets, sans relecture en base
+            for item in originals:
+                if item.projects and item.dedup_entry is not None:
+                    dedup.set_project(item.dedup_entry, item.projects[0]["id"])
+
+            # Quasi-doublons : rattachés au projet d'origine, ou après le pipeline s'il est encore en cours d'analyse
+            for item in link([item for item in items if item.duplicate]):
+                item.deferred = True
+                deferred.append(item)
+            return [item if item.projects else None for item in items]
 
-        # Connexion au serveur de messagerie
-        mail_conn = fetcher.connect()
-        if not mail_conn:
-            # Si la connexion échoue, enregistrer l'erreur et arrêter le programme
-            logger.error("Impossible de se connecter au serveur IMAP.")
-            return
-        
-        # Récupération des emails disponibles
-        raw_emails = fetcher.fetch_emails(mail_conn)
-
-        # Déconnexion propre du serveur mail après récupération
-        fetcher.disconnect(mail_conn)
-
-        # Analyse des emails pour extraire les projets
-        analyzed_projects = analyzer.analyze_emails(raw_emails)
-
-        # Traitement de chaque projet trouvé
-        for project_info in analyzed_projects:
-            # Sauvegarde du projet dans la base de données
-            project_id = database.save_project(project_info)
-            if project_id:
-                # Récupération des données complètes du projet
-                full_project = database.get_full_project_data(project_id)
-                # Génération d'un rapport pour le projet
-                reporter.generate_report(full_project)
+        def link(items):
+            # Rattache des quasi-doublons au projet de leur email d'origine ;
+            # renvoie ceux dont l'email d'origine n'a pas (encore) de projet enregistré
+            links, linked, waiting = [], [], []
+            for item in items:
+                project_id = item.duplicate["project_id"] or dedup.get_project(item.duplicate["entry_id"])
+                if project_id is None:
+                    waiting.append(item)
+                else:
+                    links.append(dict(MessageUtils.extract_metadata(item.message), duplicate_of=project_id))
+                    linked.append(item)
+            for item, record in zip(linked, database.link_duplicates(links) if links else []):
+                item.projects = [record] if record else None
+            return waiting
 
+        def report(item):
+            # Génération d'un rapport par projet (pas pour un quasi-doublon d'un projet existant)
+            if not item.duplicate:
+                for project in item.projects:
+                    reporter.generate_report(project)
+            return item
+
+        def done(item):
+            # Le point de reprise n'avance qu'une fois l'email sorti du pipeline, et jamais au-delà d'un échec
+            if item.deferred:
+                return  # Quasi-doublon en attente : traité par resolve_deferred
+            if item.folder_sync is not None:
+                if item.failed:
+                    tracker.mark_failed(item.folder_sync, item.uid)
+                else:
+                    tracker.mark_done(item.folder_sync, item.uid)
+            # Email sans projet (échec de l'analyse...) : les emails semblables seront analysés normalement ;
+            # en mode batch, le projet est enregistré plus tard et l'entrée est conservée
+            if item.dedup_entry is not None and not item.projects and not batch:
+                dedup.remove(item.dedup_entry)
+
+        def resolve_deferred(final):
+            # Quasi-doublons arrivés avant la fin de l'analyse de leur email d'origine : rattachés maintenant ;
+            # si l'origine n'a toujours pas de projet, ils sont renvoyés pour être analysés eux-mêmes
+            # (final=False), ou laissés en échec pour le prochain passage (final=True, ex : lot batch en cours)
+            items = list(deferred)
+            deferred.clear()
+            waiting = link(items)
+            waiting_ids = {id(item) for item in waiting}
+            for item in items:
+                item.deferred = False
+                if id(item) not in waiting_ids:
+                    done(item)
+            if final:
+                for item in waiting:
+                    item.failed = True
+                    done(item)
+                if waiting:
+                    logger.info(f"{len(waiting)} quasi-doublons en attente du projet de leur email d'origine : "
+                                f"traités au prochain passage.")
+                return []
+            for item in waiting:
+                item.duplicate = item.projects = None
+            return waiting
+
+        def finish_run():
+            failed = tracker.finish()
+            if failed:
+                logger.warning(f"{failed} emails en échec : le point de reprise reste avant eux, "
+                               f"ils seront traités à nouveau au prochain passage.")
+            if store_checkpoint is not None:
+                # Les emails en échec sont récupérés à nouveau par run (nouvelle position dans le stockage)
+                database.save_sync_state(*STORE_CHECKPOINT, {"uidvalidity": 0, "last_uid": store.last_position()})
+
+        def process(source):
+            # Pipeline, puis quasi-doublons en attente (en mode batch : après l'intégration des lots)
+            run_pipeline(source)
+            if batch:
+                return
+            retry = resolve_deferred(final=False)
+            if retry:
+                logger.info(f"{len(retry)} quasi-doublons sans projet d'origine : analysés à leur tour.")
+                run_pipeline(iter(retry))
+                resolve_deferred(final=True)
+            finish_run()
+
+        def run_pipeline(source):
+            pipeline = Pipeline(config.pipeline_queue_size, on_done=done, logger=logger)
+            pipeline.add_stage("parse", parse)
+            pipeline.add_stage("filter", relevance)
+            if dedup:
+                pipeline.add_stage("dedup", deduplicate)  # Un seul thread : deux emails semblables ne passent pas ensemble
+            if batch:
+                pipeline.add_stage("enqueue", enqueue, batch_size=config.db_batch_size)
+            else:
+                pipeline.add_stage("analyze", analyze, workers=config.analysis_concurrency)
+            pipeline.add_stage("persist", persist, batch_size=config.db_batch_size)
+            pipeline.add_stage("report", report)
+            stats = pipeline.run(source)
+            logger.info(f"Bilan du pipeline : {stats}")
+
+        def run_cycle(targets):
+            # Mode démon : synchronisation des dossiers signalés, avec les connexions déjà ouvertes
+            process(emails(targets))
+            if config.metrics_enabled:
+                export_metrics(config, None, logger)  # Métriques cumulées depuis le démarrage
+
+        if args.command == "run" and args.daemon:
+            from core.daemon import Daemon  # Mode démon : surveillance IDLE des dossiers
+            Daemon(config, fetch_engine, run_cycle, logger).run()
+        elif from_store:
+            process(stored_emails(tracked=args.command == "analyze" and not args.all))
+        else:
+            process(emails())
+        analyzer.log_filter_stats()
+        if batch:
+            # Soumission des lots, attente et intégration des résultats (y compris des passages précédents) ;
+            # les connexions IMAP ne sont plus utiles pendant l'attente
+            if fetch_engine:
+                fetch_engine.close()
+            batch.run()
+            resolve_deferred(final=True)
+            finish_run()
+    finally:
+        # Déconnexion propre de tous les serveurs mail
+        if fetch_engine:
+            fetch_engine.close()
+        if store:
+            store.close()
+        if dedup:
+            dedup.close()
+        if analyzer:
+            analyzer.close()  # Threads d'analyse des morceaux d'emails longs
+        if reporter:
+            reporter.close()  # Attend l'écriture des derniers rapports
+        if database:
+            database.close()
+        export_metrics(config, profiler, logger)
+
+# --- Commande fetch : récupération vers le stockage local, sans analyse ---
+def command_fetch(args, config, logger, profiler):
+    from database.project_database import ProjectDatabase
+    from database.message_store import MessageStore
+    from fetcher.fetch_engine import FetchEngine
+    from fetcher.sync_tracker import SyncCheckpointTracker
+
+    store = MessageStore(config)
+    database = ProjectDatabase(config)  # Points de reprise des dossiers
+    fetch_engine = FetchEngine(config, store)
+    try:
+        tracker = SyncCheckpointTracker(database.save_sync_state)
+        sync_states = {}
+        if config.sync_mode == "incremental":
+            sync_states = {target: database.get_sync_state(*target) for target in fetch_engine.targets()}
+        fetched = 0
+        for event in fetch_engine.iter_emails(sync_states):
+            if event[0] == "start":
+                tracker.register(event[1])
+            elif event[0] == "email":
+                # L'email est déjà copié dans le stockage local par EmailFetcher.iter_uids
+                _, folder_sync, uid, _ = event
+                tracker.seen(folder_sync, uid)
+                tracker.mark_done(folder_sync, uid)
+                fetched += 1
+            else:
+                tracker.folder_finished(event[1], event[2])
+        logger.info(f"{fetched} emails copiés dans le stockage local ({store.count()} au total).")
+    finally:
+        fetch_engine.close()
+        store.close()
+        database.close()
+        export_metrics(config, profiler, logger)
+
+# --- Commande report : régénération des rapports ---
+def command_report(args, config, logger, profiler):
+    from database.project_database import ProjectDatabase
+    from reporter.report_generator import ReportGenerator
+
+    if args.format:
+        config.report_format = args.format
+    database = ProjectDatabase(config)
+    reporter = ReportGenerator(config)
+    try:
+        count = 0
+        for project in database.iter_projects(args.since):
+            if project["duplicate_of"] is None:  # Les quasi-doublons n'ont pas de rapport propre
+                reporter.generate_report(project)
+                count += 1
+    finally:
+        reporter.close()
+        database.close()
+    logger.info(f"{count} rapports régénérés.")
+
+# --- Commande stats : état de la base et du stockage local ---
+def command_stats(args, config, logger, profiler):
+    from database.project_database import ProjectDatabase
+
+    database = ProjectDatabase(config)
+    try:
+        stats = database.get_stats()
+    finally:
+        database.close()
+    if os.path.exists(os.path.join(config.store_dir, "index.db")):
+        from database.message_store import MessageStore
+        store = MessageStore(config)
+        try:
+            stats["stored_emails"] = store.count()
+        finally:
+            store.close()
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+
+# --- Commande search : recherche plein texte dans les projets ---
+def command_search(args, config, logger, profiler):
+    from database.project_database import ProjectDatabase
+
+    limit = max(1, args.limit or config.search_page_size)
+    page = max(1, args.page)
+    database = ProjectDatabase(config)
+    try:
+        found = database.search_projects(" ".join(args.query), sender=args.sender, since=args.since,
+                                         until=args.until, limit=limit, offset=(page - 1) * limit)
+    finally:
+        database.close()
+
+    if args.json:
+        print(json.dumps(dict(found, page=page, limit=limit), indent=2, ensure_ascii=False))
+        return
+    pages = max(1, -(-found["total"] // limit))
+    print(f"{found['total']} projets trouvés (page {page}/{pages})")
+    for project in found["results"]:
+        print(f"\n#{project['id']}  {project['received_at'] or '-'}  {project['sender'] or '-'}")
+        print("    " + " ".join((project["snippet"] or "").split()))
+
+COMMANDS = {
+    "run": command_run,
+    "analyze": command_run,
+    "fetch": command_fetch,
+    "report": command_report,
+    "stats": command_stats,
+    "search": command_search,
+}
+
+# --- Définition de la fonction principale ---
+def main(argv=None) -> int:
+    """Lance la commande demandée ; renvoie le code de sortie du programme (1 après une erreur fatale)."""
+    args = parse_args(argv)
+    # Initialisation de la configuration et du système de logs
+    config = Config()
+    configure_logging(config)
+    logger = setup_logger('Main', os.path.join(config.logs_dir, 'app.log'))
+    logger.info(f"=== Démarrage de Email Project Extractor ({args.command}) ===")
+    metrics.reset()
+    profiler = RunProfiler(config)
+    profiler.start()
+
+    try:
+        COMMANDS[args.command](args, config, logger, profiler)
         # Enregistrement dans les logs que tout s'est déroulé correctement
         logger.info("=== Traitement terminé avec succès ===")
+        return 0
 
     except Exception as e:
         # En cas d'erreur imprévue, l'erreur est enregistrée dans les logs
         logger.exception(f"Erreur fatale: {e}")
+        return 1
+    finally:
+        profiler.stop()  # Sans effet si le profil a déjà été écrit par la commande
+        shutdown_logging()  # Écrit les derniers messages encore en file
 
 # --- Exécution du programme ---
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
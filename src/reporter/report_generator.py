@@ -1,6 +1,12 @@
 # --- Importation des modules nécessaires ---
 import os
+import queue                          # File entre l'analyse et le thread d'écriture
+import threading                      # Les rapports sont écrits en arrière-plan
 from core.logger import setup_logger  # Module pour configurer un système de journaux (logs)
+from reporter.report_sinks import SINKS  # Formats de sortie disponibles
+from core.metrics import metrics        # Durée d'écriture par format
+
+_STOP = object()  # Marqueur de fin pour le thread d'écriture
 
 # --- Définition de la classe responsable de générer les rapports de projet ---
 class ReportGenerator:
@@ -8,29 +14,83 @@ class ReportGenerator:
         """
         Initialise la classe ReportGenerator.
 
+        Les rapports sont écrits par un thread d'arrière-plan, par lots, dans un ou plusieurs
+        formats (report_format) : "text" (un fichier par projet), "jsonl", "csv", "parquet", "html".
+
         Args:
             config: Configuration contenant les chemins pour les rapports et les logs.
         """
         self.reports_dir = config.reports_dir  # Dossier où les rapports seront stockés
         self.logger = setup_logger("ReportGenerator", os.path.join(config.logs_dir, 'report_generator.log'))  # Mise en place d'un logger spécifique
         os.makedirs(self.reports_dir, exist_ok=True)  # Crée le dossier des rapports si ce n'est pas déjà fait
+        self.batch_size = max(1, config.report_batch_size)  # Projets écrits ensemble au maximum
+
+        formats = config.report_format
+        if isinstance(formats, str):
+            formats = [name.strip() for name in formats.split(",")]
+        self.sinks = {}
+        for name in formats:
+            try:
+                self.sinks[name] = SINKS[name](config)
+            except KeyError:
+                self.logger.error(f"Format de rapport inconnu : {name}")
+            except Exception as e:
+                self.logger.error(f"Format de rapport {name} indisponible : {e}")
+
+        # File sans limite : l'analyse n'attend jamais l'écriture des rapports
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="report-writer", daemon=True)
+        self._thread.start()
 
     def generate_report(self, project):
         """
-        Génère un rapport texte pour un projet donné.
+        Programme la génération du rapport d'un projet (écrit en arrière-plan).
 
         Args:
-            project: Tuple contenant l'identifiant du projet et son contenu.
+            project: Enregistrement du projet (dict ou sqlite3.Row avec les clés "id" et "content").
         """
-        project_id, project_content = project  # Décomposition du projet : identifiant et contenu
-        filename = os.path.join(self.reports_dir, f"project_{project_id}.txt")  # Définir le chemin du fichier de rapport
-
-        try:
-            # Ouvre le fichier et écrit le contenu du projet
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(project_content)
-            # Si réussi, écrire une information dans les logs
-            self.logger.info(f"Rapport généré: {filename}")
-        except Exception as e:
-            # Si une erreur survient pendant la génération, l’enregistrer dans les logs
-            self.logger.error(f"Erreur lors de la génération du rapport: {e}")
+        self._queue.put(dict(project))
+
+    def close(self):
+        """
+        Écrit les rapports encore en attente, puis arrête le thread d'écriture.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        for name, sink in self.sinks.items():
+            try:
+                sink.close()
+            except Exception as e:
+                self.logger.error(f"Erreur lors de la fermeture des rapports {name}: {e}")
+
+    def _run(self):
+        """Boucle du thread d'écriture : regroupe les projets disponibles et les écrit par lots."""
+        stopped = False
+        while not stopped:
+            project = self._queue.get()
+            if project is _STOP:
+                break
+            batch = [project]
+            while len(batch) < self.batch_size:
+                try:
+                    project = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if project is _STOP:
+                    stopped = True
+                    break
+                batch.append(project)
+            self._write(batch)
+
+    def _write(self, batch):
+        """Écrit un lot dans chaque format ; l'échec d'un format n'empêche pas les autres."""
+        for name, sink in self.sinks.items():
+            try:
+                with metrics.timer("report_write_seconds", {"format": name}):
+                    sink.write_batch(batch)
+            except Exception as e:
+                # Si une erreur survient pendant la génération, l’enregistrer dans les logs
+                self.logger.error(f"Erreur lors de la génération des rapports {name}: {e}")
+        metrics.inc("reports_written_total", len(batch))
+        self.logger.info(f"{len(batch)} rapports générés ({', '.join(self.sinks)}).")
@@ -0,0 +1,218 @@
+# --- Importation des modules nécessaires ---
+import csv                     # Export CSV
+import html                    # Échappement du texte dans le résumé HTML
+import json                    # Export JSONL
+import os
+from collections import Counter  # Agrégats du résumé HTML
+from datetime import datetime
+from core.utils import FileUtils  # Vérification des dépendances optionnelles (pandas, moteur Parquet)
+
+# --- Colonnes exportées pour chaque projet ---
+REPORT_FIELDS = ["id", "message_id", "sender", "received_at", "title", "client", "technologies", "budget_min",
+                 "budget_max", "budget_currency", "budget_period", "start_date", "duration_months", "location",
+                 "contact", "content_hash", "content"]
+
+
+# --- Classe de base des sorties de rapports ---
+class ReportSink:
+    """Sortie de rapports : reçoit les projets par lots, depuis le thread d'écriture."""
+
+    def write_batch(self, projects: list) -> None:
+        """
+        Écrit un lot de projets.
+
+        Args:
+            projects (list): Enregistrements de projets (dict avec les clés de REPORT_FIELDS).
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Termine les écritures en cours."""
+
+
+# --- Un fichier texte par projet (format historique) ---
+class TextReportSink(ReportSink):
+    def __init__(self, reports_dir: str):
+        self.reports_dir = reports_dir
+
+    def write_batch(self, projects: list) -> None:
+        for project in projects:
+            filename = os.path.join(self.reports_dir, f"project_{project['id']}.txt")
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(project["content"] or "")
+
+
+# --- Fichier unique en ajout, avec bascule sur un nouveau fichier au-delà d'une taille maximale ---
+class _RollingFileSink(ReportSink):
+    extension = ""
+
+    def __init__(self, reports_dir: str, max_file_size: int):
+        """
+        Args:
+            reports_dir (str): Dossier des rapports.
+            max_file_size (int): Taille au-delà de laquelle un nouveau fichier est commencé (0 = illimitée).
+        """
+        self.reports_dir = reports_dir
+        self.max_file_size = max_file_size
+        self.index = 1
+        while self.max_file_size and os.path.exists(self._path(self.index + 1)):
+            self.index += 1  # Reprise après le dernier fichier existant
+        self._file = None
+
+    def _path(self, index: int) -> str:
+        suffix = "" if index == 1 else f"_{index:04d}"
+        return os.path.join(self.reports_dir, f"projects{suffix}.{self.extension}")
+
+    def _open(self):
+        """Ouvre le fichier courant (ou le suivant s'il est plein) en ajout."""
+        if self._file is not None and self.max_file_size and self._file.tell() >= self.max_file_size:
+            self._file.close()
+            self._file = None
+            self.index += 1
+        if self._file is None:
+            path = self._path(self.index)
+            is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+            self._file = open(path, 'a', encoding='utf-8', newline='')
+            self._on_open(is_new)
+        return self._file
+
+    def _on_open(self, is_new: bool) -> None:
+        """Appelée à l'ouverture d'un fichier (ex : ligne d'entête CSV)."""
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JsonlReportSink(_RollingFileSink):
+    """Un projet par ligne JSON dans reports/projects.jsonl."""
+
+    extension = "jsonl"
+
+    def write_batch(self, projects: list) -> None:
+        f = self._open()
+        f.write("".join(json.dumps({field: project.get(field) for field in REPORT_FIELDS}, ensure_ascii=False) + "\n"
+                        for project in projects))
+        f.flush()
+
+
+class CsvReportSink(_RollingFileSink):
+    """Un projet par ligne dans reports/projects.csv."""
+
+    extension = "csv"
+
+    def _on_open(self, is_new: bool) -> None:
+        self._writer = csv.DictWriter(self._file, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+        if is_new:
+            self._writer.writeheader()
+
+    def write_batch(self, projects: list) -> None:
+        self._open()
+        self._writer.writerows(projects)
+        self._file.flush()
+
+
+# --- Export Parquet (plusieurs fichiers, lisibles ensemble avec pandas.read_parquet sur le dossier) ---
+class ParquetReportSink(ReportSink):
+    def __init__(self, reports_dir: str, rows_per_file: int = 10000):
+        """
+        Args:
+            reports_dir (str): Dossier des rapports (sous-dossier parquet/).
+            rows_per_file (int): Projets accumulés avant l'écriture d'un fichier (le reste à la fermeture).
+
+        Raises:
+            ImportError: Si pandas ou un moteur Parquet (pyarrow, fastparquet) n'est pas installé.
+        """
+        if not FileUtils.is_module_available("pandas") or not (
+                FileUtils.is_module_available("pyarrow") or FileUtils.is_module_available("fastparquet")):
+            raise ImportError("L'export Parquet nécessite pandas et pyarrow (ou fastparquet).")
+        import pandas  # Import différé : dépendance lourde, utile seulement pour ce format
+        self._pandas = pandas
+        self.directory = os.path.join(reports_dir, "parquet")
+        os.makedirs(self.directory, exist_ok=True)
+        self.rows_per_file = max(1, rows_per_file)
+        self.stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        self.part = 0
+        self._rows = []
+
+    def write_batch(self, projects: list) -> None:
+        self._rows.extend({field: project.get(field) for field in REPORT_FIELDS} for project in projects)
+        if len(self._rows) >= self.rows_per_file:
+            self._flush()
+
+    def close(self) -> None:
+        if self._rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Écrit les projets accumulés dans un nouveau fichier Parquet."""
+        self.part += 1
+        frame = self._pandas.DataFrame(self._rows, columns=REPORT_FIELDS)
+        frame.to_parquet(os.path.join(self.directory, f"projects_{self.stamp}_{self.part:05d}.parquet"), index=False)
+        self._rows = []
+
+
+# --- Résumé HTML des projets du passage (mis à jour après chaque lot) ---
+class HtmlSummarySink(ReportSink):
+    def __init__(self, reports_dir: str, recent: int = 20):
+        """
+        Args:
+            reports_dir (str): Dossier des rapports (fichier summary.html).
+            recent (int): Nombre de derniers projets affichés.
+        """
+        self.path = os.path.join(reports_dir, "summary.html")
+        self.recent_count = recent
+        self.started_at = datetime.now()
+        self.total = 0
+        self.by_sender = Counter()   # Projets par domaine de l'expéditeur
+        self.by_day = Counter()      # Projets par jour de réception
+        self.by_technology = Counter()  # Projets par technologie demandée
+        self.recent = []
+
+    def write_batch(self, projects: list) -> None:
+        for project in projects:
+            self.total += 1
+            sender = project.get("sender") or ""
+            self.by_sender[sender.rpartition("@")[2] or "inconnu"] += 1
+            self.by_day[(project.get("received_at") or "")[:10] or "inconnue"] += 1
+            self.by_technology.update(json.loads(project.get("technologies") or "[]"))
+        self.recent = (self.recent + list(projects))[-self.recent_count:]
+        self._render()
+
+    def _render(self) -> None:
+        """Réécrit entièrement le résumé (fichier temporaire puis remplacement)."""
+        def rows(counter):
+            return "".join(f"<tr><td>{html.escape(key)}</td><td>{count}</td></tr>" for key, count in counter)
+
+        recent = "".join(
+            f"<tr><td>{project.get('id')}</td><td>{html.escape(project.get('sender') or '')}</td>"
+            f"<td>{html.escape(project.get('received_at') or '')}</td>"
+            f"<td>{html.escape((project.get('content') or '')[:300])}</td></tr>"
+            for project in reversed(self.recent))
+        page = f"""<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Projets détectés</title>
+<style>body{{font-family:sans-serif}} table{{border-collapse:collapse;margin-bottom:2em}} td,th{{border:1px solid #ccc;padding:4px 8px;vertical-align:top}}</style>
+</head><body>
+<h1>Projets détectés</h1>
+<p>{self.total} projets depuis le {self.started_at:%d/%m/%Y %H:%M} (mis à jour le {datetime.now():%d/%m/%Y %H:%M:%S}).</p>
+<h2>Par domaine d'expéditeur</h2><table><tr><th>Domaine</th><th>Projets</th></tr>{rows(self.by_sender.most_common(20))}</table>
+<h2>Par technologie</h2><table><tr><th>Technologie</th><th>Projets</th></tr>{rows(self.by_technology.most_common(20))}</table>
+<h2>Par jour de réception</h2><table><tr><th>Jour</th><th>Projets</th></tr>{rows(sorted(self.by_day.items(), reverse=True))}</table>
+<h2>Derniers projets</h2><table><tr><th>Id</th><th>Expéditeur</th><th>Reçu le</th><th>Projet</th></tr>{recent}</table>
+</body></html>
+"""
+        temporary = self.path + ".tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(page)
+        os.replace(temporary, self.path)
+
+
+# --- Formats disponibles (clé "report_format" de la configuration) ---
+SINKS = {
+    "text": lambda config: TextReportSink(config.reports_dir),
+    "jsonl": lambda config: JsonlReportSink(config.reports_dir, config.report_max_file_size),
+    "csv": lambda config: CsvReportSink(config.reports_dir, config.report_max_file_size),
+    "parquet": lambda config: ParquetReportSink(config.reports_dir),
+    "html": lambda config: HtmlSummarySink(config.reports_dir),
+}
@@ -0,0 +1,60 @@
+# --- Fixtures communes : serveurs locaux (IMAP, OpenAI) et dossier de travail isolé ---
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from fakes.fake_imap import FakeImapServer, FakeMailbox      # noqa: E402
+from fakes.fake_openai import FakeOpenAIServer               # noqa: E402
+from fakes.mailbox_generator import MailboxGenerator         # noqa: E402
+
+
+@pytest.fixture
+def mailbox():
+    """Boîte mail en mémoire avec quelques demandes de mission, sans pièce jointe."""
+    box = FakeMailbox()
+    MailboxGenerator(emails=12, attachments={}, thread_depth=1, noise_ratio=0.0, long_ratio=0.0, seed=3).fill(box)
+    return box
+
+
+@pytest.fixture
+def imap_server(mailbox):
+    server = FakeImapServer(mailbox).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def llm_server():
+    server = FakeOpenAIServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def sandbox(tmp_path, monkeypatch, imap_server, llm_server):
+    """
+    Dossier de travail avec un config.json pointant vers les serveurs locaux.
+    Renvoie une fonction write_config(**paramètres) pour modifier la configuration.
+    """
+    monkeypatch.chdir(tmp_path)
+    for name in ("EMAIL_USER", "EMAIL_PASS", "OPENAI_API_KEY", "OPENAI_API_BASE"):
+        monkeypatch.delenv(name, raising=False)
+    os.makedirs(tmp_path / "src" / "config")
+    base = {
+        "imap_server": "127.0.0.1", "imap_port": imap_server.port, "use_ssl": False,
+        "email_user": "test", "email_pass": "test", "fetch_limit": 0,
+        "openai_api_key": "test", "openai_api_base": llm_server.api_base,
+        "retry_base_delay": 0.01, "requests_per_minute": 0, "tokens_per_minute": 0,
+        "batch_poll_interval": 0.05, "report_format": ["text"],
+    }
+
+    def write_config(**overrides):
+        with open(tmp_path / "src" / "config" / "config.json", 'w', encoding='utf-8') as f:
+            json.dump(dict(base, **overrides), f)
+        return tmp_path
+
+    write_config()
+    return write_config
@@ -0,0 +1,39 @@
+# --- Mode batch : nouvelles soumissions des requêtes en échec, puis abandon ---
+import sqlite3
+
+import main
+from fakes.fake_openai import default_responder
+
+
+def statuses(sandbox_dir):
+    with sqlite3.connect(sandbox_dir / "projects.db") as conn:
+        return dict(conn.execute("SELECT status, COUNT(*) FROM batch_requests GROUP BY status").fetchall())
+
+
+def test_failed_requests_are_resubmitted_then_abandoned(sandbox, llm_server, mailbox):
+    sandbox_dir = sandbox(dedup_enabled=False, batch_max_attempts=2)
+    llm_server.error_rate = 1.0
+    assert main.main(["run", "--batch"]) == 0
+    count = len(mailbox.folders["INBOX"])
+    assert llm_server.requests == 2 * count
+    assert statuses(sandbox_dir) == {"abandoned": count}
+
+
+def test_unreadable_response_is_resubmitted(sandbox, llm_server, mailbox):
+    sandbox_dir = sandbox(dedup_enabled=False, cache_enabled=False)
+    seen = set()
+
+    def responder(messages):
+        # Première réponse illisible pour chaque email, la suivante est correcte
+        text = messages[-1]["content"]
+        if text not in seen:
+            seen.add(text)
+            return "Désolé, je ne peux pas répondre."
+        return default_responder(messages)
+
+    llm_server.responder = responder
+    assert main.main(["run", "--batch"]) == 0
+    count = len(mailbox.folders["INBOX"])
+    assert statuses(sandbox_dir) == {"saved": count}
+    with sqlite3.connect(sandbox_dir / "projects.db") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0] == count
@@ -0,0 +1,74 @@
+# --- Sous-commandes de src/main.py : lecture des arguments et exécution de bout en bout ---
+import pytest
+
+import main
+
+
+def app_log(sandbox_dir) -> str:
+    with open(sandbox_dir / "logs" / "app.log", encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("argv, command", [
+    ([], "run"),
+    (["--batch"], "run"),
+    (["run", "--from-store"], "run"),
+    (["daemon"], "run"),
+    (["fetch"], "fetch"),
+    (["analyze"], "analyze"),
+    (["analyze", "--all", "--batch"], "analyze"),
+    (["report", "--format", "jsonl"], "report"),
+    (["stats"], "stats"),
+    (["search", "python", "--json"], "search"),
+])
+def test_parse_args_defines_every_attribute_used(argv, command):
+    args = main.parse_args(argv)
+    assert args.command == command
+    assert command in main.COMMANDS
+    if command in ("run", "analyze"):
+        # Attributs lus par command_run, quelle que soit la sous-commande
+        assert isinstance(args.batch, bool)
+        assert isinstance(args.from_store, bool)
+        assert isinstance(args.daemon, bool)
+
+
+@pytest.mark.parametrize("argv", [
+    ["run"], ["fetch"], ["analyze"], ["analyze", "--all"], ["run", "--from-store"], ["run", "--batch"],
+    ["report"], ["stats"], ["search", "python"], ["search", "--json"],
+])
+def test_each_subcommand_runs_without_fatal_error(sandbox, argv, capsys):
+    sandbox_dir = sandbox()
+    assert main.main(["fetch"] if argv[0] in ("analyze", "report", "stats", "search") or "--from-store" in argv
+                     else ["run"]) == 0
+    assert main.main(argv) == 0
+    log = app_log(sandbox_dir)
+    assert "Erreur fatale" not in log
+    assert log.count("Traitement terminé avec succès") == 2
+
+
+def test_fatal_error_gives_non_zero_exit_code(sandbox, monkeypatch):
+    sandbox_dir = sandbox()
+
+    def broken(*args):
+        raise RuntimeError("panne simulée")
+
+    monkeypatch.setitem(main.COMMANDS, "stats", broken)
+    assert main.main(["stats"]) == 1
+    assert "Erreur fatale: panne simulée" in app_log(sandbox_dir)
+
+
+def test_run_closes_the_analyzer(sandbox, monkeypatch):
+    from analyzer.email_analyzer import EmailAnalyzer
+    closed = []
+    close = EmailAnalyzer.close
+
+    def record(analyzer):
+        close(analyzer)
+        closed.append(analyzer)
+
+    monkeypatch.setattr(EmailAnalyzer, "close", record)
+    sandbox()
+    assert main.main(["run"]) == 0
+    assert len(closed) == 1
+    with pytest.raises(RuntimeError):
+        closed[0]._chunk_executor.submit(print)  # Pool des morceaux d'emails longs arrêté
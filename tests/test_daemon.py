@@ -0,0 +1,98 @@
+# --- Mode démon : notifications IDLE, repli sur NOOP, reconnexion après une coupure ---
+import threading
+import time
+
+import pytest
+
+from config.config import Config
+from core.daemon import Daemon
+from fetcher.email_fetcher import EmailFetcher
+from fetcher.fetch_engine import FetchEngine
+from fetcher.idle_watcher import IdleWatcher
+
+NEW_EMAIL = b"Subject: Mission Go\r\nFrom: a@agence.fr\r\nMessage-ID: <nouveau@agence.fr>\r\n\r\nMission Go a Nantes.\r\n"
+
+
+class Notifications:
+    """Notifications reçues d'un IdleWatcher ou du démon, avec attente bornée."""
+
+    def __init__(self):
+        self.calls = []
+        self.condition = threading.Condition()
+
+    def __call__(self, *args):
+        with self.condition:
+            self.calls.append(args)
+            self.condition.notify_all()
+
+    def wait_for(self, count, timeout=10.0):
+        with self.condition:
+            assert self.condition.wait_for(lambda: len(self.calls) >= count, timeout), self.calls
+        return self.calls
+
+
+@pytest.fixture
+def config(sandbox):
+    sandbox(daemon_idle_timeout=5, daemon_poll_interval=0.2, daemon_reconnect_delay=0.1, daemon_sync_interval=3600)
+    return Config()
+
+
+@pytest.fixture
+def watch(config):
+    watchers = []
+
+    def start():
+        notifications = Notifications()
+        watcher = IdleWatcher(EmailFetcher(config), "test", "INBOX", notifications, config)
+        watcher.start()
+        watchers.append(watcher)
+        notifications.wait_for(1)  # Rattrapage à la connexion
+        return notifications
+
+    yield start
+    for watcher in watchers:
+        watcher.stop()
+    for watcher in watchers:
+        watcher.join(timeout=10)
+        assert not watcher.is_alive()
+
+
+def test_idle_notifies_new_email(watch, mailbox):
+    notifications = watch()
+    time.sleep(0.3)  # Attente IDLE en place
+    mailbox.add_message(NEW_EMAIL)
+    assert notifications.wait_for(2)[-1] == ("test", "INBOX")
+
+
+def test_noop_fallback_without_idle(watch, mailbox, imap_server):
+    imap_server.capabilities = "IMAP4rev1 UIDPLUS"
+    notifications = watch()
+    mailbox.add_message(NEW_EMAIL)
+    assert notifications.wait_for(2)[-1] == ("test", "INBOX")
+
+
+def test_reconnects_after_connection_drop(watch, mailbox, imap_server):
+    notifications = watch()
+    time.sleep(0.3)
+    imap_server.drop_connections()
+    notifications.wait_for(2)  # Nouvelle connexion : nouveau rattrapage
+    time.sleep(0.3)
+    mailbox.add_message(NEW_EMAIL)
+    notifications.wait_for(3)
+
+
+def test_daemon_runs_a_cycle_for_the_notified_folder(config, mailbox):
+    cycles = Notifications()
+    engine = FetchEngine(config)
+    daemon = Daemon(config, engine, cycles)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    try:
+        cycles.wait_for(1)  # Rattrapage au démarrage
+        mailbox.add_message(NEW_EMAIL)
+        assert cycles.wait_for(2)[-1] == ([(engine.targets()[0][0], "INBOX")],)
+    finally:
+        daemon.stop()
+        thread.join(timeout=15)
+        engine.close()
+    assert not thread.is_alive()
@@ -0,0 +1,20 @@
+# --- FetchEngine : récupération parallèle et arrêt quand le consommateur abandonne ---
+from config.config import Config
+from core.metrics import metrics
+from fetcher.fetch_engine import FetchEngine
+
+
+def test_workers_stop_when_the_consumer_stops_reading(sandbox, mailbox):
+    for index in range(40):
+        mailbox.add_message(b"Subject: Mission %d\r\nMessage-ID: <m%d@agence.fr>\r\n\r\nMission Python.\r\n"
+                            % (index, index))
+    sandbox(fetch_batch_size=1, pipeline_queue_size=1, sync_mode="full")
+    engine = FetchEngine(Config())
+    metrics.reset()
+    events = engine.iter_emails()
+    try:
+        assert next(event for event in events if event[0] == "email")
+        events.close()  # Arrête et attend les threads de récupération
+    finally:
+        engine.close()
+    assert metrics.summary()["counters"]["emails_fetched_total"] < 10
@@ -0,0 +1,14 @@
+# --- ImapUtils : lecture des réponses FETCH ---
+from fetcher.imap_utils import ImapUtils
+
+
+def test_literal_and_quoted_sections_are_both_kept():
+    data = [
+        (b'1 (UID 7 BODY[1] {15}', b'Mission Python\n'),
+        b' BODY[2] "Budget \\"500\\" euros")',
+        b'2 (UID 8 BODY[1] "Mission Go" BODY[2] NIL)',
+    ]
+    (first, first_sections), (second, second_sections) = ImapUtils.parse_fetch_response(data)
+    assert first["UID"] == b"7" and second["UID"] == b"8"
+    assert first_sections == {"BODY[1]": b"Mission Python\n", "BODY[2]": b'Budget "500" euros'}
+    assert second_sections == {"BODY[1]": b"Mission Go"}
@@ -0,0 +1,37 @@
+# --- Synchronisation incrémentale : UID au-delà du point de reprise, resynchronisation si UIDVALIDITY change ---
+import pytest
+
+from config.config import Config
+from fetcher.email_fetcher import EmailFetcher
+
+NEW_EMAIL = b"Subject: Mission Go\r\nMessage-ID: <nouveau@agence.fr>\r\n\r\nMission Go a Nantes.\r\n"
+
+
+@pytest.fixture
+def plan(sandbox):
+    sandbox()
+    fetcher = EmailFetcher(Config())
+    conn = fetcher.connect()
+    yield lambda state=None: fetcher.plan_sync(conn, "INBOX", state)
+    fetcher.disconnect(conn)
+
+
+def test_first_sync_takes_every_email(plan):
+    uids, state = plan()
+    assert uids == list(range(1, 13))
+    assert state == {"uidvalidity": 1, "last_uid": 12}
+
+
+def test_next_sync_takes_only_new_emails(plan, mailbox):
+    _, state = plan()
+    assert plan(state) == ([], state)  # « 13:* » renvoie quand même le dernier email connu
+    mailbox.add_message(NEW_EMAIL)
+    assert plan(state) == ([13], {"uidvalidity": 1, "last_uid": 13})
+
+
+def test_uidvalidity_change_resyncs_the_folder(plan, mailbox):
+    _, state = plan()
+    mailbox.reset_uidvalidity(2)
+    uids, new_state = plan(state)
+    assert uids == list(range(1, 13))
+    assert new_state["uidvalidity"] == 2
@@ -0,0 +1,72 @@
+# --- Appels au modèle : nouvelles tentatives sur 429/5xx, en-tête Retry-After, erreurs définitives ---
+import threading
+import time
+
+import pytest
+
+from analyzer.email_analyzer import EmailAnalyzer
+from config.config import Config
+
+TEXT = "Mission Python a Lyon, contact : recrutement@agence.fr"
+
+
+@pytest.fixture
+def make_analyzer(sandbox):
+    analyzers = []
+
+    def make(**overrides):
+        sandbox(cache_enabled=False, relevance_filter_enabled=False, **overrides)
+        analyzers.append(EmailAnalyzer(Config()))
+        return analyzers[-1]
+
+    yield make
+    for analyzer in analyzers:
+        analyzer.close()
+
+
+def test_server_errors_are_retried_until_max_retries(make_analyzer, llm_server):
+    analyzer = make_analyzer(max_retries=2, retry_base_delay=0.01)
+    llm_server.error_rate, llm_server.error_statuses = 1.0, [500, 503]
+    assert analyzer.analyze_content(TEXT) is None
+    assert llm_server.requests == 3
+
+
+def test_rate_limit_waits_for_retry_after(make_analyzer, llm_server):
+    # Backoff de 30 s sans Retry-After : la réponse 429 du faux serveur annonce "Retry-After: 0"
+    analyzer = make_analyzer(max_retries=3, retry_base_delay=30)
+    llm_server.error_rate, llm_server.error_statuses = 1.0, [429]
+    start = time.monotonic()
+    assert analyzer.analyze_content(TEXT) is None
+    assert time.monotonic() - start < 10
+    assert llm_server.requests == 4
+
+
+def test_transient_errors_then_success(make_analyzer, llm_server):
+    # Backoff 0,1 s, 0,2 s, 0,4 s... : le serveur répond de nouveau normalement après 0,25 s
+    analyzer = make_analyzer(max_retries=5, retry_base_delay=0.1)
+    llm_server.error_rate, llm_server.error_statuses = 1.0, [503]
+    recovery = threading.Timer(0.25, setattr, (llm_server, "error_rate", 0.0))
+    recovery.start()
+    try:
+        projects = analyzer.analyze_content(TEXT)
+    finally:
+        recovery.cancel()
+    assert projects and projects[0]["contact"] == "recrutement@agence.fr"
+    assert 1 <= llm_server.errors < llm_server.requests
+
+
+def test_client_error_is_not_retried(make_analyzer, llm_server):
+    analyzer = make_analyzer(max_retries=5, retry_base_delay=0.01)
+    llm_server.error_rate, llm_server.error_statuses = 1.0, [400]
+    assert analyzer.analyze_content(TEXT) is None
+    assert llm_server.requests == 1
+
+
+def test_retry_delay_prefers_retry_after_header():
+    class RateLimited(Exception):
+        headers = {"Retry-After": "2.5"}
+
+    analyzer = EmailAnalyzer.__new__(EmailAnalyzer)
+    analyzer.retry_base_delay = 1.0
+    assert EmailAnalyzer._retry_delay(analyzer, RateLimited(), 0) == 2.5
+    assert 4.0 <= EmailAnalyzer._retry_delay(analyzer, Exception(), 2) <= 6.0  # 1 s x 2^2, plus jitter
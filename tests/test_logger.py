@@ -0,0 +1,74 @@
+# --- Journalisation par file d'attente : un seul thread d'écriture, format JSON, échantillonnage DEBUG ---
+import json
+import logging
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from core.logger import configure_logging, setup_logger, shutdown_logging
+
+
+def logging_config(**overrides):
+    return SimpleNamespace(**dict({"log_level": "INFO", "log_format": "text", "log_sample_rate": 1.0,
+                                   "max_log_size": 5242880, "backup_log_count": 3}, **overrides))
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path / "logs" / "test.log"
+    shutdown_logging()
+    configure_logging(logging_config())  # Réglages par défaut pour les tests suivants
+    logging.getLogger("TestLogger").handlers.clear()
+
+
+def lines(path):
+    shutdown_logging()  # Écrit les messages encore en file
+    return path.read_text(encoding='utf-8').splitlines()
+
+
+def test_messages_from_every_thread_are_written(log_file):
+    configure_logging(logging_config())
+    logger = setup_logger("TestLogger", str(log_file))
+
+    def work(index):
+        for step in range(50):
+            logger.info("thread %d étape %d", index, step)
+
+    threads = [threading.Thread(target=work, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(lines(log_file)) == 200
+
+
+def test_message_is_formatted_when_logged(log_file):
+    configure_logging(logging_config())
+    logger = setup_logger("TestLogger", str(log_file))
+    values = ["avant"]
+    logger.info("valeur : %s", values)
+    values[0] = "après"  # Modifié avant que le thread d'écriture ne traite le message
+    assert lines(log_file)[0].endswith("valeur : ['avant']")
+
+
+def test_json_format_keeps_the_exception(log_file):
+    configure_logging(logging_config(log_format="json"))
+    logger = setup_logger("TestLogger", str(log_file))
+    try:
+        raise ValueError("panne simulée")
+    except ValueError:
+        logger.exception("Erreur")
+    entry = json.loads(lines(log_file)[0])
+    assert (entry["level"], entry["logger"], entry["message"]) == ("ERROR", "TestLogger", "Erreur")
+    assert "ValueError: panne simulée" in entry["exception"]
+
+
+def test_debug_messages_are_sampled(log_file):
+    configure_logging(logging_config(log_level="DEBUG", log_sample_rate=0.0))
+    logger = setup_logger("TestLogger", str(log_file))
+    for _ in range(20):
+        logger.debug("détail")
+    logger.info("résumé")
+    assert [line.split(" | ")[-1] for line in lines(log_file)] == ["résumé"]
@@ -0,0 +1,70 @@
+# --- Stockage local des emails : segments compressés, contenus partagés et relecture sans IMAP ---
+import sqlite3
+from email import message_from_bytes
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from database.message_store import MessageStore
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Les journaux déjà configurés écrivent dans logs/ du dossier courant
+    stores = []
+
+    def make(segment_size=1 << 20):
+        config = SimpleNamespace(store_dir=str(tmp_path / "store"), store_segment_size=segment_size,
+                                 logs_dir=str(tmp_path / "logs"))
+        stores.append(MessageStore(config))
+        return stores[-1]
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def email_message(index):
+    return message_from_bytes(b"Subject: Mission %d\r\nMessage-ID: <m%d@agence.fr>\r\n\r\nMission Python %d.\r\n"
+                              % (index, index, index))
+
+
+def test_messages_are_read_back_in_order(make_store):
+    store = make_store(segment_size=200)  # Plusieurs segments
+    hashes = [store.put("compte", "INBOX", 1, uid, email_message(uid)) for uid in range(1, 6)]
+    assert store.get(hashes[2]) == email_message(3).as_bytes()
+    assert [(uid, msg["Subject"]) for _, _, _, uid, msg in store.iter_messages()] == \
+        [(uid, f"Mission {uid}") for uid in range(1, 6)]
+    assert store.get_by_message_id("<m4@agence.fr>")["Subject"] == "Mission 4"
+
+
+def test_same_content_is_stored_once(make_store, tmp_path):
+    store = make_store()
+    store.put("compte", "INBOX", 1, 1, email_message(1))
+    store.put("compte", "Archives", 1, 7, email_message(1))
+    assert store.count() == 2
+    with sqlite3.connect(tmp_path / "store" / "index.db") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone() == (1,)
+    assert [folder for _, _, folder, _, _ in store.iter_messages(folder="Archives")] == ["Archives"]
+
+
+def test_reopened_store_keeps_its_messages(make_store):
+    store = make_store(segment_size=200)
+    for uid in range(1, 4):
+        store.put("compte", "INBOX", 1, uid, email_message(uid))
+    position = store.last_position()
+    store.close()
+    store = make_store(segment_size=200)
+    store.put("compte", "INBOX", 1, 4, email_message(4))
+    assert [uid for _, _, _, uid, _ in store.iter_messages(after=position)] == [4]
+    assert store.count() == 4
+
+
+def test_replay_from_store_does_not_need_imap(sandbox, imap_server):
+    sandbox_dir = sandbox()
+    assert main.main(["fetch"]) == 0
+    imap_server.stop()
+    assert main.main(["run", "--from-store"]) == 0
+    with sqlite3.connect(sandbox_dir / "projects.db") as conn:
+        assert conn.execute("SELECT COUNT(DISTINCT message_id) FROM projects").fetchone() == (12,)
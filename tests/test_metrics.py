@@ -0,0 +1,56 @@
+# --- Métriques du passage (logs/metrics.json) ---
+import cProfile
+import json
+import sqlite3
+from email.message import EmailMessage
+
+import main
+
+
+def test_emails_skipped_by_relevance_filter_are_counted(sandbox, mailbox):
+    newsletter = EmailMessage()
+    newsletter["Subject"] = "Les promotions de la semaine"
+    newsletter["From"] = "newsletter@boutique.fr"
+    newsletter["Message-ID"] = "<promo@boutique.fr>"
+    newsletter.set_content("Profitez de -20 % sur toute la boutique ce week-end. Se désabonner.")
+    mailbox.add_message(newsletter.as_bytes())
+    sandbox_dir = sandbox(metrics_enabled=True, metrics_format="json")
+    assert main.main(["run"]) == 0
+    with open(sandbox_dir / "logs" / "metrics.json", encoding='utf-8') as f:
+        counters = json.load(f)["counters"]
+    assert counters.get("emails_skipped_total") == 1
+
+
+def saved_projects(sandbox_dir) -> int:
+    with sqlite3.connect(sandbox_dir / "projects.db") as conn:
+        return conn.execute("SELECT COUNT(DISTINCT message_id) FROM projects").fetchone()[0]
+
+
+def test_run_with_cprofile_analyses_every_email(sandbox):
+    sandbox_dir = sandbox(profile="cprofile")
+    assert main.main(["run"]) == 0
+    assert saved_projects(sandbox_dir) == 12
+    assert list((sandbox_dir / "profiles").glob("cprofile-*.prof"))
+
+
+class ExclusiveProfile(cProfile.Profile):
+    """Comportement de Python ≥ 3.12 : un seul profil cProfile actif à la fois."""
+    active = False
+
+    def enable(self, *args, **kwargs):
+        if ExclusiveProfile.active:
+            raise ValueError("Another profiling tool is already active")
+        ExclusiveProfile.active = True
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        ExclusiveProfile.active = False
+        super().disable()
+
+
+def test_refused_profiler_does_not_kill_threads(sandbox, monkeypatch):
+    monkeypatch.setattr(cProfile, "Profile", ExclusiveProfile)
+    sandbox_dir = sandbox(profile="cprofile")
+    assert main.main(["run"]) == 0
+    assert saved_projects(sandbox_dir) == 12
+    assert "Profilage cProfile désactivé" in (sandbox_dir / "logs" / "app.log").read_text(encoding='utf-8')
@@ -0,0 +1,53 @@
+# --- MimeExtractor : découpage des parties sans décoder tout l'email ---
+from config.config import Config
+from fetcher.email_fetcher import EmailFetcher
+from fetcher.mime_extractor import MimeExtractor
+
+RAW = (b"Content-Type: multipart/mixed; boundary=\"abc\"\r\n"
+       b"Subject: Mission\r\n\r\n"
+       b"--abc\r\n"
+       b"Content-Type: multipart/alternative; boundary=\"abc-1\"\r\n\r\n"
+       b"--abc-1\r\n"
+       b"Content-Type: text/plain\r\n\r\n"
+       b"Mission Python a Lyon\r\n"
+       b"--abc-1\r\n"
+       b"Content-Type: text/html\r\n\r\n"
+       b"<p>Mission Python a Lyon</p>\r\n"
+       b"--abc-1--\r\n"
+       b"--abc\r\n"
+       b"Content-Type: text/plain\r\n\r\n"
+       b"Budget 500 euros\r\n"
+       b"--abc--\r\n")
+
+
+def test_longer_boundary_starting_with_outer_boundary_is_not_a_delimiter():
+    _, text = MimeExtractor.extract(RAW)
+    assert text.split() == ["Mission", "Python", "a", "Lyon", "Budget", "500", "euros"]
+
+
+def test_delimiter_followed_by_spaces_or_end():
+    raw = b"--abc \r\nx\r\n--abc--"
+    assert MimeExtractor._find_delimiter(raw, 0, len(raw), b"--abc") == 0
+    assert MimeExtractor._find_delimiter(raw, 1, len(raw), b"--abc") == raw.rindex(b"--abc")
+    assert MimeExtractor._find_delimiter(b"--abc-x", 0, 7, b"--abc") == -1
+
+
+def test_single_part_html_email_keeps_its_text():
+    raw = (b"Subject: Mission\r\n"
+           b"Content-Type: text/html; charset=utf-8\r\n"
+           b"Content-Transfer-Encoding: quoted-printable\r\n\r\n"
+           b"<p>Mission Python =C3=A0 Lyon</p>\r\n")
+    _, text = MimeExtractor.extract(raw)
+    assert text.strip() == "<p>Mission Python à Lyon</p>"
+
+
+def test_html_part_of_multipart_email_is_skipped():
+    _, text = MimeExtractor.extract(RAW)
+    assert "<p>" not in text
+
+
+def test_rebuilt_message_keeps_the_text_in_8bit(sandbox):
+    msg = EmailFetcher(Config())._parse_raw(b"Subject: Mission\r\nContent-Type: text/plain; charset=latin-1\r\n"
+                                            b"Content-Transfer-Encoding: 8bit\r\n\r\nMission \xe0 Lyon\r\n")
+    assert msg["Content-Transfer-Encoding"] == "8bit"
+    assert msg.get_payload(decode=True).decode('utf-8').strip() == "Mission à Lyon"
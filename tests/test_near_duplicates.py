@@ -0,0 +1,52 @@
+# --- Quasi-doublons : rattachement en mode batch, analyse quand l'email d'origine n'a pas de projet ---
+import email
+import re
+import sqlite3
+import time
+
+import main
+from fakes.fake_openai import default_responder
+
+
+def add_copy(mailbox, index=0):
+    """Ajoute à la boîte une copie (autre Message-ID) d'un email existant."""
+    msg = email.message_from_bytes(mailbox.folders["INBOX"][index][1])
+    msg.replace_header("Message-ID", "<copie-%d@example.com>" % index)
+    mailbox.add_message(msg.as_bytes())
+
+
+def rows(sandbox_dir, query):
+    with sqlite3.connect(sandbox_dir / "projects.db") as conn:
+        return conn.execute(query).fetchall()
+
+
+def test_batch_duplicate_is_linked_once_the_batch_is_saved(sandbox, mailbox):
+    add_copy(mailbox)
+    sandbox_dir = sandbox(dedup_action="link")
+    main.main(["run", "--batch"])
+    links = rows(sandbox_dir, "SELECT duplicate_of FROM projects WHERE message_id='<copie-0@example.com>'")
+    assert len(links) == 1 and links[0][0] is not None
+    assert rows(sandbox_dir, "SELECT COUNT(*) FROM minhash_entries WHERE project_id IS NULL") == [(0,)]
+
+
+def test_duplicate_of_failed_email_is_analysed(sandbox, llm_server, mailbox):
+    add_copy(mailbox)
+    original = email.message_from_bytes(mailbox.folders["INBOX"][0][1])
+    part = next(part for part in original.walk() if part.get_content_type() == "text/plain")
+    marker = re.search(r"réf\. \d+", part.get_payload(decode=True).decode(part.get_content_charset())).group(0)
+    sandbox_dir = sandbox(dedup_action="link", max_retries=0)
+    failures = []
+
+    def responder(messages):
+        # L'analyse de l'email d'origine est lente puis échoue : sa copie attend, puis est analysée
+        if marker in messages[-1]["content"] and not failures:
+            failures.append(marker)
+            time.sleep(0.5)
+            raise RuntimeError("panne simulée")
+        return default_responder(messages)
+
+    llm_server.responder = responder
+    main.main(["run"])
+    assert failures
+    copy = rows(sandbox_dir, "SELECT title, duplicate_of FROM projects WHERE message_id='<copie-0@example.com>'")
+    assert len(copy) == 1 and copy[0][0] is not None and copy[0][1] is None
@@ -0,0 +1,126 @@
+# --- ProjectDatabase : déduplication des projets par email d'origine, dates en UTC et recherche plein texte ---
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from database.project_database import ProjectDatabase
+
+
+@pytest.fixture
+def make_database(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Les journaux déjà configurés écrivent dans logs/ du dossier courant
+    config = SimpleNamespace(database_path=str(tmp_path / "projects.db"), logs_dir=str(tmp_path / "logs"))
+    databases = []
+
+    def make():
+        databases.append(ProjectDatabase(config))
+        return databases[-1]
+
+    yield make
+    for database in databases:
+        database.close()
+
+
+def project(message_id, title, **fields):
+    return dict({"message_id": message_id, "sender": "a@b.fr", "received_at": None, "title": title}, **fields)
+
+
+def test_same_answer_for_two_emails_is_kept_twice(make_database):
+    database = make_database()
+    records = database.save_projects_many([project("<1@x>", "Mission Python"), project("<2@x>", "Mission Python")])
+    assert all(records)
+
+
+def test_new_analysis_of_same_email_is_ignored(make_database):
+    database = make_database()
+    assert all(database.save_projects_many([project("<1@x>", "Mission Python"), project("<1@x>", "Mission Java")]))
+    # Nouvelle analyse : l'IA formule autrement les mêmes projets
+    assert database.save_projects_many([project("<1@x>", "Mission Python (Lyon)"),
+                                        project("<1@x>", "Mission Java (Paris)")]) == [None, None]
+
+
+def test_email_without_message_id_is_keyed_on_its_text(make_database):
+    database = make_database()
+    first = database.save_projects_many([project(None, "Mission", email_hash="texte-1")])
+    again = database.save_projects_many([project(None, "Mission reformulée", email_hash="texte-1")])
+    other = database.save_projects_many([project(None, "Mission", email_hash="texte-2")])
+    assert first[0] and again == [None] and other[0]
+
+
+def test_existing_projects_are_rekeyed_on_their_email(make_database, tmp_path):
+    with sqlite3.connect(tmp_path / "projects.db") as conn:
+        conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, content TEXT, message_id TEXT)")
+        conn.executemany("INSERT INTO projects (content, message_id) VALUES (?, ?)",
+                         [("Projet A", "<1@x>"), ("Projet B", "<1@x>"), ("Projet C", None)])
+    database = make_database()
+    assert database.save_projects_many([project("<1@x>", "Projet A, autre formulation")]) == [None]
+    assert database.save_projects_many([project(None, None, content="Projet C")]) == [None]
+    with sqlite3.connect(tmp_path / "projects.db") as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] >= 1
+
+
+def test_received_at_is_stored_in_utc(make_database, tmp_path):
+    from email.message import EmailMessage
+    from core.utils import MessageUtils
+    msg = EmailMessage()
+    msg["Date"] = "Mon, 08 Jan 2024 08:00:00 +0100"
+    assert MessageUtils.extract_metadata(msg)["received_at"] == "2024-01-08T07:00:00+00:00"
+
+    with sqlite3.connect(tmp_path / "projects.db") as conn:
+        conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, content TEXT, received_at TEXT)")
+        conn.executemany("INSERT INTO projects (content, received_at) VALUES (?, ?)",
+                         [("Projet A", "2024-01-08T08:00:00+01:00"), ("Projet B", "2024-01-07T23:30:00-05:00")])
+    make_database()
+    with sqlite3.connect(tmp_path / "projects.db") as conn:
+        dates = [row[0] for row in conn.execute("SELECT received_at FROM projects ORDER BY id")]
+    assert dates == ["2024-01-08T07:00:00+00:00", "2024-01-08T04:30:00+00:00"]
+
+
+@pytest.fixture
+def search_database(make_database):
+    database = make_database()
+    database.save_projects_many([
+        dict(project("<1@x>", None, content="Développeur Python senior pour une mission à Lyon"),
+             sender="rh@agence.fr", received_at="2024-01-08T09:00:00+00:00"),
+        dict(project("<2@x>", None, content="Mission Java à Paris, démarrage en mars"),
+             sender="jobs@cabinet.fr", received_at="2024-01-09T09:00:00+00:00"),
+        dict(project("<3@x>", None, content="Python et Django, télétravail, mission de 6 mois"),
+             sender="rh@agence.fr", received_at="2024-01-10T09:00:00+00:00"),
+    ])
+    return database
+
+
+def found(result):
+    return sorted(row["message_id"] for row in result["results"])
+
+
+def test_search_ignores_accents_and_case(search_database):
+    assert search_database.search_enabled
+    assert found(search_database.search_projects("developpeur PYTHON")) == ["<1@x>"]
+    assert found(search_database.search_projects("python")) == ["<1@x>", "<3@x>"]
+    assert found(search_database.search_projects("teletrav*")) == ["<3@x>"]
+    assert found(search_database.search_projects("java OR django")) == ["<2@x>", "<3@x>"]
+    assert "[Python]" in search_database.search_projects("python")["results"][0]["snippet"]
+
+
+def test_search_filters_and_pagination(search_database):
+    assert found(search_database.search_projects("mission", sender="@agence.fr")) == ["<1@x>", "<3@x>"]
+    assert found(search_database.search_projects("mission", since="2024-01-09", until="2024-01-09")) == ["<2@x>"]
+    page = search_database.search_projects("mission", limit=2, offset=2)
+    assert page["total"] == 3 and len(page["results"]) == 1
+    latest = search_database.search_projects("", limit=1)
+    assert latest["total"] == 3 and found(latest) == ["<3@x>"]
+
+
+def test_search_query_with_punctuation_or_lone_operator(search_database):
+    assert search_database.search_projects("C++ \"python")["total"] == 0  # « c » n'apparaît dans aucun projet
+    assert search_database.search_projects("OR")["total"] == 3
+    assert found(search_database.search_projects("NOT python")) == ["<1@x>", "<3@x>"]  # Opérateur en tête ignoré
+
+
+def test_existing_projects_are_indexed(make_database, tmp_path):
+    with sqlite3.connect(tmp_path / "projects.db") as conn:
+        conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, content TEXT)")
+        conn.execute("INSERT INTO projects (content) VALUES ('Mission Kotlin à Nantes')")
+    assert make_database().search_projects("kotlin")["total"] == 1
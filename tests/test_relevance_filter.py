@@ -0,0 +1,39 @@
+# --- Pré-filtre de pertinence : mots-clés pondérés et pénalités d'entêtes ---
+from email.message import EmailMessage
+
+from analyzer.relevance_filter import RelevanceFilter
+
+MISSION = "Bonjour, nous recherchons un développeur Python freelance pour une mission à Lyon (TJM 500 €)."
+
+
+def message(subject, **headers):
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    for name, value in headers.items():
+        msg[name.replace("_", "-")] = value
+    return msg
+
+
+def test_project_request_is_sent_to_analysis():
+    relevance = RelevanceFilter()
+    assert relevance.is_relevant(message("Mission Python"), MISSION)
+    assert not relevance.is_relevant(message("Photos du week-end"), "Voici les photos de samedi, à bientôt !")
+    assert (relevance.accepted, relevance.skipped) == (1, 1)
+
+
+def test_keywords_count_once_and_ignore_accents():
+    relevance = RelevanceFilter()
+    once = relevance.score(None, "Développeur recherché")
+    assert once == relevance.score(None, "developpeur developpeur DÉVELOPPEUR recherché")
+    assert 0 < once < 1
+
+
+def test_automatic_and_bulk_emails_are_penalised():
+    relevance = RelevanceFilter()
+    score = relevance.score(message("Mission Python"), MISSION)
+    assert relevance.score(message("Réponse automatique : Mission Python", Auto_Submitted="auto-replied"),
+                           MISSION) < score
+    assert relevance.score(message("Mission Python", Precedence="bulk", List_Unsubscribe="<mailto:x@y.fr>"),
+                           MISSION) < score
+    assert not relevance.is_relevant(message("Réponse automatique", Auto_Submitted="auto-replied",
+                                             Precedence="bulk"), "Je suis absent, mission Python en cours.")
@@ -0,0 +1,68 @@
+# --- Rapports écrits en arrière-plan, par lots, dans plusieurs formats ---
+import csv
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from reporter.report_generator import ReportGenerator
+
+
+@pytest.fixture
+def make_generator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Les journaux déjà configurés écrivent dans logs/ du dossier courant
+
+    def make(report_format, **options):
+        config = SimpleNamespace(reports_dir=str(tmp_path / "reports"), logs_dir=str(tmp_path / "logs"),
+                                 report_format=report_format, report_batch_size=options.get("batch_size", 100),
+                                 report_max_file_size=options.get("max_file_size", 0))
+        return ReportGenerator(config)
+
+    return make
+
+
+def project(project_id):
+    return {"id": project_id, "sender": "rh@agence.fr", "received_at": "2025-03-0%dT09:00:00+00:00" % (project_id % 9 + 1),
+            "title": f"Mission {project_id}", "technologies": '["Python"]', "content": f"Mission Python n°{project_id}"}
+
+
+def test_every_format_gets_every_project(make_generator, tmp_path):
+    generator = make_generator(["text", "jsonl", "csv", "html"], batch_size=3)
+    for project_id in range(1, 11):
+        generator.generate_report(project(project_id))
+    generator.close()
+    reports = tmp_path / "reports"
+    assert (reports / "project_7.txt").read_text(encoding='utf-8') == "Mission Python n°7"
+    with open(reports / "projects.jsonl", encoding='utf-8') as f:
+        assert [json.loads(line)["id"] for line in f] == list(range(1, 11))
+    with open(reports / "projects.csv", encoding='utf-8', newline='') as f:
+        assert [row["title"] for row in csv.DictReader(f)] == [f"Mission {i}" for i in range(1, 11)]
+    assert "10 projets depuis" in (reports / "summary.html").read_text(encoding='utf-8')
+
+
+def test_csv_header_is_written_once_across_runs(make_generator, tmp_path):
+    for first in (1, 3):
+        generator = make_generator("csv")
+        generator.generate_report(project(first))
+        generator.generate_report(project(first + 1))
+        generator.close()
+    with open(tmp_path / "reports" / "projects.csv", encoding='utf-8', newline='') as f:
+        assert [row["id"] for row in csv.DictReader(f)] == ["1", "2", "3", "4"]
+
+
+def test_jsonl_rolls_over_to_a_new_file(make_generator, tmp_path):
+    generator = make_generator("jsonl", batch_size=1, max_file_size=200)
+    for project_id in range(1, 6):
+        generator.generate_report(project(project_id))
+    generator.close()
+    files = sorted((tmp_path / "reports").glob("projects*.jsonl"))
+    assert len(files) > 1
+    assert sum(len(path.read_text(encoding='utf-8').splitlines()) for path in files) == 5
+
+
+def test_unknown_format_does_not_stop_the_others(make_generator, tmp_path):
+    generator = make_generator("text, xml")
+    generator.generate_report(project(1))
+    generator.close()
+    assert list(generator.sinks) == ["text"]
+    assert (tmp_path / "reports" / "project_1.txt").exists()
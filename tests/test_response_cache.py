@@ -0,0 +1,54 @@
+# --- Cache des réponses du modèle : clé sur le contenu normalisé, invalidation, TTL et éviction LRU ---
+import time
+
+import pytest
+
+from analyzer.response_cache import ResponseCache
+
+
+@pytest.fixture
+def open_cache(tmp_path):
+    caches = []
+
+    def open_cache(**options):
+        options = dict({"model": "gpt-4o-mini", "prompt_version": "v1"}, **options)
+        cache = ResponseCache(str(tmp_path / "cache.db"), **options)
+        caches.append(cache)
+        return cache
+
+    yield open_cache
+    for cache in caches:
+        cache.close()
+
+
+def test_same_content_is_served_from_the_cache(open_cache):
+    cache = open_cache()
+    assert cache.get(cache.make_key("Mission Python à Lyon")) is None
+    cache.put(cache.make_key("Mission Python à Lyon"), "[]")
+    assert cache.get(cache.make_key("  Mission   Python à Lyon\n")) == "[]"  # Espaces normalisés
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_other_model_or_prompt_invalidates_entries(open_cache):
+    cache = open_cache()
+    cache.put(cache.make_key("Mission"), "[]")
+    assert open_cache(prompt_version="v2").stats()["entries"] == 0
+
+
+def test_expired_entry_is_a_miss(open_cache):
+    cache = open_cache(ttl_seconds=60)
+    key = cache.make_key("Mission")
+    cache.put(key, "[]")
+    cache._conn.execute("UPDATE llm_cache SET created_at=?", (time.time() - 120,))
+    assert cache.get(key) is None
+
+
+def test_least_recently_used_entries_are_evicted(open_cache):
+    cache = open_cache(max_entries=2)
+    for content in ("a", "b", "c"):
+        cache.put(cache.make_key(content), content)
+        time.sleep(0.01)
+    cache.get(cache.make_key("a"))
+    cache.evict()
+    assert cache.get(cache.make_key("a")) == "a"
+    assert cache.get(cache.make_key("b")) is None
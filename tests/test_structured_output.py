@@ -0,0 +1,35 @@
+# --- Sortie structurée refusée par le modèle (gpt-4) : repli sur la consigne du prompt ---
+import sqlite3
+
+import main
+
+
+def project_count(sandbox_dir):
+    with sqlite3.connect(sandbox_dir / "projects.db") as conn:
+        return conn.execute("SELECT COUNT(*) FROM projects WHERE title IS NOT NULL").fetchone()[0]
+
+
+def test_default_config_sends_no_response_format(sandbox):
+    from config.config import Config
+    from analyzer.email_analyzer import EmailAnalyzer
+    sandbox()
+    analyzer = EmailAnalyzer(Config())
+    assert "response_format" not in analyzer.build_request_body("texte")
+    analyzer.close()
+
+
+def test_sync_analysis_falls_back_when_response_format_is_rejected(sandbox, llm_server, mailbox):
+    sandbox_dir = sandbox(structured_output="json_schema", dedup_enabled=False)
+    llm_server.reject_response_format = True
+    main.main(["run"])
+    assert project_count(sandbox_dir) == len(mailbox.folders["INBOX"])
+
+
+def test_batch_resubmits_without_response_format_when_rejected(sandbox, llm_server, mailbox):
+    sandbox_dir = sandbox(structured_output="json_schema", dedup_enabled=False)
+    llm_server.reject_response_format = True
+    main.main(["run", "--batch"])
+    assert project_count(sandbox_dir) == len(mailbox.folders["INBOX"])
+    with sqlite3.connect(sandbox_dir / "projects.db") as conn:
+        statuses = dict(conn.execute("SELECT status, COUNT(*) FROM batch_requests GROUP BY status").fetchall())
+    assert statuses == {"saved": len(mailbox.folders["INBOX"])}
@@ -0,0 +1,85 @@
+# --- Points de reprise : un email en échec n'est jamais dépassé ---
+import sqlite3
+
+import main
+from fetcher.sync_tracker import FolderSync, SyncCheckpointTracker
+
+
+def make_tracker(uids):
+    saved = []
+    tracker = SyncCheckpointTracker(lambda account, folder, state: saved.append(state["last_uid"]))
+    folder_sync = FolderSync("compte", "INBOX", uids, {"uidvalidity": 1, "last_uid": uids[-1]})
+    tracker.register(folder_sync)
+    for uid in uids:
+        tracker.seen(folder_sync, uid)
+    return tracker, folder_sync, saved
+
+
+def test_checkpoint_advances_over_completed_emails():
+    tracker, folder_sync, saved = make_tracker([1, 2, 3])
+    for uid in (2, 1, 3):
+        tracker.mark_done(folder_sync, uid)
+    tracker.folder_finished(folder_sync, True)
+    assert saved[-1] == 3
+    assert tracker.finish() == 0
+
+
+def test_checkpoint_stops_before_failed_email():
+    tracker, folder_sync, saved = make_tracker([1, 2, 3, 4])
+    tracker.mark_done(folder_sync, 1)
+    tracker.mark_failed(folder_sync, 2)
+    tracker.mark_done(folder_sync, 3)
+    tracker.mark_done(folder_sync, 4)
+    tracker.folder_finished(folder_sync, True)
+    assert saved == [1]
+    assert tracker.finish() == 1
+
+
+def last_uids(sandbox_dir):
+    with sqlite3.connect(sandbox_dir / "projects.db") as conn:
+        return conn.execute("SELECT last_uid FROM sync_state WHERE folder='INBOX'").fetchall()
+
+
+def store_checkpoint(sandbox_dir):
+    with sqlite3.connect(sandbox_dir / "projects.db") as conn:
+        return conn.execute("SELECT last_uid FROM sync_state WHERE folder=?", (main.STORE_CHECKPOINT[1],)).fetchall()
+
+
+def project_count(sandbox_dir):
+    with sqlite3.connect(sandbox_dir / "projects.db") as conn:
+        return conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+
+def test_failed_analysis_is_retried_on_next_run(sandbox, llm_server, mailbox):
+    sandbox_dir = sandbox(max_retries=0, dedup_enabled=False)
+    llm_server.error_rate = 1.0  # Toutes les analyses échouent
+    main.main(["run"])
+    assert project_count(sandbox_dir) == 0
+    assert last_uids(sandbox_dir) in ([], [(0,)], [(None,)])
+
+    llm_server.error_rate = 0.0
+    main.main(["run"])
+    assert project_count(sandbox_dir) == len(mailbox.folders["INBOX"])
+    assert last_uids(sandbox_dir) == [(len(mailbox.folders["INBOX"]),)]
+
+
+def test_analyze_skips_emails_already_analysed_by_run(sandbox, llm_server, mailbox):
+    sandbox_dir = sandbox(dedup_enabled=False)
+    main.main(["run"])
+    assert store_checkpoint(sandbox_dir) == [(len(mailbox.folders["INBOX"]),)]
+    requests = llm_server.requests
+    main.main(["analyze"])
+    assert llm_server.requests == requests
+    assert project_count(sandbox_dir) == len(mailbox.folders["INBOX"])
+
+
+def test_analyze_keeps_emails_fetched_before_run(sandbox, llm_server, mailbox, imap_server):
+    sandbox_dir = sandbox(dedup_enabled=False)
+    main.main(["fetch"])
+    raw = mailbox.folders["INBOX"][0][1]
+    mailbox.add_message(raw.replace(b"Message-ID: <", b"Message-ID: <nouveau-").replace(b"Cordialement", b"Bien cordialement"))
+    main.main(["run"])
+    assert llm_server.requests == 1   # Seul le nouvel email est récupéré par run
+    assert store_checkpoint(sandbox_dir) == []  # Les emails de fetch restent à analyser
+    main.main(["analyze"])
+    assert project_count(sandbox_dir) == len(mailbox.folders["INBOX"])
@@ -0,0 +1,50 @@
+# --- TextUtils : mêmes résultats que les versions d'origine (quadratique / plusieurs passes) ---
+import random
+import re
+import unicodedata
+
+from core.utils import TextUtils
+
+SAMPLES = [
+    "Développeur Python (H/F) — mission à Lyon, TJM 500 € !",
+    "  Plusieurs   espaces\tet\nsauts de ligne  ",
+    "Ligatures ﬁ ﬂ, exposants ² ³, grec Ωμέγα, cyrillique Привет, 日本語",
+    "",
+]
+
+
+def reference_normalize(text):
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', text)).strip()
+
+
+def reference_chunks(text, chunk_size):
+    chunks, current = [], []
+    for word in text.split():
+        if sum(len(w) + 1 for w in current) + len(word) + 1 > chunk_size:
+            chunks.append(' '.join(current))
+            current = [word]
+        else:
+            current.append(word)
+    return chunks + [' '.join(current)] if current else chunks
+
+
+def test_normalize_text_matches_the_original_version():
+    for text in SAMPLES:
+        assert TextUtils.normalize_text(text) == reference_normalize(text)
+
+
+def test_chunk_text_matches_the_original_version():
+    rng = random.Random(1)
+    text = " ".join("x" * rng.randint(1, 12) for _ in range(5000))
+    for chunk_size in (20, 200, 2000):
+        chunks = TextUtils.chunk_text(text, chunk_size)
+        assert chunks == reference_chunks(text, chunk_size)
+        assert all(len(chunk) < chunk_size for chunk in chunks)
+
+
+
+def test_extract_emails():
+    assert TextUtils.extract_emails("Contact : jean.dupont@agence-it.fr ou rh@agence.co.uk.") == \
+        ["jean.dupont@agence-it.fr", "rh@agence.co.uk"]